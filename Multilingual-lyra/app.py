@@ -1,9 +1,16 @@
+import argparse
 import sys
 from PyQt5.QtWidgets import QApplication
 from ui.main_window import LyraUI
 
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="trace every turn and serve Prometheus metrics on this port")
+    parser.add_argument("--cascade", default=None, metavar="TIERS",
+                        help='ASR cascade instead of the base model, e.g. "tiny:-0.6:0.4,base"')
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
     # Optional: use a stylesheet for a modern look
     try:
         with open("ui/styles.qss", "r", encoding="utf-8") as f:
@@ -11,7 +18,7 @@ def main():
     except Exception:
         pass
 
-    window = LyraUI()
+    window = LyraUI(metrics_port=args.metrics_port, asr_tiers=args.cascade)
     window.show()
     sys.exit(app.exec())
 
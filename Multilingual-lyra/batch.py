@@ -0,0 +1,199 @@
+"""
+Headless batch run: transcribe -> detect_intent -> sentiment over a folder (or manifest) of
+recorded commands, for QA and intent tuning. Nothing is executed or spoken.
+
+    python batch.py recordings/ -o results.jsonl --workers 4
+    python batch.py manifest.jsonl -o results.jsonl        # {"path": ..., "expected_intent": ...}
+
+Each worker process loads Whisper once. Results are appended to the JSONL as they finish,
+so an interrupted run picks up where it stopped when started again with the same output.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+AUDIO_EXTS = (".wav", ".mp3", ".m4a", ".ogg", ".flac", ".webm", ".aac")
+
+_core = None  # one LyraCore per worker process
+
+
+# ---------- Inputs ----------
+def read_inputs(source: str, exts=AUDIO_EXTS) -> list[dict]:
+    """Jobs from a directory (recursive) or a manifest (.jsonl records or one path per line)."""
+    if os.path.isdir(source):
+        jobs = []
+        for root, _, files in os.walk(source):
+            jobs.extend({"path": os.path.join(root, f)} for f in files if f.lower().endswith(exts))
+        return sorted(jobs, key=lambda j: j["path"])
+    base = os.path.dirname(os.path.abspath(source))
+    jobs = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            job = json.loads(line) if line.startswith("{") else {"path": line}
+            job["path"] = os.path.join(base, job["path"])  # manifest paths are relative to the manifest
+            jobs.append(job)
+    return jobs
+
+
+def read_checkpoint(out_path: str) -> set[str]:
+    """Paths already in the output file; a line cut off by an interrupt is ignored (and redone)."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["path"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+# ---------- Worker ----------
+def _init_worker(asr_model: str, threads: int, asr_tiers: str | None = None, timings: bool = False):
+    global _core
+    try:
+        import torch
+        torch.set_num_threads(threads)  # workers x threads ~= cores, not workers x cores
+    except ImportError:
+        pass
+    from lyra_core import LyraCore
+    from modules.tracing import Tracer
+    _core = LyraCore(asr_model=asr_model, headless=True, asr_tiers=asr_tiers, tracer=Tracer(enabled=timings))
+    _core.models["asr"].get()
+    _core.models["sentiment"].get()
+
+
+def _run_job(job: dict) -> dict:
+    from modules.audio import SAMPLE_RATE, load_audio_file
+    record = dict(job)
+    t0 = time.perf_counter()
+    try:
+        samples = load_audio_file(job["path"])
+        record["audio_s"] = round(len(samples) / SAMPLE_RATE, 3)
+        record.update(_core.analyze_pcm(samples))
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["proc_s"] = round(time.perf_counter() - t0, 3)
+    return record
+
+
+# ---------- Driver ----------
+def run(jobs: list[dict], out_path: str, workers: int, asr_model: str = "base", threads: int | None = None,
+        asr_tiers: str | None = None, timings: bool = False) -> dict:
+    done = read_checkpoint(out_path)
+    todo = [j for j in jobs if j["path"] not in done]
+    print(f"{len(jobs)} files, {len(done & {j['path'] for j in jobs})} already done, {len(todo)} to go", file=sys.stderr)
+    stats = {"files": 0, "errors": 0, "audio_s": 0.0, "proc_s": 0.0, "labelled": 0, "correct": 0,
+             "timed_files": 0, "timed_audio_s": 0.0, "wall_s": 0.0, "stage_ms": {}}
+    if not todo:
+        return stats
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    # spawn: torch and forked parents don't mix, and it's the only option on Windows anyway
+    ctx = multiprocessing.get_context("spawn")
+    t_first = None  # throughput is timed from the first result, so model start-up isn't counted
+    _end_torn_line(out_path)
+    with open(out_path, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                                initargs=(asr_model, threads, asr_tiers, timings)) as pool:
+        pending, queue = set(), iter(todo)
+        try:
+            while True:
+                while len(pending) < workers * 2:  # keep every worker busy without queueing the world
+                    job = next(queue, None)
+                    if job is None:
+                        break
+                    pending.add(pool.submit(_run_job, job))
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    record = fut.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    _tally(stats, record)
+                if t_first is None:
+                    t_first, first_files, first_audio = time.perf_counter(), stats["files"], stats["audio_s"]
+        except KeyboardInterrupt:
+            print("\nInterrupted; rerun the same command to resume.", file=sys.stderr)
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    stats["timed_files"] = stats["files"] - first_files
+    stats["timed_audio_s"] = stats["audio_s"] - first_audio
+    stats["wall_s"] = time.perf_counter() - t_first
+    return stats
+
+
+def _end_torn_line(out_path: str):
+    """Terminate a half-written last line so appended results start on a line of their own."""
+    if not os.path.exists(out_path) or not os.path.getsize(out_path):
+        return
+    with open(out_path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def _tally(stats: dict, record: dict):
+    stats["files"] += 1
+    stats["errors"] += "error" in record
+    stats["audio_s"] += record.get("audio_s", 0.0)
+    stats["proc_s"] += record["proc_s"]
+    if "expected_intent" in record and "intent" in record:
+        stats["labelled"] += 1
+        stats["correct"] += record["intent"] == record["expected_intent"]
+    for stage, ms in record.get("timings", {}).items():
+        stats["stage_ms"][stage] = stats["stage_ms"].get(stage, 0.0) + ms
+
+
+def report(stats: dict, workers: int) -> str:
+    if not stats["files"]:
+        return "Nothing to do."
+    timed, wall = stats["timed_files"], stats["wall_s"]
+    lines = [f"{stats['files']} files ({stats['errors']} errors), {stats['audio_s']:.1f} s of audio"]
+    if timed and wall > 0:
+        lines.append(f"throughput: {timed / wall:.2f} files/s with {workers} workers")
+    if stats["audio_s"]:
+        # RTF = processing time / audio duration; below 1 is faster than real time
+        lines.append(f"real-time factor: {stats['proc_s'] / stats['audio_s']:.3f} per worker")
+    if stats.get("timed_audio_s") and wall > 0:
+        lines.append(f"real-time factor: {wall / stats['timed_audio_s']:.3f} overall (wall clock, {workers} workers)")
+    if stats["labelled"]:
+        lines.append(f"intent accuracy: {stats['correct']}/{stats['labelled']} "
+                     f"({stats['correct'] / stats['labelled']:.1%})")
+    if stats.get("stage_ms"):
+        lines.append("mean per file: " + ", ".join(
+            f"{stage} {ms / stats['files']:.1f} ms" for stage, ms in stats["stage_ms"].items()))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Lyra's speech pipeline over recorded commands, headless.")
+    parser.add_argument("source", help="directory of audio files, or a manifest (.jsonl / one path per line)")
+    parser.add_argument("-o", "--output", default="lyra_batch.jsonl", help="JSONL results (also the checkpoint)")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)))
+    parser.add_argument("--threads", type=int, default=None, help="torch threads per worker")
+    parser.add_argument("--model", default="base", help="Whisper model name")
+    parser.add_argument("--cascade", default=None, metavar="TIERS",
+                        help='ASR cascade instead of --model, e.g. "tiny:-0.6:0.4,base" (model[:min_avg_logprob[:max_no_speech_prob]])')
+    parser.add_argument("--timings", action="store_true", help="record per-stage timings in every result")
+    args = parser.parse_args(argv)
+
+    jobs = read_inputs(args.source)
+    try:
+        stats = run(jobs, args.output, args.workers, args.model, args.threads, args.cascade, args.timings)
+    except KeyboardInterrupt:
+        return 130
+    print(report(stats, args.workers), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
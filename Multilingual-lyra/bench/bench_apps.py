@@ -0,0 +1,72 @@
+"""
+App launching with stub executables: how long open_app blocks and whether close_app finds
+what it started, for a stub that keeps running (a real app) and one that exits at once (a
+launcher stub handing off, e.g. gnome-calculator or a UWP shim). On Windows such a stub is
+often gone before psutil can open it (NoSuchProcess); on Linux it lingers as a zombie until
+reaped, so there the check covers the rest of the path. Exit status is 1 if any check fails.
+Run from Multilingual-lyra/:  python -m bench.bench_apps [--rounds 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from modules.apps import Launcher, close_app, open_app
+
+STUBS = {
+    "notepad": [sys.executable, "-c", "import time; time.sleep(30)"],  # stays up until closed
+    "calculator": [sys.executable, "-c", "pass"],                      # exits at once
+}
+
+
+def _wait_gone(launcher: Launcher, app: str, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while launcher.running(app):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def run(rounds: int) -> bool:
+    # process_names is empty, so close() can't fall back to killing anything else on this machine
+    launcher = Launcher(commands=STUBS, process_names={})
+    ok = True
+    print(f"{'stub':<22} {'open p50 ms':>12} {'open max ms':>12}  close")
+    for app, label in (("notepad", "keeps running"), ("calculator", "exits at once")):
+        timings, replies = [], set()
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            reply = open_app(f"open {app}", launcher=launcher)
+            timings.append((time.perf_counter() - t0) * 1e3)
+            if app == "calculator":
+                _wait_gone(launcher, app)
+            replies.add(close_app(f"close {app}", launcher=launcher))
+            if not reply.startswith("Opening"):
+                print(f"  ✗ open {app}: {reply}")
+                ok = False
+        if launcher.running(app):
+            print(f"  ✗ {app}: still tracked after close: {launcher.running(app)}")
+            ok = False
+        print(f"{f'{app} ({label})':<22} {statistics.median(timings):>12.2f} {max(timings):>12.2f}  "
+              + " / ".join(sorted(replies)))
+
+    missing = Launcher(commands={"paint": [os.path.join(os.devnull, "no-such-app")]}, process_names={})
+    reply = open_app("open paint", launcher=missing)
+    print(f"{'missing executable':<22} {reply}")
+    ok = ok and reply.startswith("I couldn't find")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    ok = run(args.rounds)
+    print("ok" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
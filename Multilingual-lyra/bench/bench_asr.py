@@ -0,0 +1,103 @@
+"""
+ASR cascade report on a fixture set: for every tier on its own and for the cascade, the
+average decode time, real-time factor, word error rate and intent accuracy, plus how often
+the cascade kept each tier's answer.
+
+Fixtures are a JSONL manifest, one clip per line, paths relative to the manifest:
+    {"path": "volume_up_01.wav", "text": "volume up", "intent": "VOLUME_UP"}
+("intent" is optional; it defaults to the intent of the reference text.)
+Run from Multilingual-lyra/:  python -m bench.bench_asr fixtures/manifest.jsonl [--tiers "tiny:-0.6:0.4,base"]
+"""
+import argparse
+import json
+import os
+import time
+
+from modules.asr import DEFAULT_TIERS
+from modules.audio import SAMPLE_RATE, read_wav
+from modules.intents import tokenize
+
+
+def wer_counts(reference: str, hypothesis: str) -> tuple[int, int]:
+    """(word edits, reference words) by Levenshtein distance over tokens."""
+    ref, hyp = tokenize(reference), tokenize(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+
+def load_fixtures(manifest: str) -> list[dict]:
+    base = os.path.dirname(os.path.abspath(manifest))
+    fixtures = []
+    with open(manifest, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                item["audio"] = read_wav(os.path.join(base, item["path"]))
+                fixtures.append(item)
+    return fixtures
+
+
+class Tally:
+    def __init__(self):
+        self.seconds = self.audio_s = 0.0
+        self.edits = self.words = self.correct = self.n = 0
+
+    def add(self, fixture: dict, text: str, intent: str, seconds: float):
+        edits, words = wer_counts(fixture["text"], text)
+        self.edits += edits
+        self.words += words
+        self.correct += intent == fixture["intent"]
+        self.seconds += seconds
+        self.audio_s += len(fixture["audio"]) / SAMPLE_RATE
+        self.n += 1
+
+    def row(self, name: str) -> str:
+        return (f"{name:<22} {self.seconds / self.n * 1e3:8.0f} ms  RTF {self.seconds / self.audio_s:6.3f}  "
+                f"WER {self.edits / max(1, self.words):6.1%}  intent {self.correct}/{self.n}")
+
+
+def run(manifest: str, tiers: str):
+    from lyra_core import LyraCore
+    fixtures = load_fixtures(manifest)
+    core = LyraCore(headless=True, asr_tiers=tiers)
+    cascade = core.asr  # waits for the models (warm-up loads every tier)
+    for fx in fixtures:
+        fx.setdefault("intent", core.detect_intent(fx["text"]))
+    print(f"{len(fixtures)} fixtures, {sum(len(f['audio']) for f in fixtures) / SAMPLE_RATE:.1f} s of audio\n")
+
+    for tier in cascade.tiers:
+        model, tally = cascade.model(tier.model), Tally()
+        for fx in fixtures:
+            t0 = time.perf_counter()
+            text = (model.transcribe(fx["audio"]).get("text") or "").strip()
+            tally.add(fx, text, core.detect_intent(text), time.perf_counter() - t0)
+        print(tally.row(f"{tier.model} only"))
+
+    for stats in cascade.stats.values():
+        stats.update(calls=0, accepted=0, seconds=0.0)
+    tally, kept = Tally(), []
+    for fx in fixtures:
+        t0 = time.perf_counter()
+        stt = core.transcribe(fx["audio"])
+        tally.add(fx, stt["text"], core.detect_intent(stt["text"]), time.perf_counter() - t0)
+        kept.append(stt["tier"])
+    print(tally.row("cascade " + ">".join(t.model for t in cascade.tiers)))
+    for name, stats in cascade.stats.items():
+        print(f"  {name:<8} ran on {stats['calls']:3d} clips, answer kept for {stats['accepted']:3d} "
+              f"({stats['accepted'] / len(fixtures):.0%}), {stats['seconds'] / max(1, stats['calls']) * 1e3:.0f} ms/clip")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("manifest")
+    parser.add_argument("--tiers", default=DEFAULT_TIERS)
+    args = parser.parse_args()
+    run(args.manifest, args.tiers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Micro-batching under concurrent load: N clients each sending spoken turns back to back
+through one LyraCore (process_pcm, as the server's executor threads do), with batching off
+(max_batch=1, every decode on its own behind the lock) and on.
+
+The models are the bench.fakes ones with a batch-aware cost: a forward pass costs a fixed
+part once per batch plus a part per input (--asr-ms FIXED PER_S, --sentiment-ms FIXED
+PER_TEXT; defaults roughly Whisper base and the BERT pipeline on a laptop CPU). The fixed
+part is what batching saves, so the speedup here is only as good as that split; with
+--real-models the real Whisper and sentiment model are used instead.
+Run from Multilingual-lyra/:
+    python -m bench.bench_batching [--clients 1 2 4 8] [--turns 8] [--max-batch 8] [--max-wait-ms 5]
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from bench.fakes import build_core, tone_words
+from bench.fixtures import COMMANDS, vocabulary
+
+# Turns that go through both models (sentiment is skipped for system commands)
+TEXTS = [text for lang, text, intent in COMMANDS if lang == "en" and intent in ("GREETING", "SUPPORT", "GENERAL")]
+
+
+def run(clients: int, turns: int, real_models: bool, asr_ms: tuple, sentiment_ms: tuple, **core_kwargs) -> dict:
+    vocab = vocabulary()
+    clips = [tone_words(text, vocab, seed=i) for i, text in enumerate(TEXTS)]
+    core, fakes = build_core(vocab, asr_ms=asr_ms, sentiment_ms=sentiment_ms, real_models=real_models, **core_kwargs)
+    try:
+        core.process_pcm(clips[0], session="warm-up")
+        latencies, errors, lock = [], [], threading.Lock()
+
+        def client(c: int):
+            for t in range(turns):
+                t0 = time.perf_counter()
+                try:
+                    core.process_pcm(clips[(c + t) % len(clips)], session=f"client-{c}")
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+
+        threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+        t0 = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        wall = time.perf_counter() - t0
+        stats = core.batch_stats()
+    finally:
+        fakes.close()
+    latencies.sort()
+    return {
+        "turns_per_s": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1e3,
+        "asr_batch": max((s["mean_size"] for name, s in stats.items() if name.startswith("whisper")), default=1.0),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--turns", type=int, default=8, help="turns per client")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--asr-ms", type=float, nargs=2, default=(250.0, 60.0), metavar=("FIXED", "PER_S"))
+    parser.add_argument("--sentiment-ms", type=float, nargs=2, default=(20.0, 4.0), metavar=("FIXED", "PER_TEXT"))
+    parser.add_argument("--real-models", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'clients':>7} {'batching':>9} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'asr batch':>10}")
+    for clients in args.clients:
+        for max_batch in (1, args.max_batch):
+            r = run(clients, args.turns, args.real_models, tuple(args.asr_ms), tuple(args.sentiment_ms),
+                    max_batch=max_batch, max_wait_ms=args.max_wait_ms)
+            label = "off" if max_batch == 1 else f"<={max_batch}"
+            print(f"{clients:>7} {label:>9} {r['turns_per_s']:>8.2f} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+                  f"{r['asr_batch']:>10.2f}" + (f"  {r['errors']} errors" if r["errors"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+End-to-end benchmark suite: LyraCore built with bench.fakes (no mic, speakers, network or
+host actions) over the synthetic fixtures of bench.fixtures, compared with a stored baseline.
+
+    cold_import_ms / cold_ready_ms   fresh process: import lyra_core / core built and models ready
+    intent_per_s                     detect_intent throughput over the fixture texts
+    transcribe_rtf                   transcribe() time / audio time over the spoken fixtures
+    sentiment_ms_p50                 sentiment.classify latency
+    turn_pcm_ms_p50 / _p95           process_pcm, audio in -> action, reply, history, TTS queued
+    turn_text_ms_p50                 process_text
+    intent_accuracy                  fixtures whose turn ended with the labelled intent
+
+With the fake models the numbers are the pipeline's own overhead, and they are stable enough
+to catch regressions in it. Each metric is the best of --repeat suite runs, which keeps
+scheduler noise on a busy machine out of the comparison. --real-models uses Whisper and the
+sentiment model instead (and the gTTS fixtures, if generated). Baselines are stored per model
+set, so a real-model run is only compared with a real-model baseline. Exit status is 1 when a
+metric regressed.
+Run from Multilingual-lyra/:
+    python -m bench.bench_e2e [--fixtures DIR] [--real-models] [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name -> (unit, better, slack, tolerance): a change only counts when it is also bigger than
+# `slack`; tolerance None means --tolerance
+METRICS = {
+    "cold_import_ms": ("ms", "lower", 50.0, None),
+    "cold_ready_ms": ("ms", "lower", 50.0, None),
+    "intent_per_s": ("/s", "higher", 0.0, None),
+    "transcribe_rtf": ("", "lower", 0.001, None),
+    "sentiment_ms_p50": ("ms", "lower", 0.05, None),
+    "turn_pcm_ms_p50": ("ms", "lower", 0.5, None),
+    "turn_pcm_ms_p95": ("ms", "lower", 10.0, None),  # the tail is the web-search turns, noisier
+    "turn_text_ms_p50": ("ms", "lower", 0.5, None),
+    "intent_accuracy": ("", "higher", 0.0, 0.0),     # deterministic: any drop is real
+}
+
+
+def _pct(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+# ---------- Measurements ----------
+def probe_cold_start(real_models: bool):
+    """Runs in a fresh interpreter (see cold_start) and prints its timings as JSON."""
+    t0 = time.perf_counter()
+    import lyra_core  # noqa: F401  (the import is what is being timed)
+    t_import = time.perf_counter()
+    from bench.fakes import build_core
+    from bench.fixtures import vocabulary
+    core, fakes = build_core(vocabulary(), real_models=real_models)
+    for slot in core.models.values():
+        slot.get()
+    t_ready = time.perf_counter()
+    fakes.close()
+    print(json.dumps({"import_ms": (t_import - t0) * 1e3, "ready_ms": (t_ready - t0) * 1e3}))
+
+
+def cold_start(real_models: bool, runs: int = 3) -> dict:
+    cmd = [sys.executable, "-m", "bench.bench_e2e", "--probe-cold-start"] + (["--real-models"] if real_models else [])
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"cold_import_ms": statistics.median(s["import_ms"] for s in samples),
+            "cold_ready_ms": statistics.median(s["ready_ms"] for s in samples)}
+
+
+def load_fixtures(fixtures: str | None, real_models: bool) -> list[dict]:
+    from bench.fixtures import generate
+    from modules.audio import read_wav
+    if fixtures is None:
+        fixtures = tempfile.mkdtemp(prefix="lyra_fixtures_")
+        generate(fixtures, tts=False)
+    with open(os.path.join(fixtures, "manifest.jsonl"), encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    spoken = "tts" if real_models and any(r["kind"] == "tts" for r in rows) else "words"
+    if real_models and spoken == "words":
+        print("⚠️ no gTTS fixtures (python -m bench.fixtures); real Whisper gets tone words")
+    rows = [r for r in rows if r["kind"] in (spoken, "tones", "noise")]
+    for r in rows:
+        r["audio"] = read_wav(os.path.join(fixtures, r["path"]))
+    return rows
+
+
+def run_suite(fixtures: str | None, real_models: bool, rounds: int) -> dict:
+    from bench.fakes import build_core
+    from bench.fixtures import COMMANDS, vocabulary
+    from modules.audio import SAMPLE_RATE
+
+    metrics = cold_start(real_models)
+    clips = load_fixtures(fixtures, real_models)
+    core, fakes = build_core(vocabulary(), real_models=real_models)
+    try:
+        texts = [text for _, text, _ in COMMANDS]
+
+        best = 0.0  # best of several short runs: the least disturbed by whatever else the machine does
+        for _ in range(5):
+            n, t0 = 0, time.perf_counter()
+            while time.perf_counter() - t0 < 0.2:
+                for text in texts:
+                    core.detect_intent(text)
+                n += len(texts)
+            best = max(best, n / (time.perf_counter() - t0))
+        metrics["intent_per_s"] = best
+
+        spoken = [c for c in clips if c["text"]]
+        core.transcribe(spoken[0]["audio"])  # warm-up
+        decode_s = audio_s = 0.0
+        for _ in range(rounds):
+            for clip in spoken:
+                t0 = time.perf_counter()
+                core.transcribe(clip["audio"])
+                decode_s += time.perf_counter() - t0
+                audio_s += len(clip["audio"]) / SAMPLE_RATE
+        metrics["transcribe_rtf"] = decode_s / audio_s
+
+        sentiment, lat = core.sentiment, []
+        for _ in range(rounds):
+            for text in texts:
+                t0 = time.perf_counter()
+                sentiment.classify(text)
+                lat.append(time.perf_counter() - t0)
+        metrics["sentiment_ms_p50"] = statistics.median(lat) * 1e3
+
+        lat, correct, turns = [], 0, 0
+        for r in range(rounds):
+            for clip in clips:
+                t0 = time.perf_counter()
+                out = core.process_pcm(clip["audio"], session=f"bench-{r}")
+                lat.append(time.perf_counter() - t0)
+                correct += out["intent"] == clip["intent"]
+                turns += 1
+        metrics["turn_pcm_ms_p50"] = statistics.median(lat) * 1e3
+        metrics["turn_pcm_ms_p95"] = _pct(lat, 0.95) * 1e3
+        metrics["intent_accuracy"] = correct / turns
+
+        lat = []
+        for r in range(rounds):
+            for text in texts:
+                t0 = time.perf_counter()
+                core.process_text(text, session=f"bench-text-{r}")
+                lat.append(time.perf_counter() - t0)
+        metrics["turn_text_ms_p50"] = statistics.median(lat) * 1e3
+        core.speech.wait_idle(5)
+    finally:
+        fakes.close()
+    return metrics
+
+
+# ---------- Baseline ----------
+def environment(real_models: bool) -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system(),
+            "cpus": os.cpu_count(), "models": "real" if real_models else "fake"}
+
+
+def compare(metrics: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print the table; returns the names of the regressed metrics."""
+    regressed = []
+    print(f"{'metric':<20} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, value in metrics.items():
+        unit, better, slack, tol = METRICS[name]
+        tol = tolerance if tol is None else tol
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<20} {'-':>12} {value:>12.4g} {'new':>9}")
+            continue
+        change = (value - old) / old if old else 0.0
+        worse = (value - old) if better == "lower" else (old - value)
+        flag = ""
+        if worse > slack and worse > tol * abs(old):
+            flag = "  REGRESSION"
+            regressed.append(name)
+        elif -worse > slack and -worse > tol * abs(old):
+            flag = "  improved"
+        print(f"{name:<20} {old:>12.4g} {value:>12.4g} {change:>+8.1%}{flag}  {unit}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=None, help="directory from bench.fixtures (default: generate to a temp dir)")
+    parser.add_argument("--real-models", action="store_true", help="real Whisper and sentiment model instead of fakes")
+    parser.add_argument("--rounds", type=int, default=5, help="passes over the fixtures per suite run")
+    parser.add_argument("--repeat", type=int, default=3, help="suite runs; each metric keeps its best")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative change that counts as a regression")
+    parser.add_argument("--probe-cold-start", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe_cold_start:
+        probe_cold_start(args.real_models)
+        return 0
+
+    metrics = {}
+    for _ in range(args.repeat):
+        for name, value in run_suite(args.fixtures, args.real_models, args.rounds).items():
+            pick = min if METRICS[name][1] == "lower" else max
+            metrics[name] = pick(metrics.get(name, value), value)
+    env = environment(args.real_models)
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)  # "fake" / "real" -> {"env": ..., "metrics": ...}
+    except (OSError, ValueError):
+        baselines = {}
+    stored = baselines.get(env["models"])
+    if stored is None:
+        print(f"⚠️ no baseline for {env['models']} models yet; run with --save-baseline to record one")
+        stored = {"env": {}, "metrics": {}}
+    elif stored["env"] != env:
+        print(f"⚠️ baseline was recorded on {stored['env']}, this is {env}; expect differences")
+    regressed = compare(metrics, stored["metrics"], args.tolerance)
+    if args.save_baseline:
+        baselines[env["models"]] = {"env": env, "metrics": {k: round(v, 6) for k, v in metrics.items()}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        print(f"{env['models']}-model baseline saved to {args.baseline}")
+        return 0
+    if regressed:
+        print(f"{len(regressed)} regression(s): {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
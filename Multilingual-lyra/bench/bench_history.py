@@ -0,0 +1,78 @@
+"""
+HistoryStore at scale: ingest N turns spread over ~6 months through the normal batched
+add() path, then time CONTEXT-style recall queries (common, rare and absent topics),
+the add() cost on the caller's thread, and a retention prune.
+Run from Multilingual-lyra/:  python -m bench.bench_history [turns]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from modules.history import HistoryStore, topic_terms
+
+TEMPLATES = [
+    "remind me about the {t} tomorrow", "what is the weather in {t}", "open {t}",
+    "search {t} near me", "i need to prepare for the {t}", "play some {t} music",
+    "tell my sister about the {t}", "add {t} to the shopping list",
+]
+TOPICS = ["meeting", "dentist", "bangalore", "notepad", "groceries", "jazz", "birthday", "invoice",
+          "train", "report", "मौसम", "cricket", "physics", "rent", "yoga", "laundry"]
+RARE = "zanzibar"
+QUERIES = ["what did I say about the meeting", "what did I say about zanzibar",
+           "what did I say about the invoice report", "what did I say about quantum"]
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1e3, samples[int(len(samples) * 0.99)] * 1e3
+
+
+def run(turns: int = 1_000_000, rounds: int = 200):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.db"), retention_days=None, batch_size=4096)
+        start = time.time() - 180 * 86400
+        t0 = time.perf_counter()
+        for i in range(turns):
+            text = rng.choice(TEMPLATES).format(t=rng.choice(TOPICS))
+            if i % 50_000 == 1234:
+                text += f" and the trip to {RARE}"
+            store.add(text, "ok", ts=start + i * (180 * 86400 / turns))
+        queued = time.perf_counter() - t0
+        store.flush()
+        total = time.perf_counter() - t0
+        size_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 1e6
+        print(f"ingest {turns:,} turns: add() {queued / turns * 1e6:.2f} us/turn on the caller, "
+              f"{turns / total:,.0f} turns/s committed, db {size_mb:.0f} MB")
+
+        for q in QUERIES:
+            terms = topic_terms(q)
+            samples = []
+            for _ in range(rounds):
+                t1 = time.perf_counter()
+                hits = store.search(terms)
+                samples.append(time.perf_counter() - t1)
+            med, p99 = _percentiles(samples)
+            print(f"  {q!r:<45} terms={terms} -> {len(hits)} hits  median {med:.3f} ms  p99 {p99:.3f} ms")
+
+        store.retention_days = 90
+        t1 = time.perf_counter()
+        removed = store.prune()
+        print(f"prune to 90 days: removed {removed:,} turns in {time.perf_counter() - t1:.1f} s, "
+              f"{store.count():,} left")
+        med, p99 = _percentiles([_timed_search(store, ["meeting"]) for _ in range(rounds)])
+        print(f"  'meeting' after prune: median {med:.3f} ms  p99 {p99:.3f} ms")
+        store.close()
+
+
+def _timed_search(store, terms):
+    t0 = time.perf_counter()
+    store.search(terms)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
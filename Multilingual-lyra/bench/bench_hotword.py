@@ -0,0 +1,93 @@
+"""
+Hotword spotter benchmark on recorded fixtures.
+
+    fixtures/hotword/positive/*.wav   clips that contain the hotword
+    fixtures/hotword/negative/*.wav   ambient audio, TV, other speech (no hotword)
+
+Generated by `python -m bench.fixtures` (written there first if the directory is missing);
+real recordings can be dropped in alongside.
+
+Reports detection latency per window, false-accept / false-reject rates, false
+accepts per hour of negative audio, and CPU-seconds spent per hour of listening
+(plus the idle cost when the energy gate rejects everything).
+Run from Multilingual-lyra/:
+    python -m bench.bench_hotword --fixtures fixtures/hotword --detector template --enroll 3
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+
+import numpy as np
+
+from modules.audio import SAMPLE_RATE, read_wav
+from modules.kws import KeywordSpotter, TemplateDetector, WhisperDetector
+
+WINDOW_S = 3.0  # HotwordThread listens in phrases of up to 3 s
+
+
+def _windows(x: np.ndarray):
+    step = int(WINDOW_S * SAMPLE_RATE)
+    for start in range(0, max(1, len(x)), step):
+        yield x[start:start + step]
+
+
+def _run(spotter: KeywordSpotter, clips: list[np.ndarray]):
+    hits, latencies = [], []
+    cpu0 = time.process_time()
+    for clip in clips:
+        fired = False
+        for window in _windows(clip):
+            t0 = time.perf_counter()
+            fired = spotter.detect(window) or fired
+            latencies.append(time.perf_counter() - t0)
+        hits.append(fired)
+    return hits, latencies, time.process_time() - cpu0
+
+
+def run(fixtures: str, detector: str, enroll: int, sensitivity: float, hotword: str):
+    positives = [read_wav(p) for p in sorted(glob.glob(os.path.join(fixtures, "positive", "*.wav")))]
+    negatives = [read_wav(p) for p in sorted(glob.glob(os.path.join(fixtures, "negative", "*.wav")))]
+    if not positives or not negatives:
+        raise SystemExit(f"need WAVs under {fixtures}/positive and {fixtures}/negative (python -m bench.fixtures)")
+
+    if detector == "template":
+        templates, positives = positives[:enroll], positives[enroll:]
+        spotter = KeywordSpotter(TemplateDetector(templates, sensitivity=sensitivity))
+    else:
+        spotter = KeywordSpotter(WhisperDetector(hotword, sensitivity=sensitivity))
+
+    pos_hits, pos_lat, pos_cpu = _run(spotter, positives)
+    neg_hits, neg_lat, neg_cpu = _run(spotter, negatives)
+    audio_s = sum(len(c) for c in positives + negatives) / SAMPLE_RATE
+    neg_hours = sum(len(c) for c in negatives) / SAMPLE_RATE / 3600
+
+    idle = KeywordSpotter(spotter.detector)
+    quiet = (np.random.default_rng(0).normal(0, 3e-3, int(60 * SAMPLE_RATE))).astype(np.float32)
+    _, _, idle_cpu = _run(idle, [quiet])
+
+    print(f"detector: {detector}  sensitivity: {sensitivity}")
+    print(f"detection latency per window: median {statistics.median(pos_lat) * 1e3:.0f} ms, "
+          f"p95 {sorted(pos_lat)[int(0.95 * (len(pos_lat) - 1))] * 1e3:.0f} ms")
+    print(f"false reject: {pos_hits.count(False)}/{len(pos_hits)}  "
+          f"false accept: {neg_hits.count(True)}/{len(neg_hits)} "
+          f"({neg_hits.count(True) / max(neg_hours, 1e-9):.1f} per hour of negatives)")
+    print(f"CPU: {(pos_cpu + neg_cpu) / audio_s * 3600:.0f} s per hour on fixtures, "
+          f"{idle_cpu / 60 * 3600:.1f} s per hour in a quiet room (gate only)")
+    print(f"windows rejected by energy gate: {spotter.gated}/{spotter.windows}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", default="fixtures/hotword")
+    ap.add_argument("--detector", choices=("template", "whisper"), default="template")
+    ap.add_argument("--enroll", type=int, default=3, help="positives used as templates (template detector)")
+    ap.add_argument("--sensitivity", type=float, default=0.5)
+    ap.add_argument("--hotword", default="lyra")
+    args = ap.parse_args()
+    if not os.path.isdir(args.fixtures):
+        from bench.fixtures import generate_hotword
+        print(f"{args.fixtures}: " + ", ".join(f"{n} {kind}" for kind, n in
+                                               generate_hotword(args.fixtures, args.hotword).items()))
+    run(args.fixtures, args.detector, args.enroll, args.sensitivity, args.hotword)
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark for modules/intents.IntentMatcher.
+
+Grows the vocabulary from a few dozen phrases to several thousand and times
+one classification per utterance, next to the old "any(word in t ...)" scan.
+Run from Multilingual-lyra/:  python -m bench.bench_intents
+"""
+import random
+import time
+
+from modules.intents import IntentMatcher
+
+UTTERANCES = [
+    "hey lyra open notepad please",
+    "what is the weather in bangalore",
+    "मौसम कैसा है आज",
+    "turn the volume up a little",
+    "ನಮಸ್ಕಾರ ಹಲೋ",
+    "can you search the latest cricket score",
+    "I feel really stressed about the exam tomorrow",
+    "this sentence has no command in it at all",
+]
+SCRIPTS = [(0x61, 26), (0x0905, 40), (0x0C85, 40), (0x0B85, 30), (0x0C05, 40)]
+
+
+def _fake_phrase(rng: random.Random) -> str:
+    start, span = rng.choice(SCRIPTS)
+    words = rng.randint(1, 3)
+    return " ".join(
+        "".join(chr(start + rng.randrange(span)) for _ in range(rng.randint(3, 8)))
+        for _ in range(words)
+    )
+
+
+def _linear(table, text):
+    t = text.lower()
+    for intent, words in table:
+        if any(w in t for w in words):
+            return intent
+    return "GENERAL"
+
+
+def run(sizes=(50, 500, 2000, 5000, 10000), rounds=2000):
+    rng = random.Random(0)
+    print(f"{'phrases':>8} {'trie us/call':>13} {'linear us/call':>15}")
+    for size in sizes:
+        table = [(f"INTENT_{i}", [_fake_phrase(rng) for _ in range(size // 20)]) for i in range(20)]
+        matcher = IntentMatcher()
+        for prio, (intent, words) in enumerate(table):
+            matcher.add(intent, words, prio)
+
+        t0 = time.perf_counter()
+        for i in range(rounds):
+            matcher.match(UTTERANCES[i % len(UTTERANCES)])
+        trie_us = (time.perf_counter() - t0) / rounds * 1e6
+
+        t0 = time.perf_counter()
+        for i in range(rounds):
+            _linear(table, UTTERANCES[i % len(UTTERANCES)])
+        linear_us = (time.perf_counter() - t0) / rounds * 1e6
+        print(f"{size:>8} {trie_us:>13.2f} {linear_us:>15.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,118 @@
+"""
+Language ID: what pinning Whisper's language saves, and how often the session prior lets us.
+
+1. ASR: the cost of Whisper's detection pass (encoder over a 30 s mel window + one decoder
+   step), which is exactly what a fixed `language=` skips, per model size. Needs whisper.
+   With --wav, also end-to-end transcribe() latency with and without `language=`.
+2. A scripted session (mostly Hindi, a code-switch to English, back again): how many
+   utterances run detection vs get a pinned language. A decode pinned to Hindi of English
+   speech comes back transliterated and with a low avg_logprob (what Whisper does); that is
+   what has to trigger the re-decode with detection, not the clean English transcript.
+3. Text: langdetect per call vs the seeded cache vs the script shortcut.
+Run from Multilingual-lyra/:  python -m bench.bench_langid [--models tiny base] [--wav clip.wav]
+"""
+import argparse
+import statistics
+import time
+
+from langdetect import detect_langs
+
+from modules.langid import LanguageID, _detect_cached, detect_scores
+
+SESSION = [  # (language Whisper detects, transcript, what a decode pinned to Hindi gives, its avg_logprob)
+    ("hi", "मुझे कल की मीटिंग याद दिलाना", None, -0.3), ("hi", "आज मौसम कैसा है", None, -0.25),
+    ("hi", "नोटपैड खोलो", None, -0.4), ("hi", "संगीत चलाओ", None, -0.3), ("hi", "आवाज़ बढ़ाओ", None, -0.35),
+    ("en", "can you search for the train timings to Mysore", "कैन यू सर्च फॉर द ट्रेन टाइमिंग्स टू मैसूर", -1.3),
+    ("en", "what is the weather in Bangalore today", "व्हाट इज़ द वेदर इन बैंगलोर टुडे", -1.2),
+    ("en", "open the calculator for me please", "ओपन द कैलकुलेटर फॉर मी प्लीज़", -1.25),
+    ("en", "thank you that is all for now", "थैंक यू दैट इज़ ऑल फॉर नाउ", -1.1),
+    ("hi", "ठीक है धन्यवाद", None, -0.3), ("hi", "समय क्या हुआ है", None, -0.3), ("hi", "स्क्रीनशॉट लो", None, -0.45),
+]
+TEXTS = ["open notepad please", "what is the weather in Bangalore today", "मुझे कल की मीटिंग याद दिलाना",
+         "quel temps fait-il à Paris", "ನನಗೆ ಸಹಾಯ ಮಾಡಿ"]
+
+
+def _ms(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1e3
+
+
+def bench_asr(models: list[str], wav: str | None, rounds: int) -> dict:
+    try:
+        import whisper
+    except ImportError:
+        print("whisper not installed; skipping the ASR measurements")
+        return {}
+    import numpy as np
+    from modules.audio import read_wav
+    saved = {}
+    for name in models:
+        model = whisper.load_model(name)
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(np.zeros(16000, dtype=np.float32)),
+                                          model.dims.n_mels).to(model.device)
+        model.detect_language(mel)  # warm-up
+        saved[name] = _ms(lambda: model.detect_language(mel), rounds)
+        print(f"{name:>6}: detection pass {saved[name]:7.1f} ms  (saved per utterance when language is pinned)")
+        if wav:
+            audio = read_wav(wav)
+            auto = _ms(lambda: model.transcribe(audio), max(3, rounds // 3))
+            lang = model.transcribe(audio)["language"]
+            fixed = _ms(lambda: model.transcribe(audio, language=lang), max(3, rounds // 3))
+            print(f"        transcribe({wav}): auto {auto:.0f} ms, language={lang!r} {fixed:.0f} ms")
+    return saved
+
+
+def bench_session(saved: dict):
+    langid = LanguageID()
+    pins = []
+    for reported, text, forced, logprob in SESSION:
+        pinned = langid.asr_language("demo", setting="hi")
+        # A pinned decode reports the pinned language; a free one reports what Whisper found
+        lang, how = reported, "detect"
+        if pinned:
+            how = f"pinned {pinned}"
+            if pinned == reported:
+                lang = pinned
+            elif langid.needs_redecode(forced or text, pinned, logprob if pinned == "hi" else None):
+                how += ", re-decoded"
+            else:
+                lang, text = pinned, forced or text  # the garbled pinned decode is what the turn gets
+        lang = langid.observe_transcript("demo", text, lang, pinned)
+        pins.append(pinned)
+        print(f"  {how:<22} -> {lang}  {text}")
+    n_pinned = sum(p is not None for p in pins)
+    print(f"{n_pinned}/{len(SESSION)} utterances pinned, {langid.redecodes} re-decoded, "
+          f"{langid.code_switches} code-switch(es) caught")
+    for name, ms in saved.items():
+        print(f"  {name}: ~{ms * n_pinned / len(SESSION):.0f} ms saved per utterance on average")
+
+
+def bench_text(rounds: int):
+    for text in TEXTS:
+        raw = _ms(lambda: detect_langs(text), rounds)
+        _detect_cached.cache_clear()
+        detect_scores(text)
+        cached = _ms(lambda: detect_scores(text), rounds)
+        print(f"  {text[:32]:<34} langdetect {raw:6.2f} ms  cached {cached * 1e3:6.1f} us  "
+              f"-> {LanguageID().text_language(text)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=["tiny", "base"])
+    parser.add_argument("--wav", default=None)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    saved = bench_asr(args.models, args.wav, args.rounds)
+    print("\nscripted session (UI language: hi):")
+    bench_session(saved)
+    print("\ntext detection:")
+    bench_text(args.rounds)
+
+
+if __name__ == "__main__":
+    main()
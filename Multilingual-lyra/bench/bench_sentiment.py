@@ -0,0 +1,73 @@
+"""
+fp32 vs dynamic-int8 SentimentModel: accuracy on a small labelled multilingual set,
+agreement between the two, and single / batched latency (memo bypassed).
+Run from Multilingual-lyra/:  python -m bench.bench_sentiment
+"""
+import statistics
+import time
+
+from modules.emotions import SentimentModel
+
+LABELLED = [
+    ("I am so happy today, everything is great", "POSITIVE"),
+    ("This is awesome, thank you so much", "POSITIVE"),
+    ("I feel really sad and lonely", "NEGATIVE"),
+    ("I'm stressed and angry about work", "NEGATIVE"),
+    ("It was okay, nothing special", "NEUTRAL"),
+    ("The movie was fine I guess", "NEUTRAL"),
+    ("मैं आज बहुत खुश हूँ", "POSITIVE"),
+    ("मुझे बहुत गुस्सा आ रहा है", "NEGATIVE"),
+    ("यह ठीक है", "NEUTRAL"),
+    ("Estoy muy feliz y contento", "POSITIVE"),
+    ("Estoy triste y estresado", "NEGATIVE"),
+    ("Está bien, normal", "NEUTRAL"),
+    ("C'est formidable, j'adore", "POSITIVE"),
+    ("Je suis déprimé et fatigué", "NEGATIVE"),
+    ("Questo è super, bellissimo", "POSITIVE"),
+    ("Sono molto arrabbiato", "NEGATIVE"),
+]
+
+
+def _measure(model: SentimentModel, rounds: int = 5) -> dict:
+    texts = [t for t, _ in LABELLED]
+    preds = model._pipe(texts, batch_size=len(texts), truncation=True)
+    labels = [SentimentModel._label(p) for p in preds]
+    accuracy = sum(p == gold for p, (_, gold) in zip(labels, LABELLED)) / len(LABELLED)
+
+    single = []
+    for _ in range(rounds):
+        for t in texts:
+            t0 = time.perf_counter()
+            model._pipe(t, truncation=True)
+            single.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        model._pipe(texts, batch_size=len(texts), truncation=True)
+    batched = (time.perf_counter() - t0) / (rounds * len(texts))
+    return {
+        "labels": labels,
+        "accuracy": accuracy,
+        "single_ms": statistics.median(single) * 1e3,
+        "batched_ms_per_text": batched * 1e3,
+    }
+
+
+def run():
+    results = {}
+    for name, quantize in (("fp32", False), ("int8", True)):
+        t0 = time.perf_counter()
+        model = SentimentModel(quantize=quantize)
+        load = time.perf_counter() - t0
+        model.classify("warm up")
+        results[name] = _measure(model)
+        results[name]["load_s"] = load
+
+    agree = sum(a == b for a, b in zip(results["fp32"]["labels"], results["int8"]["labels"])) / len(LABELLED)
+    print(f"{'model':<6} {'load s':>7} {'accuracy':>9} {'single ms':>10} {'batched ms/text':>16}")
+    for name, r in results.items():
+        print(f"{name:<6} {r['load_s']:>7.1f} {r['accuracy']:>9.0%} {r['single_ms']:>10.1f} {r['batched_ms_per_text']:>16.1f}")
+    print(f"fp32/int8 label agreement: {agree:.0%}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,118 @@
+"""
+Time-to-action: streaming partial transcription vs the whole-utterance path.
+
+Scripted commands are played into a CaptureBus in real time and endpointed with
+capture.listen, exactly as RecorderThread does. Time-to-action is measured from the end of
+the last word of the command to the moment LyraCore acts on it:
+  whole:     end-of-phrase silence (end_silence_s) + full decode of the phrase + respond
+  streaming: the first stable partial that reads as an eager intent + respond
+Words are synthetic tones, one pitch per word, and the fake Whisper "hears" them from the
+pitch; a word cut off at the end of the window comes out truncated, as a real partial
+decode would garble it. Decode latency is modelled per tier (--tiny-ms / --base-ms, fixed +
+per second of audio), defaults roughly a laptop CPU. Nothing is executed on the host.
+Run from Multilingual-lyra/:  python -m bench.bench_streaming [--step 0.5]
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from bench.fakes import GAP_S, WORD_S, FakeSentiment, FakeWhisper, ready_slot, tone_words
+from modules.asr import CascadeASR
+from modules.audio import SAMPLE_RATE
+from modules.capture import FRAME, CaptureBus, NoiseFloor, listen
+from modules.streaming import StreamingRecognizer
+
+VOCAB = ["volume", "up", "down", "brightness", "take", "a", "screenshot", "what", "time", "is", "it",
+         "please", "now", "and", "then", "open", "notepad", "dim", "the", "screen", "lights"]
+SCRIPT = [  # (utterance, words that make up the command)
+    ("volume up", 2),
+    ("volume down please", 2),
+    ("brightness up", 2),
+    ("take a screenshot now", 3),
+    ("what time is it", 2),
+    ("dim the screen please", 1),
+    ("volume up and then open notepad", 2),
+    ("open notepad", 2),  # not eager: both paths wait for the endpoint
+]
+
+
+def make_core(tiny: tuple, base: tuple):
+    from lyra_core import LyraCore
+    from modules.history import HistoryStore
+    speeds = {"tiny": tiny, "base": base}
+    models = {
+        "asr": ready_slot("Whisper", lambda: CascadeASR("tiny,base", load=lambda m: FakeWhisper(VOCAB, *speeds[m]))),
+        "sentiment": ready_slot("Sentiment", FakeSentiment),
+    }
+    core = LyraCore(headless=True, actions=False, history=HistoryStore(None), models=models)
+    core.asr.preload()
+    return core
+
+
+def play(bus: CaptureBus, audio: np.ndarray, marks: dict):
+    """Feed the bus in real time; records when the command's last word finished."""
+    lead = np.random.default_rng(1).normal(0, 3e-4, int(0.5 * SAMPLE_RATE)).astype(np.float32)
+    tail = np.random.default_rng(2).normal(0, 3e-4, int(1.5 * SAMPLE_RATE)).astype(np.float32)
+    clip = np.concatenate([lead, audio, tail])
+    command_end = len(lead) + marks["command_samples"]
+    t0 = time.perf_counter()
+    for i in range(0, len(clip), FRAME):
+        bus.feed(clip[i:i + FRAME])
+        if "command_end" not in marks and i + FRAME >= command_end:
+            marks["command_end"] = time.perf_counter()
+        time.sleep(max(0.0, t0 + (i + FRAME) / SAMPLE_RATE - time.perf_counter()))
+
+
+def run_one(core, sentence: str, n_command: int, streaming: bool, step_s: float) -> dict:
+    bus = CaptureBus()
+    bus.noise = NoiseFloor(path=os.devnull, default_db=-60.0)
+    reader = bus.reader()
+    marks = {"command_samples": int(n_command * (WORD_S + GAP_S) * SAMPLE_RATE - GAP_S * SAMPLE_RATE)}
+    stream = None
+    if streaming:
+        stream = StreamingRecognizer(core, step_s=step_s,
+                                     on_action=lambda out: marks.setdefault("acted", time.perf_counter()))
+    feeder = threading.Thread(target=play, args=(bus, tone_words(sentence, VOCAB), marks))
+    feeder.start()
+    samples = listen(reader, bus.noise, lambda: True,
+                     on_speech_start=stream.start if stream else None, on_frame=stream.feed if stream else None)
+    early = stream.stop() if stream else None
+    out = core.process_pcm(samples, early=early)
+    done = time.perf_counter()
+    feeder.join()
+    acted = marks["acted"] if out.get("early") else done  # an undone early action doesn't count
+    return {"text": out["user_text"], "intent": out["intent"], "early": bool(out.get("early")),
+            "undone": out.get("early_intent"), "ms": (acted - marks["command_end"]) * 1e3,
+            "decodes": stream.decodes if stream else 1}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--step", type=float, default=0.5, help="seconds of new audio between partial decodes")
+    parser.add_argument("--tiny-ms", type=float, nargs=2, default=[60, 40], help="fixed, per second of audio")
+    parser.add_argument("--base-ms", type=float, nargs=2, default=[180, 120])
+    args = parser.parse_args()
+    core = make_core(tuple(args.tiny_ms), tuple(args.base_ms))
+
+    rows = {"whole": [], "streaming": []}
+    print(f"{'utterance':<34} {'whole':>9} {'streaming':>10}  intent")
+    for sentence, n_command in SCRIPT:
+        whole = run_one(core, sentence, n_command, False, args.step)
+        stream = run_one(core, sentence, n_command, True, args.step)
+        rows["whole"].append(whole["ms"])
+        rows["streaming"].append(stream["ms"])
+        flag = "early" if stream["early"] else f"final, undid {stream['undone']}" if stream["undone"] else "final"
+        print(f"{sentence:<34} {whole['ms']:7.0f} ms {stream['ms']:7.0f} ms  {stream['intent']} "
+              f"({flag}, {stream['decodes']} partial decodes)"
+              + ("" if whole["intent"] == stream["intent"] else f"  MISMATCH whole={whole['intent']}"))
+    for name, ms in rows.items():
+        print(f"{name:<10} time-to-action after the command's last word: median {statistics.median(ms):.0f} ms, "
+              f"max {max(ms):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+search_and_summarise end to end against a local stand-in for DuckDuckGo and the result pages:
+a normal article, a page that trickles in slower than the budget, a 50 MB page,
+malformed HTML, a binary blob and a 404. Checks that the reply arrives within the
+time budget, that the huge page is cut at the byte cap, and which pages fell back
+to their snippet.
+Run from Multilingual-lyra/:  python -m bench.bench_summarise
+"""
+import time
+
+from bench.stubs import StubServer
+from modules.summariser import summarise_results
+from modules.websearch import SearchClient, search_and_summarise
+
+ARTICLE = b"""<html><head><title>Lyra</title><script>var junk = 1;</script></head><body>
+<nav><ul><li>Home</li><li>About us and all the other menu items that are long enough</li></ul></nav>
+<article>
+<p>Lyra is a small constellation in the northern sky, named after the lyre of Orpheus in Greek mythology.</p>
+<p>Its brightest star, Vega, is one of the brightest stars in the night sky and forms part of the Summer Triangle.</p>
+<p>The constellation also contains the Ring Nebula, a famous planetary nebula visible in small telescopes.</p>
+<p>Unrelated filler sentence about cooking pasta with lots of garlic and olive oil for dinner tonight.</p>
+</article><footer><p>Copyright notice and cookie banner text that should never be read out loud.</p></footer>
+</body></html>"""
+MALFORMED = b"<html><body><p>Vega in the constellation Lyra was the northern pole star around 12000 BC <div><p>and will be again"
+SENT = {"huge": 0}
+
+
+def slow_page(req):
+    def body():
+        yield b"<html><body><p>The slow page about Lyra and Vega finally starts to arrive here.</p>"
+        time.sleep(10)
+        yield b"</body></html>"
+    return 200, "text/html", body()
+
+
+def huge_page(req):
+    def body():
+        chunk = b"<p>" + b"Lyra filler text that never ends. " * 100 + b"</p>"
+        for _ in range(50 * 1024 * 1024 // len(chunk)):
+            SENT["huge"] += len(chunk)
+            yield chunk
+    return 200, "text/html", body()
+
+
+ROUTES = {
+    "/article": lambda req: (200, "text/html; charset=utf-8", ARTICLE),
+    "/slow": slow_page,
+    "/huge": huge_page,
+    "/malformed": lambda req: (200, "text/html", MALFORMED),
+    "/binary": lambda req: (200, "application/octet-stream", bytes(range(256)) * 1000),
+    "/missing": lambda req: (404, "text/html", b"<p>gone</p>"),
+}
+
+
+def _serp(base: str) -> bytes:
+    rows = "".join(
+        f'<div><a class="result__a" href="{base}{path}">{path.strip("/")} result</a>'
+        f'<a class="result__snippet">Snippet for {path.strip("/")}: Lyra is a constellation.</a></div>'
+        for path in ROUTES
+    )
+    return f"<html><body>{rows}</body></html>".encode()
+
+
+def run(budget_s: float = 2.0):
+    with StubServer({}) as srv:
+        srv.httpd.routes.update(ROUTES)
+        srv.httpd.routes["/html/"] = lambda req: (200, "text/html", _serp(srv.url))
+        client = SearchClient(url=srv.url + "/html/")
+        results = client.search("lyra constellation")
+
+        out = summarise_results("lyra constellation vega", results, budget_s=budget_s, max_bytes=256 * 1024)
+        print(f"budget {budget_s:.1f}s -> fetched+summarised in {out['elapsed']:.2f}s")
+        for r, ok in zip(results, out["fetched"]):
+            print(f"  {r['title']:<18} {'page' if ok else 'snippet fallback'}")
+        print(f"huge page: server produced {SENT['huge'] / 1e6:.1f} MB before the client stopped reading")
+        print("summary:")
+        for sentence, i in out["sentences"]:
+            print(f"  - {sentence}  [{results[i]['title']}]")
+
+        t0 = time.perf_counter()
+        reply = search_and_summarise("search lyra constellation", n_results=len(ROUTES), client=client, budget_s=budget_s)
+        print(f"\nsearch_and_summarise reply in {time.perf_counter() - t0:.2f}s:\n{reply}")
+
+
+if __name__ == "__main__":
+    run()
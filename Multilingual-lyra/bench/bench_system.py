@@ -0,0 +1,47 @@
+"""
+System controls: cost of a process spawn per action vs a command on a persistent shell,
+and how a burst of "volume up" commands is coalesced by the Controller (fake backend with
+a configurable per-call latency standing in for a slow OS API).
+Run from Multilingual-lyra/:  python -m bench.bench_system
+"""
+import statistics
+import subprocess
+import time
+
+from modules.system import Controller, FakeBackend, ShellSession
+
+
+def _timed(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1e3
+
+
+def run(rounds: int = 30, burst: int = 10, latency_s: float = 0.05):
+    shell = ShellSession(["bash", "--noprofile", "--norc"])
+    shell.run("true")
+    print(f"spawn per action:  {_timed(lambda: subprocess.run(['bash', '-c', 'true']), rounds):6.2f} ms")
+    print(f"persistent shell:  {_timed(lambda: shell.run('true'), rounds):6.2f} ms")
+    shell.close()
+
+    backend = FakeBackend(latency_s=latency_s)
+    controller = Controller(backend, coalesce_s=0.15)
+    controller.level("volume")
+    t0 = time.perf_counter()
+    for _ in range(burst):
+        controller.adjust("volume", 10)
+    queued_ms = (time.perf_counter() - t0) * 1e3
+    controller.flush()
+    applied_ms = (time.perf_counter() - t0) * 1e3
+    sets = [c for c in backend.calls if c[0] == "set"]
+    print(f"\n{burst} x 'volume up' (backend {latency_s * 1e3:.0f} ms/call):")
+    print(f"  returned to caller after {queued_ms:6.2f} ms, applied after {applied_ms:6.1f} ms")
+    print(f"  backend set calls: {len(sets)} {sets}  (uncoalesced: {burst} calls, {burst * latency_s * 1e3:.0f} ms)")
+    controller.close()
+
+
+if __name__ == "__main__":
+    run()
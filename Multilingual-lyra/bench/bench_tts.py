@@ -0,0 +1,105 @@
+"""
+Time to first audio for long replies: the whole reply synthesized in one call and then
+played (the old speak()) vs sentence-chunked speech (modules.speech), where the first
+sentence plays while the rest is synthesized.
+
+Replies are shaped like search_and_summarise output (a header plus N "• sentence (title)"
+bullets). The TTS engine is bench.fakes.FakeTTS with a gTTS-like cost (--tts-ms FIXED
+PER_CHAR) and playback is bench.fakes.FakePygame; both run --speed times faster than real
+time and every figure is scaled back, so the table reads in real-time ms. "gaps" is the
+silence between sentences when synthesis falls behind playback (a sentence queued after
+the previous one finished). The last row is search_and_summarise's own reply from the
+local search stub.
+Run from Multilingual-lyra/:  python -m bench.bench_tts [--bullets 1 3 6 12] [--speed 20]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from bench.fakes import build_core
+from modules.tts_cache import TTSCache
+from modules.websearch import search_and_summarise
+
+SENTENCES = [
+    "Lyra is a small constellation in the northern sky, named after the lyre of Orpheus.",
+    "Its brightest star, Vega, is one of the brightest stars in the night sky.",
+    "The Ring Nebula is a planetary nebula in Lyra, visible in small telescopes.",
+    "Vega was the northern pole star around 12,000 BC and will be again around 13,727 AD.",
+    "The Lyrids meteor shower peaks every April and is among the oldest recorded showers.",
+    "Kepler's field of view was centred on a patch of sky spanning Lyra and Cygnus.",
+    "Epsilon Lyrae, the Double Double, is a quadruple star system resolvable with a telescope.",
+    "Ptolemy listed Lyra among his 48 constellations in the second century.",
+]
+
+
+def search_reply(bullets: int, seed: int) -> str:
+    rows = [f"• {SENTENCES[(seed + i) % len(SENTENCES)]} (Result {i} #{seed})" for i in range(bullets)]
+    return "Here’s what I found about “lyra”: \n" + "\n".join(rows)
+
+
+def measure(core, fakes, speak, speed: float) -> tuple[float, float]:
+    """(time to first audio, total silence between sentences) in real-time ms."""
+    core.tts_cache = TTSCache(tempfile.mkdtemp(prefix="lyra_tts_bench_"))  # every run synthesizes
+    music = fakes.pygame.mixer.music
+    music.starts, music.played = [], []
+    queued, enqueue = [], core.player.enqueue
+
+    def timed_enqueue(*args, **kwargs):
+        ok = enqueue(*args, **kwargs)
+        queued.append(time.monotonic())
+        return ok
+
+    core.player.enqueue = timed_enqueue
+    try:
+        t0 = time.monotonic()
+        speak()
+        core.speech.wait_idle(120)
+    finally:
+        del core.player.enqueue
+    # judged from when each sentence was ready, not when the player's poll loop got to it
+    ends = [start + seconds / speed for start, seconds in zip(music.starts, music.played)]
+    gaps = sum(max(0.0, queued[i + 1] - ends[i]) for i in range(len(queued) - 1))
+    return (music.starts[0] - t0) * speed * 1e3, gaps * speed * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bullets", type=int, nargs="+", default=[1, 3, 6, 12])
+    parser.add_argument("--tts-ms", type=float, nargs=2, default=(300.0, 5.0), metavar=("FIXED", "PER_CHAR"))
+    parser.add_argument("--speed", type=float, default=20.0, help="fake time runs this many times faster")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    core, fakes = build_core([])
+    fakes.pygame.mixer.music.speed = args.speed
+    fakes.tts.latency_s = args.tts_ms[0] / 1e3 / args.speed
+    fakes.tts.per_char_s = args.tts_ms[1] / 1e3 / args.speed
+
+    def whole(reply):
+        audio, fmt = core._synthesize(reply, "en")
+        core.player.enqueue(audio, fmt)
+
+    try:
+        print(f"{'reply':<18} {'chars':>6} {'whole: first ms':>16} {'chunked: first ms':>18} {'gaps ms':>8}")
+        for n in args.bullets:
+            rows = {"whole": [], "chunked": [], "gaps": []}
+            for r in range(args.rounds):
+                reply = search_reply(n, seed=r)
+                rows["whole"].append(measure(core, fakes, lambda: whole(reply), args.speed)[0])
+                first, gaps = measure(core, fakes, lambda: core.speak(reply, "en"), args.speed)
+                rows["chunked"].append(first)
+                rows["gaps"].append(gaps)
+            print(f"{f'search, {n} bullets':<18} {len(search_reply(n, 0)):>6} {statistics.median(rows['whole']):>16.0f} "
+                  f"{statistics.median(rows['chunked']):>18.0f} {statistics.median(rows['gaps']):>8.0f}")
+
+        reply = search_and_summarise("search lyra constellation")
+        whole_first = measure(core, fakes, lambda: whole(reply), args.speed)[0]
+        first, gaps = measure(core, fakes, lambda: core.speak(reply, "en"), args.speed)
+        print(f"{'stub search':<18} {len(reply):>6} {whole_first:>16.0f} {first:>18.0f} {gaps:>8.0f}")
+    finally:
+        fakes.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+WeatherService against a local fake Open-Meteo server (fixture JSON, configurable
+delay and failures): cold vs cached latency, stale-while-revalidate, coalescing of
+simultaneous requests for one city, and behaviour when the upstream fails.
+Run from Multilingual-lyra/:  python -m bench.bench_weather
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from bench.stubs import StubServer
+from modules.weather import OpenMeteoProvider, WeatherService, get_weather
+
+PLACES = {
+    "bangalore": {"name": "Bengaluru", "latitude": 12.97, "longitude": 77.59},
+    "delhi": {"name": "New Delhi", "latitude": 28.61, "longitude": 77.21},
+    "chennai": {"name": "Chennai", "latitude": 13.08, "longitude": 80.27},
+}
+FAKE = {"delay": 0.08, "fail": False}
+
+
+def _json(obj) -> tuple[int, str, bytes]:
+    return 200, "application/json", json.dumps(obj).encode()
+
+
+def geocode(req):
+    time.sleep(FAKE["delay"])
+    if FAKE["fail"]:
+        return 503, "application/json", b"{}"
+    name = parse_qs(urlparse(req.path).query).get("name", [""])[0].lower()
+    place = PLACES.get(name)
+    return _json({"results": [place]} if place else {})
+
+
+def forecast(req):
+    time.sleep(FAKE["delay"])
+    if FAKE["fail"]:
+        return 503, "application/json", b"{}"
+    lat = float(parse_qs(urlparse(req.path).query)["latitude"][0])
+    return _json({"current": {"temperature_2m": 20 + lat / 3, "weather_code": 2}})
+
+
+def _ms(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1e3
+
+
+def run():
+    with StubServer({"/v1/search": geocode, "/v1/forecast": forecast}) as srv:
+        provider = OpenMeteoProvider(geocode_url=srv.url + "/v1/search", forecast_url=srv.url + "/v1/forecast")
+        service = WeatherService(provider, ttl=0.5, stale_ttl=60)
+        print(f"fake upstream delay: {FAKE['delay'] * 1e3:.0f} ms per call (geocode + forecast)")
+
+        print(f"cold:   {_ms(lambda: service.get('Bangalore')):7.1f} ms  -> {get_weather('Bangalore', service)}")
+        print(f"cached: {_ms(lambda: service.get('bangalore ')):7.3f} ms")
+
+        before = provider.requests
+        with ThreadPoolExecutor(20) as pool:
+            list(pool.map(lambda _: service.get("Delhi"), range(20)))
+        print(f"20 simultaneous 'Delhi' lookups -> {provider.requests - before} upstream calls")
+
+        time.sleep(0.6)  # past ttl: stale but servable
+        before = provider.requests
+        print(f"stale:  {_ms(lambda: service.get('Bangalore')):7.3f} ms (served stale, refreshing in background)")
+        time.sleep(FAKE["delay"] * 3)
+        print(f"        background refresh made {provider.requests - before} upstream calls")
+
+        FAKE["fail"] = True
+        time.sleep(0.6)
+        print(f"upstream down, cached city: {get_weather('Bangalore', service)}")
+        print(f"upstream down, new city:    {get_weather('Chennai', service)}")
+        FAKE["fail"] = False
+        print(f"unknown city:               {get_weather('Atlantis', service)}")
+
+
+if __name__ == "__main__":
+    run()
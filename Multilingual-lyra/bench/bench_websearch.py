@@ -0,0 +1,81 @@
+"""
+SearchClient against a local stub serving canned DuckDuckGo HTML.
+
+cold   = new client per query (new TCP connection, empty cache)
+warm   = one client, cache disabled (pooled keep-alive connection)
+cached = one client, repeated query served from the TTL cache
+On loopback a new connection is nearly free, so cold vs warm mostly shows up against the
+real endpoint (TLS handshake per query); parse time for lxml vs html.parser is reported too.
+Also checks that concurrent identical queries are coalesced into one upstream call.
+Run from Multilingual-lyra/:  python -m bench.bench_websearch
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from bench.stubs import StubServer
+from modules import websearch
+from modules.websearch import SearchClient
+
+RESULT = (
+    '<div class="result"><h2><a class="result__a" href="https://example.org/{i}">Result {i} about {q}</a></h2>'
+    '<a class="result__snippet">Snippet number {i} with some text about {q} and more words.</a></div>'
+)
+UPSTREAM_DELAY = 0.02
+
+
+def canned_page(query: str) -> bytes:
+    body = "".join(RESULT.format(i=i, q=query) for i in range(10))
+    return f"<html><head><title>{query}</title></head><body>{body}</body></html>".encode()
+
+
+def ddg_handler(req):
+    time.sleep(UPSTREAM_DELAY)  # stand-in for DuckDuckGo's own processing time
+    query = req.body.decode().partition("q=")[2].replace("+", " ")
+    return 200, "text/html", canned_page(query)
+
+
+def _timed(fn, rounds):
+    samples = []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1e3
+
+
+def run(rounds: int = 30):
+    with StubServer({"/html/": ddg_handler}) as srv:
+        url = srv.url + "/html/"
+
+        def cold(i):
+            c = SearchClient(url=url, ttl=0)
+            c.search(f"cold query {i}")
+            c.close()
+
+        warm_client = SearchClient(url=url, ttl=0)
+        warm_client.search("prime the pool")
+        cached_client = SearchClient(url=url)
+        cached_client.search("same question")
+
+        print(f"stub upstream delay: {UPSTREAM_DELAY * 1e3:.0f} ms")
+        print(f"cold:   {_timed(cold, rounds):7.2f} ms/query")
+        print(f"warm:   {_timed(lambda i: warm_client.search(f'warm query {i}'), rounds):7.2f} ms/query")
+        print(f"cached: {_timed(lambda i: cached_client.search('Same   Question'), rounds):7.3f} ms/query")
+
+        burst = SearchClient(url=url)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: burst.search("everyone asks this"), range(8)))
+        print(f"8 concurrent identical queries -> {burst.upstream_requests} upstream request(s)")
+        print(f"first hit: {burst.search('lyra assistant')[0]['title']}")
+
+    page = canned_page("parser speed").decode()
+    for parser in ("html.parser", websearch._PARSER):
+        ms = _timed(lambda i: BeautifulSoup(page, parser).select("a.result__a"), rounds)
+        print(f"parse with {parser:<11} {ms:6.2f} ms/page")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,299 @@
+"""
+Stand-ins that let LyraCore run without a microphone, speakers, models or network:
+
+    core, fakes = build_core(vocab)     # every fake below, installed
+    core.process_pcm(tone_words("volume up", vocab))
+
+- FakeWhisper   "hears" tone words: one pitch per vocabulary word (see tone_words)
+- FakeSentiment keyword sentiment, no transformers
+- FakePygame    a mixer that "plays" a clip for its duration, for PlaybackQueue
+- fake TTS      silent WAV sized like the spoken reply, instead of gTTS / pyttsx3
+- search        a StubServer serving a results page and an article (modules.websearch)
+- weather       FakeWeatherProvider behind the normal WeatherService
+- system        Controller over system.FakeBackend; screenshots and app launches recorded
+Speech goes to a throwaway TTS cache, never the user's ~/.lyra one.
+Module singletons (search client, weather service, controller, launcher) are replaced for
+the whole process, so use this from benchmarks only.
+"""
+import io
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench.stubs import StubServer
+from modules.audio import SAMPLE_RATE
+from modules.batching import BatchedWhisper, MicroBatcher
+from modules.loader import ModelSlot
+
+WORD_S, GAP_S = 0.36, 0.08
+FRAME = SAMPLE_RATE * 30 // 1000
+
+
+# ---------- Tone words ----------
+def pitch_table(vocab: list[str]) -> dict:
+    return {w: 300.0 + 25.0 * i for i, w in enumerate(vocab)}
+
+
+def tone_words(sentence: str, vocab: list[str], seed: int = 0) -> np.ndarray:
+    """One harmonic tone per word (pitch = vocabulary index), short gaps, faint noise bed."""
+    pitch = pitch_table(vocab)
+    t = np.arange(int(WORD_S * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = np.minimum(1.0, np.minimum(t, WORD_S - t) / 0.02)
+    parts = []
+    for word in sentence.split():
+        f = pitch[word]
+        parts.append(0.2 * envelope * (np.sin(2 * np.pi * f * t) + 0.5 * np.sin(4 * np.pi * f * t)))
+        parts.append(np.zeros(int(GAP_S * SAMPLE_RATE)))
+    audio = np.concatenate(parts).astype(np.float32)
+    return audio + np.random.default_rng(seed).normal(0, 3e-4, len(audio)).astype(np.float32)
+
+
+class FakeWhisper:
+    """
+    Reads tone words back; sleeps like a model of the given speed (fixed + per second of audio).
+    transcribe_batch pays the fixed part once per batch, like a batched forward pass.
+    """
+
+    def __init__(self, vocab: list[str], fixed_ms: float = 0.0, per_s_ms: float = 0.0):
+        self.vocab = list(vocab)
+        self.freqs = np.array(list(pitch_table(vocab).values()))
+        self.fixed_ms, self.per_s_ms = fixed_ms, per_s_ms
+
+    def transcribe(self, audio, language=None, **kwargs) -> dict:
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.fixed_ms or self.per_s_ms:
+            time.sleep((self.fixed_ms + self.per_s_ms * len(audio) / SAMPLE_RATE) / 1e3)
+        return self._read(audio, language)
+
+    def transcribe_batch(self, audios: list, language=None) -> list[dict]:
+        """Same signature as modules.batching.whisper_decode_batch, minus the model."""
+        if self.fixed_ms or self.per_s_ms:
+            time.sleep((self.fixed_ms + self.per_s_ms * sum(len(a) for a in audios) / SAMPLE_RATE) / 1e3)
+        return [self._read(np.asarray(a, dtype=np.float32), language) for a in audios]
+
+    def _read(self, audio: np.ndarray, language) -> dict:
+        n = len(audio) // FRAME
+        voiced = np.sqrt((audio[:n * FRAME].reshape(n, FRAME) ** 2).mean(axis=1)) > 0.02
+        words, i = [], 0
+        while i < n:
+            if not voiced[i]:
+                i += 1
+                continue
+            j = i
+            while j < n and voiced[j]:
+                j += 1
+            seg = audio[i * FRAME:j * FRAME]
+            peak = np.argmax(np.abs(np.fft.rfft(seg))) * SAMPLE_RATE / len(seg)
+            k = int(np.argmin(np.abs(self.freqs - peak)))
+            if abs(self.freqs[k] - peak) < 8.0:  # anything else (tones, noise) isn't a word
+                word = self.vocab[k]
+                if j == n and (j - i) * FRAME < 0.8 * WORD_S * SAMPLE_RATE:
+                    word = word[:max(1, len(word) // 2)]  # still being spoken
+                words.append(word)
+            i = j
+        segment = {"start": 0.0, "end": len(audio) / SAMPLE_RATE, "avg_logprob": -0.2, "no_speech_prob": 0.01}
+        return {"text": " ".join(words), "language": language or "en", "segments": [segment] if words else []}
+
+
+class FakeSentiment:
+    """Keyword sentiment; with a cost, one classify_batch call sleeps fixed + per text, one batch at a time."""
+    NEGATIVE = {"sad", "angry", "stressed", "दुखी", "उदास"}
+    POSITIVE = {"happy", "great", "awesome", "खुश"}
+
+    def __init__(self, fixed_ms: float = 0.0, per_text_ms: float = 0.0, max_batch: int = 1, max_wait_ms: float = 5.0):
+        self.fixed_ms, self.per_text_ms = fixed_ms, per_text_ms
+        self._lock = threading.Lock()
+        self.batcher = MicroBatcher(self.classify_batch, max_batch, max_wait_ms) if max_batch > 1 else None
+
+    def classify(self, text: str) -> str:
+        if self.batcher is not None:
+            return self.batcher(text)
+        return self.classify_batch([text])[0]
+
+    def classify_batch(self, texts: list[str]) -> list[str]:
+        if self.fixed_ms or self.per_text_ms:
+            with self._lock:
+                time.sleep((self.fixed_ms + self.per_text_ms * len(texts)) / 1e3)
+        return [self._label(t) for t in texts]
+
+    def _label(self, text: str) -> str:
+        words = set(text.casefold().split())
+        if words & self.NEGATIVE:
+            return "NEGATIVE"
+        if words & self.POSITIVE:
+            return "POSITIVE"
+        return "NEUTRAL"
+
+
+# ---------- Audio output / TTS ----------
+def silent_wav(seconds: float, rate: int = 8000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b"\0\0" * int(seconds * rate))
+    return buf.getvalue()
+
+
+class FakeTTS:
+    """Replaces LyraCore's engines: ~70 ms of (silent) speech per character, after `latency_s` + `per_char_s` each."""
+
+    def __init__(self, latency_s: float = 0.0, per_char_s: float = 0.0):
+        self.latency_s = latency_s
+        self.per_char_s = per_char_s
+        self.calls = []
+
+    def synthesize(self, text: str, lang_code: str = "en") -> tuple[bytes, str]:
+        time.sleep(self.latency_s + self.per_char_s * len(text))
+        self.calls.append((text, lang_code))
+        return silent_wav(0.07 * len(text)), "wav"
+
+
+class _FakeMusic:
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.played = []
+        self.starts = []  # monotonic time each clip started
+        self._until = 0.0
+        self._seconds = 0.0
+
+    def load(self, f, fmt=None):
+        with wave.open(f, "rb") as wf:
+            self._seconds = wf.getnframes() / wf.getframerate()
+
+    def play(self):
+        self.played.append(self._seconds)
+        self.starts.append(time.monotonic())
+        self._until = time.monotonic() + self._seconds / self.speed
+
+    def get_busy(self) -> bool:
+        return time.monotonic() < self._until
+
+    def stop(self):
+        self._until = 0.0
+
+    def unload(self):
+        pass
+
+
+class FakePygame:
+    """Just enough of pygame for modules.playback; `speed` > 1 plays faster than real time."""
+
+    def __init__(self, speed: float = 1.0):
+        self.mixer = type("mixer", (), {})()
+        self.mixer.music = _FakeMusic(speed)
+
+
+# ---------- Network skills ----------
+ARTICLE = (b"<html><body><article><p>Lyra is a small constellation in the northern sky, named after the lyre "
+           b"of Orpheus.</p><p>Its brightest star, Vega, is one of the brightest stars in the night sky.</p>"
+           b"<p>The Ring Nebula is a planetary nebula in Lyra, visible in small telescopes.</p></article></body></html>")
+
+
+def search_stub() -> StubServer:
+    """A results page with three links to one local article (started; stop with __exit__)."""
+    srv = StubServer({}).__enter__()
+    rows = "".join(f'<div><a class="result__a" href="{srv.url}/article?{i}">Result {i}</a>'
+                   f'<a class="result__snippet">Snippet {i}: Lyra is a constellation.</a></div>' for i in range(3))
+    serp = f"<html><body>{rows}</body></html>".encode()
+    srv.httpd.routes.update({
+        "/html/": lambda req: (200, "text/html", serp),
+        "/article": lambda req: (200, "text/html; charset=utf-8", ARTICLE),
+    })
+    return srv
+
+
+def fake_weather_provider():
+    from modules.weather import WeatherProvider
+
+    class FakeWeatherProvider(WeatherProvider):
+        def fetch(self, city: str) -> dict:
+            return {"city": city.title(), "temp_c": 27, "description": "partly cloudy"}
+
+    return FakeWeatherProvider()
+
+
+# ---------- System ----------
+class FakeLauncher:
+    def __init__(self):
+        self.opened, self.closed = [], []
+
+    def open(self, app: str) -> int:
+        self.opened.append(app)
+        return 1
+
+    def running(self, app: str) -> list[int]:
+        return [1] if app in self.opened else []
+
+    def close(self, app: str, timeout: float = 2.0) -> int:
+        self.closed.append(app)
+        return int(app in self.opened)
+
+
+# ---------- Core ----------
+def ready_slot(name: str, load, warmup=None) -> ModelSlot:
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        slot = ModelSlot(name, load, warmup=warmup).start(pool)
+    return slot
+
+
+class Fakes:
+    """Handles to everything build_core() swapped in, for assertions and cleanup."""
+
+    def __init__(self):
+        self.tts = FakeTTS()
+        self.pygame = FakePygame(speed=50.0)
+        self.backend = None
+        self.launcher = FakeLauncher()
+        self.screenshots = []
+        self.search = None
+
+    def close(self):
+        if self.search is not None:
+            self.search.__exit__(None, None, None)
+            self.search = None
+
+
+def build_core(vocab: list[str], asr_ms: tuple = (0.0, 0.0), real_models: bool = False,
+               sentiment_ms: tuple = (0.0, 0.0), **core_kwargs):
+    """
+    A LyraCore with fakes for audio output, TTS, search, weather and system actions.
+    With `real_models`, Whisper and the sentiment model are the real ones (must be installed);
+    otherwise FakeWhisper(vocab, *asr_ms) and FakeSentiment(*sentiment_ms), micro-batched like
+    the real ones when `max_batch` > 1.
+    """
+    import lyra_core
+    from modules import apps, system, weather, websearch
+    from modules.history import HistoryStore
+    from modules.tts_cache import TTSCache
+
+    fakes = Fakes()
+    fakes.search = search_stub()
+    websearch._client = websearch.SearchClient(url=fakes.search.url + "/html/")
+    weather._service = weather.WeatherService(fake_weather_provider())
+    fakes.backend = system.FakeBackend()
+    system._controller = system.Controller(fakes.backend)
+    apps._launcher = fakes.launcher
+    lyra_core.take_screenshot = lambda save_path=None: fakes.screenshots.append(save_path) or "screenshot_fake.png"
+
+    core_kwargs.setdefault("history", HistoryStore(None))
+    core_kwargs.setdefault("tts_cache", TTSCache(tempfile.mkdtemp(prefix="lyra_bench_tts_")))
+    # fake slots go in before the core starts loading anything, so no real model loads alongside
+    models = {"audio": ready_slot("Audio output", lambda: fakes.pygame)}
+    if not real_models:
+        max_batch, max_wait_ms = core_kwargs.get("max_batch", 1), core_kwargs.get("max_wait_ms", 5.0)
+        whisper = FakeWhisper(vocab, *asr_ms)
+        if max_batch > 1:
+            whisper = BatchedWhisper(whisper, max_batch, max_wait_ms,
+                                     decode_batch=lambda model, audios, language: model.transcribe_batch(audios, language))
+        models["asr"] = ready_slot("Whisper", lambda: whisper)
+        models["sentiment"] = ready_slot("Sentiment", lambda: FakeSentiment(*sentiment_ms, max_batch, max_wait_ms))
+    core = lyra_core.LyraCore(headless=False, models=models, **core_kwargs)
+    core._synthesize_gtts = fakes.tts.synthesize
+    core._synthesize_pyttsx3 = lambda text: fakes.tts.synthesize(text)
+    return core, fakes
@@ -0,0 +1,185 @@
+"""
+Synthetic audio fixtures for the benchmarks, generated from a fixed seed so every machine
+gets the same clips:
+
+    <out>/tones/*.wav      steady tones (no speech; the VAD and ASR should find nothing)
+    <out>/noise/*.wav      white / pink noise at a few levels
+    <out>/words/*.wav      each command as tone words (what bench.fakes.FakeWhisper reads)
+    <out>/tts/*.wav        each command spoken by gTTS (en/hi/kn/ta/te); needs network + ffmpeg
+    <out>/manifest.jsonl   {"path", "kind", "text", "lang", "intent"} per clip, paths relative
+
+The manifest is also what bench.bench_asr takes. The hotword set for bench.bench_hotword
+goes to its own directory:
+
+    <hotword-out>/positive/*.wav   "Lyra", "Hey Lyra", "Lyra, open notepad", ... (gTTS in a few
+                                   accents; tone words of the hotword without network)
+    <hotword-out>/negative/*.wav   the other commands, sound-alikes, tones and noise
+
+Run from Multilingual-lyra/:
+    python -m bench.fixtures [--out fixtures/synthetic] [--hotword-out fixtures/hotword] [--no-tts]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+
+from bench.fakes import tone_words
+from modules.audio import SAMPLE_RATE, write_wav
+
+COMMANDS = [  # (lang, text, intent)
+    ("en", "volume up", "VOLUME_UP"),
+    ("en", "open notepad", "OPEN_APP"),
+    ("en", "what time is it", "TIME"),
+    ("en", "take a screenshot", "SCREENSHOT"),
+    ("en", "weather in bangalore", "WEATHER"),
+    ("en", "search lyra constellation", "WEB_SEARCH"),
+    ("en", "hello lyra", "GREETING"),
+    ("en", "i feel sad today", "SUPPORT"),
+    ("en", "tell me a story about the sea", "GENERAL"),
+    ("hi", "नमस्ते लायरा", "GREETING"),
+    ("hi", "नोटपैड खोलो", "OPEN_APP"),
+    ("hi", "आज मौसम कैसा है", "WEATHER"),
+    ("hi", "मैं बहुत दुखी हूँ", "SUPPORT"),
+    ("kn", "ಹಲೋ ಲೈರಾ", "GREETING"),
+    ("kn", "ಇಂದು ಹವಾಮಾನ ಹೇಗಿದೆ", "WEATHER"),
+    ("ta", "வணக்கம் லைரா", "GREETING"),
+    ("ta", "தேடுங்கள் கிரிக்கெட்", "WEB_SEARCH"),
+    ("te", "నమస్తే లైరా", "GREETING"),
+    ("te", "కాలావస్థ ఎలా ఉంది", "WEATHER"),
+]
+TONES = [("tone_440", [440.0]), ("tone_triad", [262.5, 337.5, 412.5]), ("tone_60hz_hum", [60.0, 120.0])]
+NOISE = [("white_-30db", "white", -30), ("white_-50db", "white", -50), ("pink_-35db", "pink", -35)]
+HOTWORD_PHRASES = ["{}", "hey {}", "{}, open notepad", "{}, what time is it", "okay {}"]
+SOUND_ALIKES = ["laura", "library", "lira coin", "hey siri", "layer one", "clara"]
+ACCENTS = ["com", "co.in", "co.uk", "com.au"]  # gTTS top-level domains: one voice accent each
+
+
+def vocabulary() -> list[str]:
+    """Every word of every command, in first-seen order (the tone-word pitch table)."""
+    vocab = []
+    for _, text, _ in COMMANDS:
+        for word in text.split():
+            if word not in vocab:
+                vocab.append(word)
+    return vocab
+
+
+def tone(freqs: list[float], seconds: float = 1.5) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 / len(freqs) * sum(np.sin(2 * np.pi * f * t) for f in freqs)).astype(np.float32)
+
+
+def noise(color: str, level_db: float, seed: int, seconds: float = 2.0) -> np.ndarray:
+    x = np.random.default_rng(seed).normal(0, 1, int(seconds * SAMPLE_RATE))
+    if color == "pink":  # 1/f power: scale the spectrum by 1/sqrt(f)
+        spectrum = np.fft.rfft(x)
+        spectrum[1:] /= np.sqrt(np.arange(1, len(spectrum)))
+        x = np.fft.irfft(spectrum, len(x))
+    x *= 10 ** (level_db / 20) / np.sqrt(np.mean(x ** 2))
+    return x.astype(np.float32)
+
+
+def tts_clip(text: str, lang: str, tld: str = "com") -> np.ndarray:
+    """gTTS mp3 -> 16 kHz mono via ffmpeg. Raises if either is unavailable."""
+    import io
+    from gtts import gTTS
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found")
+    buf = io.BytesIO()
+    gTTS(text=text, lang=lang, tld=tld).write_to_fp(buf)
+    pcm = subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1",
+                          "-ar", str(SAMPLE_RATE), "pipe:1"], input=buf.getvalue(), capture_output=True, check=True).stdout
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def generate(out: str, tts: bool = True) -> str:
+    """Write every fixture and the manifest; returns the manifest path."""
+    vocab, rows = vocabulary(), []
+
+    def save(kind: str, name: str, audio: np.ndarray, **meta):
+        rel = f"{kind}/{name}.wav"
+        os.makedirs(os.path.join(out, kind), exist_ok=True)
+        write_wav(os.path.join(out, rel), audio)
+        rows.append(dict(path=rel, kind=kind, **meta))
+
+    for name, freqs in TONES:
+        save("tones", name, tone(freqs), text="", lang="", intent="SILENCE")
+    for i, (name, color, level) in enumerate(NOISE):
+        save("noise", name, noise(color, level, seed=i), text="", lang="", intent="SILENCE")
+    for i, (lang, text, intent) in enumerate(COMMANDS):
+        save("words", f"{lang}_{i:02d}", tone_words(text, vocab, seed=i), text=text, lang=lang, intent=intent)
+    if tts:
+        for i, (lang, text, intent) in enumerate(COMMANDS):
+            try:
+                audio = tts_clip(text, lang)
+            except Exception as e:
+                print(f"⚠️ TTS fixtures skipped: {e}")
+                break
+            save("tts", f"{lang}_{i:02d}", audio, text=text, lang=lang, intent=intent)
+
+    manifest = os.path.join(out, "manifest.jsonl")
+    with open(manifest, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return manifest
+
+
+def generate_hotword(out: str, hotword: str = "lyra", tts: bool = True) -> dict:
+    """Write the positive/negative hotword clips; returns {"positive": n, "negative": n}."""
+    vocab, counts = vocabulary(), {"positive": 0, "negative": 0}
+    if hotword not in vocab:
+        vocab.append(hotword)
+
+    def save(kind: str, name: str, audio: np.ndarray):
+        os.makedirs(os.path.join(out, kind), exist_ok=True)
+        write_wav(os.path.join(out, kind, f"{name}.wav"), audio)
+        counts[kind] += 1
+
+    def in_quiet(audio: np.ndarray, seed: int) -> np.ndarray:
+        """Room tone either side, so the energy gate has a floor to measure the word against."""
+        pad = noise("white", -60, seed, seconds=0.8)
+        return np.concatenate([pad, audio, pad])
+
+    # Tone words: enough for the template detector without network
+    for i, gain in enumerate((1.0, 0.5, 1.5, 0.8, 1.2, 0.3)):
+        save("positive", f"words_{i:02d}", in_quiet(np.clip(gain * tone_words(hotword, vocab, seed=i), -1, 1), i))
+    negatives = [text for lang, text, _ in COMMANDS if lang == "en" and hotword not in text.split()]
+    for i, text in enumerate(negatives):
+        save("negative", f"words_{i:02d}", in_quiet(tone_words(text, vocab, seed=100 + i), 100 + i))
+    for name, freqs in TONES:
+        save("negative", name, tone(freqs, seconds=3.0))
+    for i, (name, color, level) in enumerate(NOISE):
+        save("negative", name, noise(color, level, seed=i, seconds=3.0))
+    if tts:
+        try:
+            for a, tld in enumerate(ACCENTS):
+                for p, phrase in enumerate(HOTWORD_PHRASES):
+                    save("positive", f"tts_{tld}_{p:02d}", tts_clip(phrase.format(hotword.capitalize()), "en", tld))
+                for n, text in enumerate(SOUND_ALIKES + negatives):
+                    if n % len(ACCENTS) == a:  # spread the negatives over the accents
+                        save("negative", f"tts_{tld}_{n:02d}", tts_clip(text, "en", tld))
+        except Exception as e:
+            print(f"⚠️ TTS hotword fixtures skipped: {e}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=os.path.join("fixtures", "synthetic"))
+    parser.add_argument("--hotword-out", default=os.path.join("fixtures", "hotword"))
+    parser.add_argument("--hotword", default="lyra")
+    parser.add_argument("--no-tts", action="store_true", help="skip the gTTS-rendered commands")
+    args = parser.parse_args()
+    manifest = generate(args.out, tts=not args.no_tts)
+    with open(manifest, encoding="utf-8") as f:
+        kinds = [json.loads(line)["kind"] for line in f]
+    print(f"{manifest}: " + ", ".join(f"{kinds.count(k)} {k}" for k in dict.fromkeys(kinds)))
+    counts = generate_hotword(args.hotword_out, args.hotword, tts=not args.no_tts)
+    print(f"{args.hotword_out}: " + ", ".join(f"{n} {kind}" for kind, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Load test for server.py: N concurrent sessions, each sending requests back to back.
+Text turns go to /v1/text; with --wav each session also streams the clip over the
+WebSocket (in 100 ms PCM16 frames, as fast as possible) and asks for an answer.
+Reports throughput, latency percentiles and errors.
+
+Start the server first, then from Multilingual-lyra/:
+    python -m bench.load_server --url http://127.0.0.1:8765 --sessions 20 --requests 10 [--wav clip.wav]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+import numpy as np
+
+from modules.audio import SAMPLE_RATE, read_wav
+
+PHRASES = [
+    "hello lyra", "what time is it", "weather in Bangalore", "I feel a bit stressed today",
+    "open notepad", "volume up", "what did I say about the weather", "tell me something nice",
+]
+
+
+async def text_session(http: aiohttp.ClientSession, url: str, n: int, sid: str, latencies: list, errors: list):
+    for i in range(n):
+        t0 = time.perf_counter()
+        try:
+            async with http.post(f"{url}/v1/text", json={"text": PHRASES[i % len(PHRASES)], "session": sid}) as r:
+                await r.json()
+                if r.status != 200:
+                    errors.append(r.status)
+                    continue
+        except aiohttp.ClientError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - t0)
+
+
+async def ws_session(http: aiohttp.ClientSession, url: str, n: int, sid: str, pcm: bytes, latencies: list, errors: list):
+    frame = SAMPLE_RATE // 10 * 2
+    try:
+        async with http.ws_connect(f"{url}/v1/ws", params={"session": sid}) as ws:
+            await ws.receive_json()  # session greeting
+            for _ in range(n):
+                for i in range(0, len(pcm), frame):
+                    await ws.send_bytes(pcm[i:i + frame])
+                t0 = time.perf_counter()  # latency = end of speech -> answer
+                await ws.send_json({"type": "end"})
+                msg = await ws.receive_json()
+                if msg.get("type") != "result":
+                    errors.append(msg.get("error", "bad reply"))
+                    continue
+                latencies.append(time.perf_counter() - t0)
+    except aiohttp.ClientError as e:
+        errors.append(type(e).__name__)
+
+
+def _summary(name: str, latencies: list, errors: list, wall: float) -> str:
+    if not latencies:
+        return f"{name}: no successful requests ({len(errors)} errors)"
+    lat = sorted(latencies)
+    pct = lambda p: lat[min(len(lat) - 1, int(len(lat) * p))] * 1e3
+    return (f"{name}: {len(lat)} ok, {len(errors)} errors, {len(lat) / wall:.1f} req/s | "
+            f"p50 {statistics.median(lat) * 1e3:.0f} ms  p95 {pct(0.95):.0f} ms  p99 {pct(0.99):.0f} ms")
+
+
+async def run(url: str, sessions: int, requests: int, wav: str | None):
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=300)) as http:
+        async with http.get(f"{url}/v1/health") as r:
+            print("server:", await r.json())
+
+        latencies, errors = [], []
+        t0 = time.perf_counter()
+        await asyncio.gather(*(text_session(http, url, requests, f"load-text-{i}", latencies, errors)
+                               for i in range(sessions)))
+        print(_summary("text", latencies, errors, time.perf_counter() - t0))
+
+        if wav:
+            pcm = (np.clip(read_wav(wav), -1, 1) * 32767).astype(np.int16).tobytes()
+            latencies, errors = [], []
+            t0 = time.perf_counter()
+            await asyncio.gather(*(ws_session(http, url, requests, f"load-ws-{i}", pcm, latencies, errors)
+                                   for i in range(sessions)))
+            print(_summary(f"ws audio ({len(pcm) / 2 / SAMPLE_RATE:.1f} s clip)", latencies, errors,
+                           time.perf_counter() - t0))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=10, help="per session")
+    parser.add_argument("--wav", default=None, help="16-bit PCM WAV to stream over the WebSocket")
+    args = parser.parse_args()
+    asyncio.run(run(args.url.rstrip("/"), args.sessions, args.requests, args.wav))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Local stand-in HTTP server for the network-facing modules (search, result pages, weather).
+
+    with StubServer({"/html/": handler}) as srv:
+        requests.get(srv.url + "/html/")
+
+A handler gets the BaseHTTPRequestHandler and returns (status, content_type, body),
+where body is bytes or an iterable of bytes chunks (sent with chunked encoding, so
+slow and huge pages can be simulated). Keep-alive is on, like a real server.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # otherwise delayed ACKs add ~40 ms to every keep-alive reply
+    wbufsize = -1                   # send headers + body together; flushed after each request
+
+    def _dispatch(self):
+        path = self.path.split("?", 1)[0]
+        handler = self.server.routes.get(path)
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        self.server.hits[path] = self.server.hits.get(path, 0) + 1
+        if handler is None:
+            status, ctype, body = 404, "text/plain", b"not found"
+        else:
+            status, ctype, body = handler(self)
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        try:
+            if isinstance(body, (bytes, bytearray)):
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in body:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (deadline / size cap): expected in the slow/huge cases
+
+    do_GET = do_POST = _dispatch
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def finish(self):
+        try:
+            super().finish()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+    def __init__(self, routes: dict):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.routes = routes
+        self.httpd.hits = {}
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def hits(self) -> dict:
+        return self.httpd.hits
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
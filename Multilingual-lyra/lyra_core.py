@@ -1,25 +1,40 @@
+import io
 import os
 import tempfile
-import wave
-import audioop
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 
 # ---------- FFmpeg Path Setup ----------
 ffmpeg_path = r"C:\ffmpeg\ffmpeg-master-latest-win64-gpl-shared\ffmpeg-master-latest-win64-gpl-shared\bin"
 os.environ["PATH"] = ffmpeg_path + os.pathsep + os.environ["PATH"]
 
 # ---------- STT / TTS ----------
-import whisper
-from gtts import gTTS
-import pyttsx3
-from langdetect import detect as lang_detect
-import pygame
+# whisper, gtts, pyttsx3, pygame and transformers are imported lazily (see LyraCore.__init__)
 
 # ---------- Tasks ----------
 from modules.apps import open_app, close_app
 from modules.websearch import search_and_summarise
 from modules.weather import get_weather, get_time_str
 from modules.emotions import SentimentModel
+from modules.intents import IntentMatcher
+from modules.audio import SAMPLE_RATE, to_float32, load_audio_file
+from modules.vad import has_speech, trim_to_speech
+from modules.kws import strip_hotword
+from modules.loader import ModelSlot
+from modules.playback import PlaybackQueue
+from modules.speech import SpeechStream, chunk_language, split_chunks
+from modules.tts_cache import TTSCache
+from modules.history import HistoryStore, topic_terms
+from modules.langid import LanguageID, detect_scores
+from modules.asr import CascadeASR, confidence
+from modules.batching import BatchedWhisper
+from modules.tracing import Tracer, span, traced
 from modules.system import (
     take_screenshot, lock_pc, shutdown_pc, restart_pc,
     increase_volume, decrease_volume,
@@ -28,20 +43,146 @@ from modules.system import (
 
 
 def safe_lang_detect(text: str) -> str:
+    scores = detect_scores(text)  # seeded and cached
+    return scores[0][0] if scores else "en"
+
+
+def _load_whisper(name: str = "base"):
+    import whisper
+    return whisper.load_model(name)
+
+
+def _load_mixer():
+    import pygame
+    pygame.mixer.init()
+    return pygame
+
+
+@lru_cache(maxsize=1)
+def _gtts_languages() -> frozenset:
+    """Language codes gTTS has a voice for; empty if gtts can't say (then it is just tried)."""
     try:
-        return lang_detect(text)
+        from gtts.lang import tts_langs
+        return frozenset(tts_langs())
     except Exception:
-        return "en"
+        return frozenset()
 
 
-class LyraCore:
-    def __init__(self):
-        self.asr = whisper.load_model("base")
-        self.tts_engine = pyttsx3.init()
-        self.sentiment = SentimentModel()
+# Fixed replies; together with the greeting/support texts they are most of what Lyra says,
+# so they are pre-rendered into the TTS cache (see LyraCore.prerender_tts).
+SYSTEM_REPLIES = {
+    "VOLUME_UP": "Volume increased!",
+    "VOLUME_DOWN": "Volume decreased!",
+    "BRIGHTNESS_UP": "Brightness increased!",
+    "BRIGHTNESS_DOWN": "Brightness decreased!",
+    "LOCK_PC": "PC locked!",
+    "SHUTDOWN_PC": "Shutting down...",
+    "RESTART_PC": "Restarting...",
+}
+SENTIMENT_PREFIX = {"NEGATIVE": "I’m here with you. ", "POSITIVE": "Love the energy! "}
+# Intents whose reply ignores sentiment, so the model isn't run for them
+SENTIMENT_FREE_INTENTS = set(SYSTEM_REPLIES) | {"SCREENSHOT"}
+GTTS_RETRY_S = 60.0  # after a gTTS failure (offline, most likely), use pyttsx3 for this long
+# Words around a city name in a weather question that are never part of it
+WEATHER_FILLER = {
+    "what", "what's", "whats", "how", "how's", "hows", "is", "it", "like", "today", "tomorrow",
+    "tonight", "now", "right", "currently", "outside", "there", "please", "forecast", "for", "at",
+    "का", "की", "में", "कैसा", "है", "आज", "en", "à",
+}
+CITY_PARTICLES = {"de", "la", "le", "el", "of", "the"}  # kept inside a name ("Rio de Janeiro"), not around it
+# Words that can stand right before "weather" without naming a place ("tell me the weather")
+WEATHER_ASKING = {
+    "tell", "me", "check", "show", "give", "get", "know", "about", "you", "can", "could", "would", "i",
+    "want", "need", "let", "us", "see", "look", "find", "report", "current", "local", "my", "our", "a", "an",
+}
+# Intents that act on the machine Lyra runs on
+HOST_INTENTS = set(SYSTEM_REPLIES) | {"SCREENSHOT", "OPEN_APP", "CLOSE_APP"}
+SYSTEM_ACTIONS = {
+    "VOLUME_UP": increase_volume,
+    "VOLUME_DOWN": decrease_volume,
+    "BRIGHTNESS_UP": increase_brightness,
+    "BRIGHTNESS_DOWN": decrease_brightness,
+    "LOCK_PC": lock_pc,
+    "SHUTDOWN_PC": shutdown_pc,
+    "RESTART_PC": restart_pc,
+}
+# Reversible actions that streaming may have taken too early (a screenshot just stays on disk)
+UNDO_ACTIONS = {
+    "VOLUME_UP": decrease_volume,
+    "VOLUME_DOWN": increase_volume,
+    "BRIGHTNESS_UP": decrease_brightness,
+    "BRIGHTNESS_DOWN": increase_brightness,
+}
+
 
-        pygame.mixer.init()
-        self.history = []
+def _is_cancelled(cancel) -> bool:
+    return cancel is not None and cancel.is_set()
+
+
+def _cancelled_result(user_text: str, lang: str) -> dict:
+    return {"user_text": user_text.strip(), "reply": "", "intent": "CANCELLED", "sentiment": "NEUTRAL", "lang": lang}
+
+
+class LyraCore:
+    def __init__(self, quantize_sentiment: bool = False, history: HistoryStore | None = None,
+                 asr_model: str = "base", headless: bool = False, actions: bool = True,
+                 asr_tiers: str | list | None = None, tracer: Tracer | None = None,
+                 max_batch: int = 1, max_wait_ms: float = 5.0, tts_cache: TTSCache | None = None,
+                 models: dict | None = None):
+        """
+        `asr_tiers` (e.g. modules.asr.DEFAULT_TIERS) replaces the single `asr_model` with a
+        cascade that only re-decodes with the bigger model when the small one is unsure.
+        `headless` skips audio output and TTS entirely (batch runs, servers without a sound card).
+        `actions=False` never touches the host (apps, volume, power...): the intent is reported
+        and the client is expected to carry it out (server mode).
+        `tracer` (modules.tracing) times every stage of a turn; off unless one is passed.
+        `max_batch` > 1 micro-batches concurrent Whisper decodes and sentiment calls (up to
+        that many per forward pass, collected for at most `max_wait_ms`); for callers that
+        run turns in parallel, like the server.
+        `tts_cache` defaults to the user's cache in ~/.lyra; `models` ({"asr": ModelSlot, ...})
+        replaces those slots, whose real loaders are then never started (benchmarks).
+        """
+        # ---------- Staged startup ----------
+        # Models load concurrently in the background; each request only waits for the one it uses.
+        self._loader = ThreadPoolExecutor(max_workers=3, thread_name_prefix="lyra-load")
+        load_whisper = _load_whisper
+        if max_batch > 1:
+            load_whisper = lambda name: BatchedWhisper(_load_whisper(name), max_batch, max_wait_ms)
+        if asr_tiers:
+            load_asr = lambda: CascadeASR(asr_tiers, load=load_whisper)
+        else:
+            load_asr = lambda: load_whisper(asr_model)
+        slots = {
+            "asr": lambda: ModelSlot(
+                "Whisper", load_asr,  # warm-up on silence also loads every cascade tier
+                warmup=lambda m: m.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32)),
+            ),
+            "sentiment": lambda: ModelSlot(
+                "Sentiment", lambda: SentimentModel(quantize=quantize_sentiment, max_batch=max_batch,
+                                                    max_wait_ms=max_wait_ms),
+                warmup=lambda m: m.classify("hello"),
+            ),
+        }
+        if not headless:
+            slots["audio"] = lambda: ModelSlot("Audio output", _load_mixer)
+        models = models or {}
+        self.models = {key: models[key] if key in models else make().start(self._loader) for key, make in slots.items()}
+        self._loader.shutdown(wait=False)
+        self.headless = headless
+        self.actions = actions
+        self.tracer = tracer or Tracer(enabled=False)
+        # whisper installs per-call hooks on the model; one decode at a time (BatchedWhisper
+        # serializes its own model, and holding a lock here would keep its batches at one)
+        self._asr_lock = nullcontext() if max_batch > 1 else threading.Lock()
+        self.langid = LanguageID()
+        self._tts_engine = None
+        self.player = None if headless else PlaybackQueue(self.models["audio"].get)
+        self.speech = None if headless else SpeechStream(self._synthesize, self.player)
+        self._gtts_down_until = 0.0
+        self.tts_cache = tts_cache or TTSCache()
+        if history is None:
+            history = HistoryStore(None) if headless else HistoryStore()
+        self.history = history
 
         # ---------- Multilingual keyword maps ----------
         self.greeting_words = [
@@ -69,109 +210,361 @@ class LyraCore:
                          "खुश", "उत्साहित", "अच्छा", "शानदार",
                          "feliz", "contento", "super", "formidable"]
         }
+        self.context_words = ["repeat", "what did i say", "previous", "दोहराओ", "repite"]
+
+        self.intents = self._build_intents()
+
+    def _build_intents(self) -> IntentMatcher:
+        """Compile every keyword list into one matcher; earlier entries win ties."""
+        table = [
+            ("GREETING", self.greeting_words),
+            ("OPEN_APP", self.open_words),
+            ("CLOSE_APP", self.close_words),
+            ("WEB_SEARCH", self.search_words),
+            ("WEATHER", self.weather_words),
+            ("TIME", self.time_words),
+            ("SCREENSHOT", self.screenshot_words),
+            ("VOLUME_UP", self.volume_up_words),
+            ("VOLUME_DOWN", self.volume_down_words),
+            ("BRIGHTNESS_UP", self.brightness_up_words),
+            ("BRIGHTNESS_DOWN", self.brightness_down_words),
+            ("LOCK_PC", self.lock_words),
+            ("SHUTDOWN_PC", self.shutdown_words),
+            ("RESTART_PC", self.restart_words),
+            ("SUPPORT", self.emotion_words["NEGATIVE"]),
+            ("CONTEXT", self.context_words),
+        ]
+        matcher = IntentMatcher(default="GENERAL")
+        for priority, (intent, words) in enumerate(table):
+            matcher.add(intent, words, priority)
+        return matcher
+
+    # ---------- Models ----------
+    @property
+    def asr(self):
+        return self.models["asr"].get()
+
+    @property
+    def sentiment(self):
+        return self.models["sentiment"].get()
+
+    @property
+    def tts_engine(self):
+        # pyttsx3 is only the offline fallback, so create it on first use in the thread that speaks
+        if self._tts_engine is None:
+            import pyttsx3
+            self._tts_engine = pyttsx3.init()
+        return self._tts_engine
+
+    def model_status(self) -> dict:
+        return {slot.name: slot.state for slot in self.models.values()}
+
+    def batch_stats(self) -> dict:
+        """Micro-batcher counters per loaded model (empty unless max_batch > 1)."""
+        models = {}
+        if self.models["asr"].ready:
+            asr = self.asr
+            if isinstance(asr, CascadeASR):
+                models.update((f"whisper-{t.model}", asr.model(t.model)) for t in asr.tiers)
+            else:
+                models["whisper"] = asr
+        if self.models["sentiment"].ready:
+            models["sentiment"] = self.sentiment
+        return {name: m.batcher.stats() for name, m in models.items() if getattr(m, "batcher", None) is not None}
 
     # ---------- Silence Detection ----------
-    def is_silent(self, wav_path: str, threshold: int = 500) -> bool:
-        """Check if audio RMS is below threshold"""
-        try:
-            with wave.open(wav_path, 'rb') as wf:
-                frames = wf.readframes(wf.getnframes())
-                rms = audioop.rms(frames, wf.getsampwidth())
-                return rms < threshold
-        except Exception:
-            return False
+    def is_silent(self, samples) -> bool:
+        """True when the frame-level VAD finds no speech in the buffer"""
+        return not has_speech(samples)
 
     # ---------- STT ----------
-    def transcribe(self, audio_path: str) -> dict:
-        result = self.asr.transcribe(audio_path)
+    def transcribe(self, audio, language: str | None = None) -> dict:
+        """
+        Transcribe a file path, or a 16 kHz PCM buffer without touching disk/ffmpeg.
+        A known `language` skips Whisper's own detection pass.
+        """
+        if not isinstance(audio, str):
+            audio = to_float32(audio)
+        asr = self.asr
+        # A cascade only keeps the small model's text if it also reads as a command
+        extra = {"accept": self._is_command} if isinstance(asr, CascadeASR) else {}
+        with self._asr_lock, span("asr"):
+            result = asr.transcribe(audio, language=language, **extra)
         text = (result.get("text") or "").strip()
-        lang = result.get("language") or safe_lang_detect(text)
-        return {"text": text, "language": lang}
+        with span("langid"):
+            lang = result.get("language") or safe_lang_detect(text)
+        avg_logprob = confidence(result)[0] if result.get("segments") else None
+        return {"text": text, "language": lang, "tier": result.get("tier"), "avg_logprob": avg_logprob}
+
+    def transcribe_partial(self, audio, language: str | None = None) -> dict:
+        """
+        Quick decode of an utterance still in progress (streaming): the cascade's first tier
+        only, greedy, without timestamps or confidence checks. The turn's final transcript
+        still comes from transcribe().
+        """
+        asr = self.asr
+        model = asr.model(asr.tiers[0].model) if isinstance(asr, CascadeASR) else asr
+        with self._asr_lock:
+            result = model.transcribe(to_float32(audio), language=language, temperature=0.0,
+                                      condition_on_previous_text=False, without_timestamps=True)
+        return {"text": (result.get("text") or "").strip(), "language": result.get("language") or language}
+
+    def _is_command(self, text: str) -> bool:
+        return self.detect_intent(text) != "GENERAL"
 
     # ---------- TTS ----------
-    def tts_to_file(self, text: str, lang_code: str = "en") -> str:
+    def synthesize(self, text: str, lang_code: str = "en") -> tuple[bytes, str]:
+        """Render speech into an in-memory buffer; returns (audio bytes, format)."""
+        with span("tts"):
+            return self._synthesize(text, lang_code)
+
+    def _synthesize(self, text: str, lang_code: str) -> tuple[bytes, str]:
+        hit = self.tts_cache.get(text, lang_code, "gtts")
+        if hit is not None:
+            return hit
+        # A pyttsx3 clip cached while offline is only a stand-in: try gTTS again first
+        langs = _gtts_languages()
+        if (not langs or lang_code in langs) and time.monotonic() >= self._gtts_down_until:
+            try:
+                audio, fmt = self._synthesize_gtts(text, lang_code)
+            except Exception:
+                # don't wait out a network timeout again for every sentence of the reply
+                self._gtts_down_until = time.monotonic() + GTTS_RETRY_S
+            else:
+                self.tts_cache.put(text, lang_code, "gtts", audio, fmt)
+                return audio, fmt
+        hit = self.tts_cache.get(text, lang_code, "pyttsx3")
+        if hit is not None:
+            return hit
+        audio, fmt = self._synthesize_pyttsx3(text)
+        self.tts_cache.put(text, lang_code, "pyttsx3", audio, fmt)
+        return audio, fmt
+
+    def _synthesize_gtts(self, text: str, lang_code: str) -> tuple[bytes, str]:
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang_code).write_to_fp(buf)
+        return buf.getvalue(), "mp3"
+
+    def _synthesize_pyttsx3(self, text: str) -> tuple[bytes, str]:
+        # pyttsx3 can only render to a file, so give every reply its own
+        fd, wav_path = tempfile.mkstemp(prefix="lyra_tts_", suffix=".wav")
+        os.close(fd)
         try:
-            mp3_path = os.path.join(tempfile.gettempdir(), "lyra_tts.mp3")
-            gTTS(text=text, lang=lang_code).save(mp3_path)
-            self._play_file(mp3_path)
-            return mp3_path
-        except Exception:
-            wav_path = os.path.join(tempfile.gettempdir(), "lyra_tts.wav")
             self.tts_engine.save_to_file(text, wav_path)
             self.tts_engine.runAndWait()
-            self._play_file(wav_path)
-            return wav_path
+            with open(wav_path, "rb") as f:
+                return f.read(), "wav"
+        finally:
+            try:
+                os.remove(wav_path)
+            except OSError:
+                pass
 
-    def _play_file(self, path: str):
-        try:
-            pygame.mixer.music.load(path)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-        except Exception as e:
-            print(f"Audio playback failed: {e}")
+    def static_phrases(self, lang: str) -> list[str]:
+        """Replies whose text doesn't depend on the user's words, as spoken in `lang`."""
+        phrases = list(SYSTEM_REPLIES.values())
+        for sentiment in ("NEUTRAL", *SENTIMENT_PREFIX):
+            prefix = SENTIMENT_PREFIX.get(sentiment, "")  # NEUTRAL replies go out unprefixed
+            phrases.append(prefix + self._greeting_reply(sentiment, lang))
+            phrases.append(prefix + self._support_reply(sentiment))
+        return phrases
+
+    def prerender_tts(self, langs) -> threading.Thread:
+        """Fill the TTS cache with the static phrases for each language in the background."""
+        def run():
+            for lang in langs:
+                # cached the way speak() asks for them: sentence by sentence
+                chunks = [(chunk, chunk_language(chunk, lang))
+                          for phrase in self.static_phrases(lang) for chunk in split_chunks(phrase)]
+                for chunk, chunk_lang in dict.fromkeys(chunks):
+                    if self.tts_cache.contains(chunk, chunk_lang, "gtts"):
+                        continue  # a pyttsx3 clip from an offline start gets replaced
+                    try:
+                        self.tts_cache.put(chunk, chunk_lang, "gtts", *self._synthesize_gtts(chunk, chunk_lang))
+                    except Exception as e:
+                        print(f"⚠️ Pre-render skipped ({lang}): {e}")
+                        return  # most likely offline; try again next start
+
+        thread = threading.Thread(target=run, name="lyra-tts-prerender", daemon=True)
+        thread.start()
+        return thread
+
+    def speak(self, text: str, lang_code: str = "en"):
+        """
+        Queue a reply for playback sentence by sentence (modules.speech). Returns once the
+        first sentence is queued; the rest is synthesized while it plays. Behind an earlier
+        reply that is still being synthesized it returns at once instead of waiting for it.
+        """
+        if self.speech is None:
+            return  # headless
+        with span("tts"):
+            behind = self.speech.busy
+            first = self.speech.speak(text, lang_code)
+            if not behind:
+                first.result()
+
+    def stop_speaking(self):
+        """Barge-in: cut off the current reply and drop any queued ones."""
+        if self.player is not None:
+            self.player.stop()
 
     # ---------- Intents ----------
     def detect_intent(self, text: str) -> str:
-        t = text.lower()
-        if any(g in t for g in self.greeting_words):
-            return "GREETING"
-        if any(word in t for word in self.open_words):
-            return "OPEN_APP"
-        if any(word in t for word in self.close_words):
-            return "CLOSE_APP"
-        if any(word in t for word in self.search_words):
-            return "WEB_SEARCH"
-        if any(word in t for word in self.weather_words):
-            return "WEATHER"
-        if any(word in t for word in self.time_words):
-            return "TIME"
-        if any(word in t for word in self.screenshot_words):
-            return "SCREENSHOT"
-        if any(word in t for word in self.volume_up_words):
-            return "VOLUME_UP"
-        if any(word in t for word in self.volume_down_words):
-            return "VOLUME_DOWN"
-        if any(word in t for word in self.brightness_up_words):
-            return "BRIGHTNESS_UP"
-        if any(word in t for word in self.brightness_down_words):
-            return "BRIGHTNESS_DOWN"
-        if any(word in t for word in self.lock_words):
-            return "LOCK_PC"
-        if any(word in t for word in self.shutdown_words):
-            return "SHUTDOWN_PC"
-        if any(word in t for word in self.restart_words):
-            return "RESTART_PC"
-        if any(word in t for word in self.emotion_words["NEGATIVE"]):
-            return "SUPPORT"
-        if "repeat" in t or "what did i say" in t or "previous" in t or "दोहराओ" in t or "repite" in t:
-            return "CONTEXT"
-        return "GENERAL"
+        return self.intents.match(text)
 
     # ---------- Orchestrators ----------
-    def process_audio(self, audio_path: str, preferred_tts_lang: str = "auto") -> dict:
-        if self.is_silent(audio_path):
+    @traced("audio")
+    def process_audio(self, audio_path: str, preferred_tts_lang: str = "auto", cancel=None, session: str = "") -> dict:
+        """Uploaded files: decode once (any format ffmpeg reads), then the in-memory path."""
+        try:
+            with span("decode"):
+                samples = load_audio_file(audio_path)
+        except Exception as e:
+            print(f"⚠️ Could not decode {audio_path}: {e}")
+            return {"user_text": "", "reply": "", "intent": "SILENCE", "sentiment": "NEUTRAL", "lang": "en"}
+        return self.process_pcm(samples, preferred_tts_lang=preferred_tts_lang, cancel=cancel, session=session)
+
+    @traced("pcm")
+    def process_pcm(self, samples, preferred_tts_lang: str = "auto", cancel=None, session: str = "",
+                    early: dict | None = None, hotword: str | None = None) -> dict:
+        """
+        Same as process_audio, for a 16 kHz int16/float32 buffer straight from the mic.
+        `early` is the result of an action already taken on a partial transcript of this
+        utterance (modules.streaming); it is kept if the full transcript agrees, else undone.
+        `hotword`: the recording began at the phrase that held it; a leading hotword is not
+        part of the command (a phrase that was only the hotword comes back as SILENCE).
+        """
+        # Only the speech segments go to Whisper; clips without any are rejected here
+        with span("vad"):
+            samples = trim_to_speech(samples)
+        if not len(samples):
+            if early is not None:
+                self._undo_early(early["intent"])
             return {"user_text": "", "reply": "", "intent": "SILENCE", "sentiment": "NEUTRAL", "lang": "en"}
-        stt = self.transcribe(audio_path)
+        with span("langid"):
+            pinned = self.langid.asr_language(session, preferred_tts_lang)
+        stt = self.transcribe(samples, language=pinned)
+        with span("langid"):
+            redo = self.langid.needs_redecode(stt["text"], pinned, stt["avg_logprob"])
+        if redo:
+            stt = self.transcribe(samples)  # code-switched or unsure: let Whisper detect this one
+        if hotword:
+            stt["text"] = strip_hotword(stt["text"].strip(), hotword)
         if len(stt["text"].strip()) < 2:
+            if early is not None:
+                self._undo_early(early["intent"])  # the partial was most likely a hallucination on noise
             return {"user_text": "", "reply": "", "intent": "SILENCE", "sentiment": "NEUTRAL", "lang": stt["language"]}
-        return self._respond(stt["text"], user_lang=stt["language"], preferred_tts_lang=preferred_tts_lang)
+        with span("langid"):
+            stt["language"] = self.langid.observe_transcript(session, stt["text"], stt["language"], pinned)
+        if early is not None:
+            with span("intent"):
+                intent = self.detect_intent(stt["text"])
+            if intent == early["intent"]:
+                with span("history"):
+                    self.history.add(stt["text"].strip(), early["reply"], intent=intent, lang=stt["language"],
+                                     session=session)
+                return dict(early, user_text=stt["text"].strip(), lang=stt["language"], early=True)
+            print(f"⚠️ Acted early on {early['intent']}, but the full utterance reads as {intent}")
+            self._undo_early(early["intent"])
+        if _is_cancelled(cancel):
+            return _cancelled_result(stt["text"], stt["language"])
+        out = self._respond(stt["text"], user_lang=stt["language"], preferred_tts_lang=preferred_tts_lang,
+                            cancel=cancel, session=session)
+        if early is not None:
+            out["early_intent"] = early["intent"]
+        return out
+
+    @traced("partial")
+    def act_on_partial(self, text: str, user_lang: str | None, preferred_tts_lang: str = "auto", session: str = "") -> dict:
+        """
+        Carry out a command heard in a stable partial transcript; pass the result to
+        process_pcm(early=...), which records the turn once the final transcript is in.
+        """
+        return self._respond(text, user_lang=user_lang or "en", preferred_tts_lang=preferred_tts_lang,
+                             session=session, record=False)
 
-    def process_text(self, text: str, preferred_tts_lang: str = "auto") -> dict:
+    def _undo_early(self, intent: str):
+        """Revert an action taken on a partial transcript that the final one contradicts."""
+        self.stop_speaking()  # its reply is no longer true
+        if self.actions and intent in UNDO_ACTIONS:
+            UNDO_ACTIONS[intent]()
+
+    @traced("analyze")
+    def analyze_pcm(self, samples) -> dict:
+        """Transcript, intent and sentiment for a clip without acting on it or speaking (QA, intent tuning)."""
+        with span("vad"):
+            samples = trim_to_speech(samples)
+        if not len(samples):
+            return {"user_text": "", "intent": "SILENCE", "sentiment": "NEUTRAL", "lang": "en"}
+        stt = self.transcribe(samples)
+        text = stt["text"]
+        if len(text) < 2:
+            return {"user_text": "", "intent": "SILENCE", "sentiment": "NEUTRAL", "lang": stt["language"]}
+        with span("intent"):
+            intent = self.detect_intent(text)
+        with span("sentiment"):
+            sentiment = "NEUTRAL" if intent in SENTIMENT_FREE_INTENTS else self.sentiment.classify(text)
+        return {"user_text": text, "intent": intent, "sentiment": sentiment, "lang": stt["language"], "tier": stt["tier"]}
+
+    @traced("text")
+    def process_text(self, text: str, preferred_tts_lang: str = "auto", cancel=None, session: str = "") -> dict:
         if len(text.strip()) < 2:
             return {"user_text": "", "reply": "", "intent": "SILENCE", "sentiment": "NEUTRAL", "lang": safe_lang_detect(text)}
-        user_lang = safe_lang_detect(text)
-        return self._respond(text, user_lang=user_lang, preferred_tts_lang=preferred_tts_lang)
+        with span("langid"):
+            user_lang = self.langid.text_language(text, session, preferred_tts_lang)
+        return self._respond(text, user_lang=user_lang, preferred_tts_lang=preferred_tts_lang, cancel=cancel,
+                             session=session)
 
     # ---------- Core Response ----------
-    def _respond(self, user_text: str, user_lang: str, preferred_tts_lang: str = "auto") -> dict:
+    def _respond(self, user_text: str, user_lang: str, preferred_tts_lang: str = "auto", cancel=None,
+                 session: str = "", record: bool = True) -> dict:
+        """
+        `cancel` is an optional threading.Event; once set, no action or speech is started.
+        `session` keys the conversation history (one per client in server mode).
+        `record=False` leaves the turn out of the history (actions on a partial transcript).
+        """
         trimmed_text = user_text.strip()
-        intent = self.detect_intent(trimmed_text)
-        sentiment = self.sentiment.classify(trimmed_text)
-        reply = ""
+        with span("intent"):
+            intent = self.detect_intent(trimmed_text)
+        with span("sentiment"):
+            sentiment = "NEUTRAL" if intent in SENTIMENT_FREE_INTENTS else self.sentiment.classify(trimmed_text)
+        if _is_cancelled(cancel):
+            return _cancelled_result(trimmed_text, user_lang)
 
         tts_lang = preferred_tts_lang if preferred_tts_lang != "auto" else (user_lang or "en")
 
+        if not self.actions and intent in HOST_INTENTS:
+            # Server mode: report the intent and let the client carry it out on its own machine
+            reply = SYSTEM_REPLIES.get(intent, "")
+            if record:
+                with span("history"):
+                    self.history.add(trimmed_text, reply, intent=intent, lang=user_lang, session=session)
+            return {"user_text": trimmed_text, "reply": reply, "intent": intent, "sentiment": sentiment, "lang": user_lang}
+
+        with span("skill"):
+            reply = self._run_skill(intent, sentiment, trimmed_text, user_lang, session)
+
+        # Skip silent responses in history
+        if record and intent != "SILENCE":
+            with span("history"):
+                self.history.add(trimmed_text, reply, intent=intent, lang=user_lang, session=session)
+
+        if reply and not _is_cancelled(cancel):
+            self.speak(reply, lang_code=tts_lang)
+
+        return {"user_text": trimmed_text, "reply": reply, "intent": intent, "sentiment": sentiment, "lang": user_lang}
+
+    def _run_skill(self, intent: str, sentiment: str, trimmed_text: str, user_lang: str, session: str) -> str:
+        """Carry out the intent (web search, apps, system...) and return the reply."""
+        # System actions have fixed replies, untouched by sentiment
+        if intent == "SCREENSHOT":
+            path = take_screenshot()
+            return f"Screenshot saved as {path}"
+        if intent in SYSTEM_ACTIONS:
+            SYSTEM_ACTIONS[intent]()
+            return SYSTEM_REPLIES[intent]
+
         if intent == "GREETING":
             reply = self._greeting_reply(sentiment, user_lang)
         elif intent == "OPEN_APP":
@@ -188,62 +581,59 @@ class LyraCore:
         elif intent == "SUPPORT":
             reply = self._support_reply(sentiment)
         elif intent == "CONTEXT":
-            reply = self._context_reply()
+            reply = self._context_reply(trimmed_text, session)
         else:
             reply = f"You said: {trimmed_text}"
-        if intent == "SCREENSHOT":
-            path = take_screenshot()
-            reply = f"Screenshot saved as {path}"
-        elif intent == "VOLUME_UP":
-            increase_volume()
-            reply = "Volume increased!"
-        elif intent == "VOLUME_DOWN":
-            decrease_volume()
-            reply = "Volume decreased!"
-        elif intent == "BRIGHTNESS_UP":
-            increase_brightness()
-            reply = "Brightness increased!"
-        elif intent == "BRIGHTNESS_DOWN":
-            decrease_brightness()
-            reply = "Brightness decreased!"
-        elif intent == "LOCK_PC":
-            lock_pc()
-            reply = "PC locked!"
-        elif intent == "SHUTDOWN_PC":
-            shutdown_pc()
-            reply = "Shutting down..."
-        elif intent == "RESTART_PC":
-            restart_pc()
-            reply = "Restarting..."
-        elif sentiment == "NEGATIVE":
-            reply = "I’m here with you. " + reply
-        elif sentiment == "POSITIVE":
-            reply = "Love the energy! " + reply
-        else:
-            reply = f"You said: {trimmed_text}"
-
-        # Skip silent responses in history
-        if intent != "SILENCE":
-            self.history.append({"user": trimmed_text, "bot": reply, "ts": datetime.now().isoformat()})
-            self.history = self.history[-5:]
-
-        if reply:
-            self.tts_to_file(reply, lang_code=tts_lang)
-
-        return {"user_text": trimmed_text, "reply": reply, "intent": intent, "sentiment": sentiment, "lang": user_lang}
+        if reply and sentiment in SENTIMENT_PREFIX:
+            reply = SENTIMENT_PREFIX[sentiment] + reply
+        return reply
 
     # ---------- Helpers ----------
     def _extract_city(self, text: str) -> str | None:
+        """
+        "weather in New York today" -> "New York": the words after the last "in"/weather word
+        up to punctuation or a filler word. When the weather word ends the request, one
+        place-like word just before it counts ("Delhi weather", or a capitalised name: "New York
+        weather"); otherwise None, so the user is asked for the city.
+        """
         t = text.strip()
-        if any(w in t.lower() for w in self.weather_words):
-            parts = t.split()
-            try:
-                idx = [i for i, w in enumerate(parts) if w.lower() in ("weather", "in", "मौसम", "clima")][-1]
-                if idx + 1 < len(parts):
-                    return parts[idx + 1].strip(",. ")
-            except Exception:
-                pass
-        return None
+        if not any(w in t.lower() for w in self.weather_words):
+            return None
+        parts = t.split()
+        anchors = {"in", *self.weather_words}
+        idx = [i for i, w in enumerate(parts) if w.lower().strip(",.?!") in anchors]
+        if not idx:
+            return None
+
+        def take(words: list[str]) -> list[str]:
+            city = []
+            for word in words:
+                bare = word.strip(",.?!¿¡\"'")
+                if bare.lower() in anchors or bare.lower() in WEATHER_FILLER:
+                    if city:
+                        break
+                    continue
+                if bare:
+                    city.append(bare)
+                if bare != word.rstrip("\"'"):  # punctuation ends the name
+                    break
+            return city
+
+        city = take(parts[idx[-1] + 1:])
+        if not city and parts[idx[-1]].lower().strip(",.?!") != "in":
+            before = [w.strip(",.?!¿¡\"'") for w in parts[:idx[-1]]]
+            while before and before[-1].lower() in ("का", "की", "के", "में"):
+                before.pop()  # "दिल्ली का मौसम"
+            stop = WEATHER_FILLER | CITY_PARTICLES | WEATHER_ASKING | anchors
+            while before and before[-1] and before[-1].lower() not in stop:
+                city.insert(0, before.pop())
+                if not city[0][0].isupper() or not (before and before[-1][:1].isupper()):
+                    break
+        while city and city[0].lower() in CITY_PARTICLES:
+            city.pop(0)
+        while city and city[-1].lower() in CITY_PARTICLES:
+            city.pop()
+        return " ".join(city) or None
 
     def _greeting_reply(self, sentiment: str, lang: str) -> str:
         base = {
@@ -270,8 +660,16 @@ class LyraCore:
             return "I’m here. Tell me what’s on your mind, and we’ll take it one step at a time."
         return "You sound upbeat! Want to channel that into a quick plan for your day?"
 
-    def _context_reply(self) -> str:
-        if not self.history:
+    def _context_reply(self, text: str = "", session: str = "") -> str:
+        terms = topic_terms(text, ignore=self.context_words)
+        if terms:
+            hits = self.history.search(terms, limit=1, session=session, exclude_intent="CONTEXT")  # not earlier recall questions
+            if hits:
+                when = datetime.fromtimestamp(hits[0]["ts"]).strftime("%d %B")
+                return f"On {when} you said: {hits[0]['user']}"
+            return f"I don’t remember you mentioning {' '.join(terms)}."
+        # no topic ("repeat that", "what did I just say"): the last thing said
+        last = self.history.last(session, exclude_intent="CONTEXT")
+        if last is None:
             return "I don’t have prior context yet."
-        last = self.history[-1]["user"]
-        return f"You previously said: {last}" if len(last) > 2 else ""
\ No newline at end of file
+        return f"You previously said: {last['user']}" if len(last["user"]) > 2 else ""
\ No newline at end of file
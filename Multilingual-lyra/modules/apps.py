@@ -1,11 +1,14 @@
 # modules/apps.py
+import datetime
 import os
+import platform
 import subprocess
+import threading
 import webbrowser
-import platform
+
 import psutil
-import pyautogui
-import datetime
+
+from modules.intents import IntentMatcher
 
 # -------- Multilingual keyword mapping --------
 command_map = {
@@ -23,103 +26,210 @@ command_map = {
     "restart": ["restart", "reboot", "रीस्टार्ट", "reiniciar", "redémarrer"]
 }
 
+# Checked in this order when a command names several apps (browser first, as before)
+LOOKUP_ORDER = ["browser", "notepad", "calculator", "explorer", "paint", "word", "excel",
+                "powerpoint", "cmd", "screenshot", "shutdown", "restart"]
+
+APP_NAMES = {
+    "notepad": "Notepad", "calculator": "Calculator", "explorer": "File Explorer", "paint": "Paint",
+    "word": "Word", "excel": "Excel", "powerpoint": "PowerPoint", "cmd": "Command Prompt",
+}
+
+_OFFICE = r"C:\Program Files\Microsoft Office\root\Office16"
+
+# -------- Per-platform launch commands --------
+APP_COMMANDS = {
+    "Windows": {
+        "notepad": ["notepad.exe"],
+        "calculator": ["calc.exe"],
+        "explorer": ["explorer.exe"],
+        "paint": ["mspaint.exe"],
+        "word": [os.path.join(_OFFICE, "WINWORD.EXE")],
+        "excel": [os.path.join(_OFFICE, "EXCEL.EXE")],
+        "powerpoint": [os.path.join(_OFFICE, "POWERPNT.EXE")],
+        "cmd": ["cmd.exe"],
+    },
+    "Linux": {
+        "notepad": ["gedit"],
+        "calculator": ["gnome-calculator"],
+        "explorer": ["xdg-open", os.path.expanduser("~")],
+        "paint": ["pinta"],
+        "word": ["libreoffice", "--writer"],
+        "excel": ["libreoffice", "--calc"],
+        "powerpoint": ["libreoffice", "--impress"],
+        "cmd": ["x-terminal-emulator"],
+    },
+    "Darwin": {
+        "notepad": ["open", "-a", "TextEdit"],
+        "calculator": ["open", "-a", "Calculator"],
+        "explorer": ["open", os.path.expanduser("~")],
+        "paint": ["open", "-a", "Preview"],
+        "word": ["open", "-a", "Microsoft Word"],
+        "excel": ["open", "-a", "Microsoft Excel"],
+        "powerpoint": ["open", "-a", "Microsoft PowerPoint"],
+        "cmd": ["open", "-a", "Terminal"],
+    },
+}
+
+# -------- Process names, for closing apps Lyra didn't start itself --------
+PROCESS_NAMES = {
+    "Windows": {
+        "notepad": ["notepad.exe"], "calculator": ["Calculator.exe", "CalculatorApp.exe"],
+        "paint": ["mspaint.exe"], "word": ["WINWORD.EXE"], "excel": ["EXCEL.EXE"],
+        "powerpoint": ["POWERPNT.EXE"], "cmd": ["cmd.exe"],
+    },
+    "Linux": {
+        "notepad": ["gedit"], "calculator": ["gnome-calculator"], "paint": ["pinta"],
+        "word": ["soffice.bin"], "excel": ["soffice.bin"], "powerpoint": ["soffice.bin"],
+        "cmd": ["x-terminal-emulator", "gnome-terminal-server"],
+    },
+    "Darwin": {
+        "notepad": ["TextEdit"], "calculator": ["Calculator"], "paint": ["Preview"],
+        "word": ["Microsoft Word"], "excel": ["Microsoft Excel"],
+        "powerpoint": ["Microsoft PowerPoint"], "cmd": ["Terminal"],
+    },
+}
 
-def open_app(command: str) -> str:
-    cmd_lower = command.lower()
 
-    # --- Browser ---
-    if any(word in cmd_lower for word in command_map["browser"]):
+def _build_matcher() -> IntentMatcher:
+    matcher = IntentMatcher(default="")
+    for priority, app in enumerate(LOOKUP_ORDER):
+        matcher.add(app, command_map[app], priority)
+    return matcher
+
+
+_matcher = _build_matcher()
+
+
+def find_app(command: str) -> str:
+    """App key named in the command ("" if none)."""
+    return _matcher.match(command)
+
+
+class Launcher:
+    """
+    Starts apps without blocking (detached Popen) and remembers what it launched,
+    so closing uses the cached psutil handles instead of spawning taskkill.
+    """
+
+    def __init__(self, commands: dict | None = None, process_names: dict | None = None,
+                 system: str | None = None):
+        system = system or platform.system()
+        self.commands = commands if commands is not None else APP_COMMANDS.get(system, {})
+        self.process_names = process_names if process_names is not None else PROCESS_NAMES.get(system, {})
+        self._windows = system == "Windows"
+        self._launched = {}  # app -> [(Popen, psutil.Process)]
+        self._lock = threading.Lock()
+
+    def open(self, app: str) -> int:
+        """Launch `app` and return its pid. Raises KeyError / OSError if it can't be started."""
+        cmd = self.commands[app]
+        kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+        if self._windows:
+            kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+            if app == "cmd":
+                kwargs["creationflags"] = subprocess.CREATE_NEW_CONSOLE
+        else:
+            kwargs["start_new_session"] = True
+        proc = subprocess.Popen(cmd, **kwargs)
+        try:
+            handle = psutil.Process(proc.pid)
+        except psutil.Error:
+            # Already gone: a launcher stub that handed off to the real app (close() finds it by name)
+            handle = None
+        with self._lock:
+            self._reap()
+            if handle is not None:
+                self._launched.setdefault(app, []).append((proc, handle))
+        return proc.pid
+
+    def running(self, app: str) -> list[int]:
+        with self._lock:
+            self._reap()
+            return [handle.pid for _, handle in self._launched.get(app, [])]
+
+    def close(self, app: str, timeout: float = 2.0) -> int:
+        """Terminate the app (kill if it doesn't exit in `timeout`); returns processes closed."""
+        with self._lock:
+            self._reap()
+            handles = [handle for _, handle in self._launched.pop(app, [])]
+        if not handles:
+            # Started outside Lyra (or a launcher stub that handed off): find it by name
+            names = {n.lower() for n in self.process_names.get(app, [])}
+            handles = [p for p in psutil.process_iter(["name"]) if (p.info["name"] or "").lower() in names]
+        for p in handles:
+            try:
+                p.terminate()
+            except psutil.Error:
+                pass
+        gone, alive = psutil.wait_procs(handles, timeout=timeout)
+        for p in alive:
+            try:
+                p.kill()
+            except psutil.Error:
+                pass
+        with self._lock:
+            self._reap()
+        return len(handles)
+
+    def _reap(self):
+        """Drop handles of processes that have exited (and collect their exit status)."""
+        for app, entries in list(self._launched.items()):
+            entries = [(proc, handle) for proc, handle in entries if proc.poll() is None]
+            if entries:
+                self._launched[app] = entries
+            else:
+                del self._launched[app]
+
+
+_launcher = None
+_launcher_lock = threading.Lock()
+
+
+def get_launcher() -> Launcher:
+    global _launcher
+    with _launcher_lock:
+        if _launcher is None:
+            _launcher = Launcher()
+        return _launcher
+
+
+def open_app(command: str, launcher: Launcher | None = None) -> str:
+    app = find_app(command)
+
+    if app == "browser":
         webbrowser.open("https://www.google.com")
         return "Opening browser."
 
-    # --- Notepad ---
-    if any(word in cmd_lower for word in command_map["notepad"]):
-        os.system("notepad")
-        return "Opening Notepad."
-
-    # --- Calculator ---
-    if any(word in cmd_lower for word in command_map["calculator"]):
-        os.system("calc")
-        return "Opening Calculator."
-
-    # --- File Explorer ---
-    if any(word in cmd_lower for word in command_map["explorer"]):
-        os.system("explorer")
-        return "Opening File Explorer."
-
-    # --- Paint ---
-    if any(word in cmd_lower for word in command_map["paint"]):
-        os.system("mspaint")
-        return "Opening Paint."
-
-    # --- MS Word ---
-    if any(word in cmd_lower for word in command_map["word"]):
-        subprocess.Popen([r"C:\Program Files\Microsoft Office\root\Office16\WINWORD.EXE"])
-        return "Opening Word."
-
-    # --- Excel ---
-    if any(word in cmd_lower for word in command_map["excel"]):
-        subprocess.Popen([r"C:\Program Files\Microsoft Office\root\Office16\EXCEL.EXE"])
-        return "Opening Excel."
-
-    # --- PowerPoint ---
-    if any(word in cmd_lower for word in command_map["powerpoint"]):
-        subprocess.Popen([r"C:\Program Files\Microsoft Office\root\Office16\POWERPNT.EXE"])
-        return "Opening PowerPoint."
-
-    # --- CMD ---
-    if any(word in cmd_lower for word in command_map["cmd"]):
-        os.system("start cmd")
-        return "Opening Command Prompt."
-
-    # --- Screenshot ---
-    if any(word in cmd_lower for word in command_map["screenshot"]):
+    if app == "screenshot":
+        import pyautogui  # needs a display; only load it when asked for a screenshot
         filename = f"screenshot_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
         pyautogui.screenshot(filename)
         return f"Screenshot saved as {filename}."
 
-    # --- Shutdown ---
-    if any(word in cmd_lower for word in command_map["shutdown"]):
+    if app == "shutdown":
         os.system("shutdown /s /t 1")
         return "Shutting down system."
 
-    # --- Restart ---
-    if any(word in cmd_lower for word in command_map["restart"]):
+    if app == "restart":
         os.system("shutdown /r /t 1")
         return "Restarting system."
 
-    return "I couldn't recognize the application to open."
-
-
-def close_app(command: str) -> str:
-    cmd_lower = command.lower()
+    if app in APP_NAMES:
+        try:
+            (launcher or get_launcher()).open(app)
+        except (KeyError, OSError, psutil.Error):
+            return f"I couldn't find {APP_NAMES[app]} on this computer."
+        return f"Opening {APP_NAMES[app]}."
 
-    if any(word in cmd_lower for word in command_map["notepad"]):
-        os.system("taskkill /f /im notepad.exe")
-        return "Closed Notepad."
-
-    if any(word in cmd_lower for word in command_map["calculator"]):
-        os.system("taskkill /f /im Calculator.exe")
-        return "Closed Calculator."
-
-    if any(word in cmd_lower for word in command_map["paint"]):
-        os.system("taskkill /f /im mspaint.exe")
-        return "Closed Paint."
-
-    if any(word in cmd_lower for word in command_map["word"]):
-        os.system("taskkill /f /im WINWORD.EXE")
-        return "Closed Word."
-
-    if any(word in cmd_lower for word in command_map["excel"]):
-        os.system("taskkill /f /im EXCEL.EXE")
-        return "Closed Excel."
+    return "I couldn't recognize the application to open."
 
-    if any(word in cmd_lower for word in command_map["powerpoint"]):
-        os.system("taskkill /f /im POWERPNT.EXE")
-        return "Closed PowerPoint."
 
-    if any(word in cmd_lower for word in command_map["cmd"]):
-        os.system("taskkill /f /im cmd.exe")
-        return "Closed Command Prompt."
+def close_app(command: str, launcher: Launcher | None = None) -> str:
+    app = find_app(command)
+    if app in APP_NAMES and app != "explorer":
+        if (launcher or get_launcher()).close(app):
+            return f"Closed {APP_NAMES[app]}."
+        return f"{APP_NAMES[app]} isn't running."
 
     return "I couldn't recognize the application to close."
\ No newline at end of file
@@ -0,0 +1,117 @@
+# modules/asr.py
+"""
+Cascading ASR: decode with a small Whisper model first and only re-decode with a larger one
+when the small model's result looks unreliable. Most commands ("volume up", "open notepad")
+are short and clear, so the tiny model's answer is usually kept.
+"""
+import threading
+import time
+
+# Each tier: model name, and the bar its result has to clear to be kept (the last tier is always kept)
+DEFAULT_TIERS = "tiny:-0.6:0.4,base"
+
+
+class Tier:
+    def __init__(self, model: str, min_avg_logprob: float = -0.6, max_no_speech_prob: float = 0.4,
+                 require_intent: bool = True):
+        self.model = model
+        self.min_avg_logprob = min_avg_logprob
+        self.max_no_speech_prob = max_no_speech_prob
+        self.require_intent = require_intent
+
+    def __repr__(self):
+        return f"Tier({self.model!r}, {self.min_avg_logprob}, {self.max_no_speech_prob})"
+
+
+def parse_tiers(spec: str) -> list[Tier]:
+    """"tiny:-0.6:0.4,base" -> [Tier("tiny", -0.6, 0.4), Tier("base")]  (model[:min_avg_logprob[:max_no_speech_prob]])"""
+    tiers = []
+    for part in spec.split(","):
+        fields = part.strip().split(":")
+        if not fields[0]:
+            continue
+        tier = Tier(fields[0])
+        if len(fields) > 1 and fields[1]:
+            tier.min_avg_logprob = float(fields[1])
+        if len(fields) > 2 and fields[2]:
+            tier.max_no_speech_prob = float(fields[2])
+        tiers.append(tier)
+    if not tiers:
+        raise ValueError(f"no ASR tiers in {spec!r}")
+    return tiers
+
+
+def confidence(result: dict) -> tuple[float, float]:
+    """Duration-weighted (avg_logprob, no_speech_prob) over a Whisper result's segments."""
+    segments = result.get("segments") or []
+    if not segments:
+        return float("-inf"), 1.0
+    weights = [max(s.get("end", 0) - s.get("start", 0), 0.01) for s in segments]
+    total = sum(weights)
+    logprob = sum(w * s.get("avg_logprob", float("-inf")) for w, s in zip(weights, segments)) / total
+    no_speech = sum(w * s.get("no_speech_prob", 1.0) for w, s in zip(weights, segments)) / total
+    return logprob, no_speech
+
+
+def _load_whisper(name: str):
+    import whisper
+    return whisper.load_model(name)
+
+
+class CascadeASR:
+    """
+    Stands in for a Whisper model: `transcribe(audio, language=None, accept=None)` returns
+    Whisper's dict plus "tier" (model that produced it), "escalations" and "rejected"
+    ([(model, reason)] for the tiers whose answer wasn't kept).
+    `accept(text) -> bool` is the caller's extra check, e.g. "the text matches an intent".
+    """
+
+    def __init__(self, tiers: list[Tier] | str = DEFAULT_TIERS, load=_load_whisper):
+        self.tiers = parse_tiers(tiers) if isinstance(tiers, str) else list(tiers)
+        self._load = load
+        self._models = {}
+        self._lock = threading.Lock()
+        self.stats = {t.model: {"calls": 0, "accepted": 0, "seconds": 0.0} for t in self.tiers}
+
+    def model(self, name: str):
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+            return self._models[name]
+
+    def preload(self):
+        for tier in self.tiers:
+            self.model(tier.model)
+
+    def check(self, tier: Tier, result: dict, accept=None) -> str | None:
+        """None if the tier's result is good enough, else why not."""
+        text = (result.get("text") or "").strip()
+        if not text:
+            return "empty"
+        logprob, no_speech = confidence(result)
+        if logprob < tier.min_avg_logprob:
+            return f"avg_logprob {logprob:.2f}"
+        if no_speech > tier.max_no_speech_prob:
+            return f"no_speech_prob {no_speech:.2f}"
+        if tier.require_intent and accept is not None and not accept(text):
+            return "no intent"
+        return None
+
+    def transcribe(self, audio, language: str | None = None, accept=None, **kwargs) -> dict:
+        rejected = []
+        for i, tier in enumerate(self.tiers):
+            t0 = time.perf_counter()
+            result = self.model(tier.model).transcribe(audio, language=language, **kwargs)
+            stats = self.stats[tier.model]
+            stats["calls"] += 1
+            stats["seconds"] += time.perf_counter() - t0
+            last = i == len(self.tiers) - 1
+            reason = None if last else self.check(tier, result, accept)
+            if reason is None:
+                stats["accepted"] += 1
+                result["tier"] = tier.model
+                result["escalations"] = i
+                result["rejected"] = rejected
+                return result
+            rejected.append((tier.model, reason))
+        raise AssertionError("unreachable: the last tier always returns")
@@ -0,0 +1,44 @@
+# modules/audio.py
+import numpy as np
+
+SAMPLE_RATE = 16000  # what Whisper expects
+
+
+def to_float32(samples: np.ndarray) -> np.ndarray:
+    """Accept int16 or float PCM and return contiguous float32 in [-1, 1]."""
+    samples = np.asarray(samples)
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768.0
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+def load_audio_file(path: str) -> np.ndarray:
+    """Decode any audio file ffmpeg understands to 16 kHz mono float32 (used for uploads)."""
+    from whisper.audio import load_audio
+    return load_audio(path, sr=SAMPLE_RATE)
+
+
+def read_wav(path: str) -> np.ndarray:
+    """Read a PCM16 WAV into 16 kHz mono float32 without ffmpeg (fixtures, hotword templates)."""
+    import wave
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels, rate = wf.getnchannels(), wf.getframerate()
+        x = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        x = x.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        n_out = int(round(len(x) * SAMPLE_RATE / rate))
+        x = np.interp(np.linspace(0, len(x) - 1, n_out), np.arange(len(x)), x).astype(np.float32)
+    return x
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    import wave
+    pcm = (np.clip(to_float32(samples), -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
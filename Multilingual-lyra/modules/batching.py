@@ -0,0 +1,176 @@
+# modules/batching.py
+"""
+Micro-batching for the shared models. Concurrent callers (server sessions, back-to-back
+uploads) each submit one input; a worker thread collects whatever arrives within
+`max_wait_ms` of the first one (or until `max_batch` are waiting), runs them through the
+model in one batched forward pass, and hands every caller its own result. A lone request
+only pays the wait window, a few ms next to a decode.
+
+    batcher = MicroBatcher(model.classify_batch, max_batch=8, max_wait_ms=5)
+    label = batcher("I feel great")          # or batcher.submit(text) -> Future
+
+BatchedWhisper puts one in front of a Whisper model: short in-memory clips are padded to
+Whisper's 30 s window and decoded together as one mel batch.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from modules.audio import SAMPLE_RATE
+
+WHISPER_WINDOW = 30 * SAMPLE_RATE  # samples Whisper decodes in one pass
+# whisper.transcribe's defaults for accepting a decode
+COMPRESSION_RATIO_THRESHOLD, LOGPROB_THRESHOLD, NO_SPEECH_THRESHOLD = 2.4, -1.0, 0.6
+
+
+class MicroBatcher:
+    """
+    Calls `run_batch(items) -> results` (same length and order) from one worker thread.
+    An exception from `run_batch` goes to every caller in that batch.
+    """
+
+    def __init__(self, run_batch, max_batch: int = 8, max_wait_ms: float = 5.0, name: str = "batch"):
+        self.run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "items": 0, "max_size": 0}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"lyra-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        if self._closed:
+            raise RuntimeError("batcher is closed")
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item):
+        return self.submit(item).result()
+
+    def close(self):
+        """Finish what is queued, then stop the worker."""
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+        out["mean_size"] = round(out["items"] / out["batches"], 2) if out["batches"] else 0.0
+        return out
+
+    def _collect(self, first) -> tuple[list, bool]:
+        """`first` plus whatever arrives before the deadline; also whether close() was called."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if job is None:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            # a caller that gave up (future cancelled) doesn't take a slot in the forward pass
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.run_batch([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} inputs")
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(batch)
+                self._stats["max_size"] = max(self._stats["max_size"], len(batch))
+
+
+# ---------- Whisper ----------
+def whisper_decode_batch(model, audios: list, language: str | None) -> list[dict]:
+    """
+    One batched greedy decode of clips of at most 30 s, each padded to the full window as
+    whisper.transcribe would. Returns transcribe()-shaped dicts (one segment per clip), so
+    the cascade's confidence checks work on them unchanged. A clip whose greedy result fails
+    transcribe()'s own checks (compression ratio, average log-prob) is decoded again with
+    model.transcribe, which retries at higher temperatures.
+    """
+    import torch
+    import whisper
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(a)), model.dims.n_mels)
+        for a in audios
+    ]).to(model.device)
+    options = whisper.DecodingOptions(language=language, without_timestamps=True,
+                                      fp16=model.device.type == "cuda")
+    out = []
+    for audio, res in zip(audios, whisper.decode(model, mels, options)):
+        text = res.text
+        silent = res.no_speech_prob > NO_SPEECH_THRESHOLD and res.avg_logprob < LOGPROB_THRESHOLD
+        if silent:
+            text = ""  # the same silence rule whisper.transcribe applies per segment
+        elif res.compression_ratio > COMPRESSION_RATIO_THRESHOLD or res.avg_logprob < LOGPROB_THRESHOLD:
+            out.append(model.transcribe(audio, language=language))  # temperature fallback
+            continue
+        segment = {"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": text,
+                   "avg_logprob": res.avg_logprob, "no_speech_prob": res.no_speech_prob}
+        out.append({"text": text, "language": res.language, "segments": [segment] if text else []})
+    return out
+
+
+class BatchedWhisper:
+    """
+    Stands in for a Whisper model. `transcribe(audio, language=None)` on a PCM buffer of up
+    to 30 s goes through the micro-batcher (clips are grouped by `language`, one decode per
+    group); files, longer audio and calls with extra decode options run on their own.
+    Either way only one decode touches the model at a time.
+    """
+
+    def __init__(self, model, max_batch: int = 8, max_wait_ms: float = 5.0, decode_batch=whisper_decode_batch):
+        self.model = model
+        self._decode_batch = decode_batch
+        self._lock = threading.Lock()
+        self.batcher = MicroBatcher(self._run_batch, max_batch, max_wait_ms, name="whisper-batch")
+
+    def transcribe(self, audio, language: str | None = None, **kwargs) -> dict:
+        if kwargs or isinstance(audio, str) or len(audio) > WHISPER_WINDOW:
+            with self._lock:
+                return self.model.transcribe(audio, language=language, **kwargs)
+        return self.batcher((np.asarray(audio, dtype=np.float32), language))
+
+    def _run_batch(self, items: list) -> list[dict]:
+        groups = {}
+        for i, (_, language) in enumerate(items):
+            groups.setdefault(language, []).append(i)
+        out = [None] * len(items)
+        with self._lock:
+            for language, idx in groups.items():
+                for i, result in zip(idx, self._decode_batch(self.model, [items[i][0] for i in idx], language)):
+                    out[i] = result
+        return out
@@ -0,0 +1,195 @@
+# modules/capture.py
+"""
+One always-on microphone stream shared by every consumer (hotword, recorder, VAD).
+The audio callback writes 16 kHz float32 frames into a ring buffer; each consumer
+holds its own read position, so there are no locks between writer and readers and
+a consumer can start reading from the past (pre-roll) the moment it is created.
+"""
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from modules.audio import SAMPLE_RATE
+from modules.vad import frame_energies_db
+
+FRAME = SAMPLE_RATE * 30 // 1000  # 30 ms, same as the VAD
+NOISE_FLOOR_PATH = os.path.join(os.path.expanduser("~"), ".lyra", "noise_floor.json")
+
+
+# ---------- Ring buffer ----------
+class RingBuffer:
+    """
+    Single-producer ring of samples. The writer copies data in and only then advances
+    `written` (a plain int, so readers see it atomically); readers never block the writer.
+    """
+
+    def __init__(self, seconds: float = 30.0):
+        self.capacity = int(seconds * SAMPLE_RATE)
+        self._buf = np.zeros(self.capacity, dtype=np.float32)
+        self.written = 0  # total samples ever written; positions are absolute
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n >= self.capacity:
+            samples, n = samples[-self.capacity:], self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start:start + first] = samples[:first]
+        self._buf[:n - first] = samples[first:]
+        self.written += n
+
+    def read(self, pos: int, n: int) -> tuple[np.ndarray, int]:
+        """Copy up to n samples starting at absolute `pos`; returns (samples, next pos)."""
+        written = self.written
+        pos = max(pos, written - self.capacity)  # overrun: the oldest data is gone, skip ahead
+        n = min(n, written - pos)
+        if n <= 0:
+            return self._buf[:0].copy(), pos
+        start = pos % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.concatenate((self._buf[start:start + first], self._buf[:n - first]))
+        return out, pos + n
+
+
+# ---------- Noise floor ----------
+class NoiseFloor:
+    """
+    Running estimate of the room's background level in dBFS, persisted between runs
+    so the first recording of a session doesn't need a calibration pause.
+    Follows quieter frames quickly and louder ones slowly (minimum-statistics style).
+    """
+
+    def __init__(self, path: str = NOISE_FLOOR_PATH, default_db: float = -55.0):
+        self.path = path
+        self.db = default_db
+        self._saved_at = 0.0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.db = float(json.load(f)["db"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def update(self, frame_db: np.ndarray):
+        for e in frame_db:
+            if e < self.db:
+                self.db += 0.2 * (e - self.db)
+            else:
+                self.db += 0.0005 * (e - self.db)
+        if time.monotonic() - self._saved_at > 30:
+            self.save()
+
+    def save(self):
+        self._saved_at = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"db": round(self.db, 2)}, f)
+        except OSError:
+            pass
+
+
+# ---------- Bus ----------
+class CaptureBus:
+    """Always-on capture thread (sounddevice callback) feeding the ring buffer."""
+
+    def __init__(self, seconds: float = 30.0, device=None):
+        self.ring = RingBuffer(seconds)
+        self.noise = NoiseFloor()
+        self.device = device
+        self._stream = None
+
+    @property
+    def position(self) -> int:
+        return self.ring.written
+
+    def start(self):
+        import sounddevice as sd
+        self._stream = sd.InputStream(
+            samplerate=SAMPLE_RATE, channels=1, dtype="float32",
+            blocksize=FRAME, device=self.device, callback=self._on_audio,
+        )
+        self._stream.start()
+
+    def _on_audio(self, indata, frames, time_info, status):
+        mono = indata[:, 0]
+        self.ring.write(mono)
+        self.noise.update(frame_energies_db(mono, FRAME))
+
+    def feed(self, samples: np.ndarray):
+        """Push audio without a microphone (tests, benchmarks, file playback)."""
+        for i in range(0, len(samples), FRAME):
+            self._on_audio(samples[i:i + FRAME, None], FRAME, None, None)
+
+    def reader(self, preroll_s: float = 0.0, start: int | None = None) -> "BusReader":
+        if start is None:
+            start = self.position - int(preroll_s * SAMPLE_RATE)
+        return BusReader(self, max(0, start))
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self.noise.save()
+
+
+class BusReader:
+    """A consumer's cursor into the bus."""
+
+    def __init__(self, bus: CaptureBus, pos: int):
+        self.bus = bus
+        self.pos = pos
+
+    def read(self, n: int = FRAME, timeout: float = 0.1) -> np.ndarray | None:
+        """Exactly n samples, or None if they didn't arrive within `timeout`."""
+        deadline = time.monotonic() + timeout
+        while self.bus.ring.written - self.pos < n:
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+        out, self.pos = self.bus.ring.read(self.pos, n)
+        return out
+
+
+# ---------- Endpointing ----------
+def listen(reader: BusReader, noise: NoiseFloor, running, phrase_time_limit: float = 10.0,
+           end_silence_s: float = 0.8, margin_db: float = 9.0, min_level_db: float = -45.0,
+           preroll_s: float = 0.3, on_speech_start=None, on_frame=None) -> np.ndarray | None:
+    """
+    Block until one phrase has been spoken and return it (with a little lead-in),
+    like sr.Recognizer.listen but on the shared bus and the persisted noise floor.
+    Returns None once `running()` turns false.
+    `on_frame(frame)` sees the phrase as it grows (lead-in first), for streaming ASR.
+    """
+    lead_in = deque(maxlen=max(1, int(preroll_s * SAMPLE_RATE / FRAME)))
+    onset = deque(maxlen=5)
+    phrase, silent_frames = [], 0
+    max_frames = int(phrase_time_limit * SAMPLE_RATE / FRAME)
+    end_frames = int(end_silence_s * SAMPLE_RATE / FRAME)
+    while running():
+        frame = reader.read(FRAME)
+        if frame is None:
+            continue
+        level = frame_energies_db(frame, FRAME)[0]
+        active = level > noise.db + margin_db and level > min_level_db
+        if not phrase:
+            lead_in.append(frame)
+            onset.append(active)
+            if sum(onset) >= 3:  # 3 of the last 5 frames: speech, not a click
+                phrase = list(lead_in)
+                if on_speech_start is not None:
+                    on_speech_start()
+                if on_frame is not None:
+                    for f in phrase:
+                        on_frame(f)
+            continue
+        phrase.append(frame)
+        if on_frame is not None:
+            on_frame(frame)
+        silent_frames = 0 if active else silent_frames + 1
+        if silent_frames >= end_frames or len(phrase) >= max_frames:
+            return np.concatenate(phrase)
+    return None
@@ -1,16 +1,22 @@
-from transformers import pipeline, __version__
+import threading
+from collections import OrderedDict
 
-from transformers import pipeline, __version__
 
 class SentimentModel:
     """
     Uses a lightweight multilingual sentiment model.
     Maps to POSITIVE / NEGATIVE / NEUTRAL.
+    quantize=True swaps the BERT Linear layers for dynamic int8 ones (CPU only, ~2x faster).
+    Repeated inputs are answered from an LRU memo.
+    max_batch > 1 sends concurrent classify() calls through a micro-batcher, so texts from
+    several callers share one padded forward pass (modules.batching).
     """
-    def __init__(self):
+    def __init__(self, quantize: bool = False, cache_size: int = 512, max_batch: int = 1, max_wait_ms: float = 5.0):
+        # Imported here so importing lyra_core doesn't pull in transformers/torch
+        from transformers import pipeline, __version__
         try:
             self._pipe = pipeline(
-                "sentiment-analysis",
+                "sentiment-analysis", 
                 model="nlptown/bert-base-multilingual-uncased-sentiment"
             )
         except Exception as e:
@@ -18,43 +24,70 @@ class SentimentModel:
                 f"Failed to load pipeline (Transformers version {__version__}). "
                 f"Try: pip install --upgrade transformers\nError: {e}"
             )
+        self.quantized = False
+        if quantize:
+            self._quantize()
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self.batcher = None
+        if max_batch > 1:
+            from modules.batching import MicroBatcher
+            self.batcher = MicroBatcher(self.classify_batch, max_batch, max_wait_ms, name="sentiment-batch")
 
-    def classify(self, text: str) -> str:
+    def _quantize(self):
         try:
-            res = self._pipe(text[:512])[0]["label"]
-            stars = int(res.split()[0])
-            if stars >= 4:
-                return "POSITIVE"
-            if stars <= 2:
-                return "NEGATIVE"
-            return "NEUTRAL"
-        except Exception:
-            return "NEUTRAL"
-class SentimentModel:
-    """
-    Uses a lightweight multilingual sentiment model.
-    Maps to POSITIVE / NEGATIVE / NEUTRAL.
-    """
-    def __init__(self):
-        try:
-            self._pipe = pipeline(
-                "sentiment-analysis", 
-                model="nlptown/bert-base-multilingual-uncased-sentiment"
+            import torch
+            self._pipe.model = torch.quantization.quantize_dynamic(
+                self._pipe.model, {torch.nn.Linear}, dtype=torch.qint8
             )
+            self.quantized = True
         except Exception as e:
-            raise RuntimeError(
-                f"Failed to load pipeline (Transformers version {__version__}). "
-                f"Try: pip install --upgrade transformers\nError: {e}"
-            )
+            print(f"⚠️ Sentiment quantization unavailable, using fp32: {e}")
+
+    @staticmethod
+    def _label(res: dict) -> str:
+        stars = int(res["label"].split()[0])  # e.g., '5 stars'
+        if stars >= 4:
+            return "POSITIVE"
+        if stars <= 2:
+            return "NEGATIVE"
+        return "NEUTRAL"
 
     def classify(self, text: str) -> str:
-        try:
-            res = self._pipe(text[:512])[0]["label"]  # e.g., '5 stars'
-            stars = int(res.split()[0])
-            if stars >= 4:
-                return "POSITIVE"
-            if stars <= 2:
-                return "NEGATIVE"
-            return "NEUTRAL"
-        except Exception:
-            return "NEUTRAL"
\ No newline at end of file
+        if self.batcher is not None:
+            with self._lock:
+                label = self._cache.get(text.strip()[:512])
+            return label if label is not None else self.batcher(text)  # memo hits don't wait for a batch
+        return self.classify_batch([text])[0]
+
+    def classify_batch(self, texts: list[str], batch_size: int = 16) -> list[str]:
+        keys = [t.strip()[:512] for t in texts]
+        out = [None] * len(keys)
+        misses = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    out[i] = self._cache[key]
+                else:
+                    misses.setdefault(key, []).append(i)
+        if misses:
+            todo = list(misses)
+            try:
+                labels = [self._label(r) for r in self._pipe(todo, batch_size=batch_size, truncation=True)]
+            except Exception as e:
+                # A failed pass says nothing about the texts: answer NEUTRAL, cache nothing
+                print(f"⚠️ Sentiment failed: {e}")
+                for key in todo:
+                    for i in misses[key]:
+                        out[i] = "NEUTRAL"
+                return out
+            with self._lock:
+                for key, label in zip(todo, labels):
+                    for i in misses[key]:
+                        out[i] = label
+                    self._cache[key] = label
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return out
\ No newline at end of file
@@ -0,0 +1,320 @@
+# modules/history.py
+"""
+Conversation history: the last few turns in memory (deque) for instant context, every
+turn persisted to SQLite (WAL) with an FTS5 index so "what did I say about the meeting"
+is an indexed lookup over months of history. Writes are queued and committed in batches
+by a background thread, so adding a turn never touches the disk on the caller's thread.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+from modules.intents import tokenize
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".lyra", "history.db")
+# Words that frame a recall question rather than name its topic
+RECALL_STOPWORDS = set(
+    "a an the of in on at to for and or is are was were be what who when where which do does did "
+    "i me my you your it that this about say said tell told again repeat previous last earlier "
+    "something anything can could please command just".split()
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session TEXT NOT NULL DEFAULT '',
+    user TEXT NOT NULL,
+    bot TEXT NOT NULL DEFAULT '',
+    intent TEXT,
+    lang TEXT
+);
+CREATE INDEX IF NOT EXISTS turns_ts ON turns(ts);
+CREATE INDEX IF NOT EXISTS turns_session ON turns(session, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    user, content='turns', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+);
+"""
+# A multi-term recall looks for the terms together only among the newest this-many mentions of
+# each: an FTS AND of two common words that never co-occur walks both posting lists in full
+SEARCH_WINDOW = 256
+
+
+def topic_terms(text: str, ignore=()) -> list[str]:
+    """Content words of a recall question ("what did I say about the meeting" -> ["meeting"])."""
+    skip = RECALL_STOPWORDS | {t for phrase in ignore for t in tokenize(phrase)}
+    return [t for t in tokenize(text) if t not in skip]
+
+
+def _fts_query(terms: list[str]) -> str:
+    # Quoted so user text can't inject FTS syntax. Whole tokens only: a prefix query reads
+    # every posting list under the prefix and is ~30x slower on a large store.
+    return " AND ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+class HistoryStore:
+    """
+    `recent(session)` is a deque of that session's latest turns (newest last); the deques of
+    the `max_sessions` most recently active sessions stay in memory, others reload from disk.
+    `add()` is O(1) on the caller's thread; `search()` reads the committed store through
+    a per-thread connection and also sees turns still waiting to be written.
+    """
+
+    def __init__(self, path: str | None = DEFAULT_PATH, recent: int = 5, retention_days: float | None = 365,
+                 max_turns: int | None = None, flush_interval: float = 0.5, batch_size: int = 512,
+                 max_sessions: int = 1024):
+        self.path = path or ":memory:"
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        else:
+            self.path = "file:lyra_history_%x?mode=memory&cache=shared" % id(self)
+        self.recent_size = recent
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session -> deque of recent turns, LRU
+        self.retention_days = retention_days
+        self.max_turns = max_turns
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.written = 0
+        self._pending = []
+        self._inflight = []
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._prune_requested = False
+        self._prunes, self._pruned = 0, 0  # prunes done, turns the last one removed
+        self._closed = False
+        self._local = threading.local()
+        self._db = self._connect()  # writer connection, used only by the writer thread after init
+        self._db.executescript(_SCHEMA)
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, uri=self.path.startswith("file:"), check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _reader(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    @staticmethod
+    def _row_dict(row) -> dict:
+        ts, session, user, bot, intent, lang = row
+        return {"ts": ts, "session": session, "user": user, "bot": bot, "intent": intent, "lang": lang}
+
+    # ---------- Writes ----------
+    def add(self, user: str, bot: str = "", intent: str | None = None, lang: str | None = None,
+            session: str = "", ts: float | None = None) -> dict:
+        turn = {"ts": time.time() if ts is None else ts, "session": session, "user": user,
+                "bot": bot, "intent": intent, "lang": lang}
+        recent = self.recent(session)
+        with self._cond:
+            recent.append(turn)
+            self._pending.append(turn)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return turn
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything added so far is committed."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._inflight, timeout)
+
+    def _run(self):
+        last_prune = 0.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._flush_requested or self._prune_requested
+                    or len(self._pending) >= self.batch_size,
+                    self.flush_interval,
+                )
+                batch, self._pending = self._pending, []
+                self._flush_requested = False
+                prune, self._prune_requested = self._prune_requested, False
+                self._inflight = batch
+                closed = self._closed
+            if batch:
+                try:
+                    self._write(batch)
+                except sqlite3.Error as e:
+                    print(f"⚠️ History write failed: {e}")
+            if prune or time.monotonic() - last_prune > 3600:
+                last_prune = time.monotonic()
+                removed = 0
+                try:
+                    removed = self._prune()
+                except sqlite3.Error as e:
+                    print(f"⚠️ History prune failed: {e}")
+                with self._cond:
+                    self._prunes, self._pruned = self._prunes + 1, removed
+            with self._cond:
+                self._inflight = []
+                self._cond.notify_all()
+            if closed:
+                return
+
+    def _write(self, batch: list[dict]):
+        rows = [(t["ts"], t["session"], t["user"], t["bot"], t["intent"], t["lang"]) for t in batch]
+        self._db.execute("BEGIN IMMEDIATE")  # ids are allocated here, so take the write lock first
+        try:
+            first = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM turns").fetchone()[0] + 1
+            self._db.executemany(
+                "INSERT INTO turns (id, ts, session, user, bot, intent, lang) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(first + i,) + row for i, row in enumerate(rows)],
+            )
+            self._db.executemany(
+                "INSERT INTO turns_fts (rowid, user) VALUES (?, ?)",
+                [(first + i, row[2]) for i, row in enumerate(rows)],
+            )
+            self._db.commit()
+        except BaseException:
+            self._db.rollback()
+            raise
+        self.written += len(rows)
+
+    def prune(self, timeout: float | None = None) -> int | None:
+        """
+        Apply the retention policy now instead of at the writer's hourly check (it runs on the
+        writer thread either way); returns turns removed, None if `timeout` ran out first.
+        """
+        with self._cond:
+            done = self._prunes
+            self._prune_requested = True
+            self._cond.notify_all()
+            if not self._cond.wait_for(lambda: self._prunes > done, timeout):
+                return None
+            return self._pruned
+
+    def _prune(self) -> int:
+        """Retention policy (age and/or count), on the writer connection; returns turns removed."""
+        where, args = [], []
+        if self.retention_days is not None:
+            where.append("ts < ?")
+            args.append(time.time() - self.retention_days * 86400)
+        if self.max_turns is not None:
+            where.append("id <= (SELECT MAX(id) FROM turns) - ?")
+            args.append(self.max_turns)
+        if not where:
+            return 0
+        cond = " OR ".join(where)
+        with self._db:
+            self._db.execute(
+                f"INSERT INTO turns_fts (turns_fts, rowid, user) SELECT 'delete', id, user FROM turns WHERE {cond}",
+                args,
+            )
+            removed = self._db.execute(f"DELETE FROM turns WHERE {cond}", args).rowcount
+            if removed:
+                # Fold the delete markers back into the index so lookups stay fast
+                self._db.execute("INSERT INTO turns_fts (turns_fts) VALUES ('optimize')")
+        return removed
+
+    # ---------- Reads ----------
+    def recent(self, session: str = "") -> deque:
+        with self._cond:
+            turns = self._sessions.get(session)
+            if turns is not None:
+                self._sessions.move_to_end(session)
+                return turns
+        rows = self._reader().execute(
+            "SELECT ts, session, user, bot, intent, lang FROM turns WHERE session = ? ORDER BY id DESC LIMIT ?",
+            (session, self.recent_size),
+        ).fetchall()
+        with self._cond:
+            turns = self._sessions.get(session)
+            if turns is None:
+                unwritten = [t for t in self._inflight + self._pending if t["session"] == session]
+                turns = deque((self._row_dict(r) for r in reversed(rows)), maxlen=self.recent_size)
+                turns.extend(unwritten)
+                self._sessions[session] = turns
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session)
+            return turns
+
+    def last(self, session: str = "", exclude_intent: str | None = None) -> dict | None:
+        turns = self.recent(session)
+        with self._cond:  # add() appends to the same deque
+            return next((t for t in reversed(turns) if exclude_intent is None or t["intent"] != exclude_intent), None)
+
+    def search(self, terms: list[str], limit: int = 3, session: str | None = None,
+               exclude_intent: str | None = None) -> list[dict]:
+        """Most recent turns whose user text contains every term (newest first)."""
+        if not terms:
+            return []
+        with self._cond:
+            unwritten = self._inflight + self._pending
+        found = [
+            t for t in reversed(unwritten)
+            if (session is None or t["session"] == session)
+            and (exclude_intent is None or t["intent"] != exclude_intent)
+            and set(terms) <= set(tokenize(t["user"]))
+        ][:limit]
+        if len(found) < limit:
+            if len(terms) == 1:
+                sql = ("SELECT t.ts, t.session, t.user, t.bot, t.intent, t.lang FROM turns_fts f "
+                       "JOIN turns t ON t.id = f.rowid WHERE turns_fts MATCH ?")
+                args, order, verify = [_fts_query(terms)], "f.rowid", False
+            else:
+                ids, verify = self._recent_matches(terms)
+                sql = ("SELECT t.ts, t.session, t.user, t.bot, t.intent, t.lang FROM turns t "
+                       f"WHERE t.id IN ({','.join('?' * len(ids))})")
+                args, order = ids, "t.id"
+            if session is not None:
+                sql += " AND t.session = ?"
+                args.append(session)
+            if exclude_intent is not None:
+                sql += " AND t.intent IS NOT ?"
+                args.append(exclude_intent)
+            sql += f" ORDER BY {order} DESC LIMIT ?"
+            args.append(len(args) if verify else limit)
+            seen = {(t["ts"], t["user"]) for t in found}
+            for row in self._reader().execute(sql, args):
+                turn = self._row_dict(row)
+                if (turn["ts"], turn["user"]) in seen:
+                    continue
+                if verify and not set(terms) <= set(tokenize(turn["user"])):
+                    continue
+                found.append(turn)
+                if len(found) >= limit:
+                    break
+        return found[:limit]
+
+    def _recent_matches(self, terms: list[str]) -> tuple[list[int], bool]:
+        """
+        Candidate ids for a multi-term search, from each term's newest SEARCH_WINDOW postings,
+        and whether they still need checking for the other terms. A term mentioned fewer times
+        than that gives every turn it is in (checked against the rest: exact); otherwise the
+        windows are intersected, which only covers the stretch of history all of them reach.
+        """
+        db = self._reader()
+        sets, floor = [], 0
+        for term in dict.fromkeys(terms):
+            ids = [row[0] for row in db.execute(
+                "SELECT rowid FROM turns_fts WHERE turns_fts MATCH ? ORDER BY rowid DESC LIMIT ?",
+                (_fts_query([term]), SEARCH_WINDOW),
+            )]
+            if len(ids) < SEARCH_WINDOW:
+                return ids, True
+            floor = max(floor, ids[-1])
+            sets.append(set(ids))
+        return [i for i in set.intersection(*sets) if i >= floor], False
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join(timeout=5)
+        self._db.close()
@@ -1,36 +1,40 @@
  # modules/hotword.py
-import speech_recognition as sr
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from modules.capture import listen
+from modules.kws import build_spotter
+
 class HotwordThread(QThread):
+    """
+    Listens for the hotword fully on-device (see modules/kws.py), reading from the
+    shared CaptureBus instead of opening its own microphone.
+    """
     hotword_detected = pyqtSignal()
 
-    def __init__(self, hotword="lyra",parent=None):
+    def __init__(self, bus, hotword="lyra", sensitivity=0.5, parent=None):
         super().__init__()
+        self.bus = bus
         self.hotword = hotword.lower()
+        self.sensitivity = sensitivity
+        self.last_phrase_start = None  # bus position where the phrase holding the hotword began
         self._running = False
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
 
     def run(self):
         self._running = True
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            print(f"🎤 Hotword listening for '{self.hotword}'...")
+        spotter = build_spotter(self.hotword, sensitivity=self.sensitivity)  # loads off the GUI thread
+        reader = self.bus.reader()
+        print(f"🎤 Hotword listening for '{self.hotword}' ({spotter.detector.name} detector)...")
 
-            while self._running:
-                try:
-                    audio = self.recognizer.listen(source, timeout=None, phrase_time_limit=3)
-                    text = self.recognizer.recognize_google(audio, language="en-IN").lower()
-                    print(f"Detected: {text}")
-                    if self.hotword in text:
-                        print("✅ Hotword detected!")
-                        self.hotword_detected.emit()
-                except sr.UnknownValueError:
-                    continue
-                except Exception as e:
-                    print(f"⚠️ Hotword error: {e}")
-                    continue
+        while self._running:
+            try:
+                phrase = listen(reader, self.bus.noise, lambda: self._running, phrase_time_limit=3)
+                if phrase is not None and spotter.detect(phrase):
+                    print("✅ Hotword detected!")
+                    self.last_phrase_start = reader.pos - len(phrase)
+                    self.hotword_detected.emit()
+            except Exception as e:
+                print(f"⚠️ Hotword error: {e}")
+                continue
 
     def stop(self):
         self._running = False
\ No newline at end of file
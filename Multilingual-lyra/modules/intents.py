@@ -0,0 +1,67 @@
+# modules/intents.py
+import re
+
+# Word characters plus the combining marks used by Indic and accented scripts.
+# A plain \w splits "नमस्ते" into "नमस" + "त" because vowel signs are not alphanumeric.
+_TOKEN_RE = re.compile(
+    r"[\w\u0300-\u036f\u0483-\u0489\u0591-\u05c7\u0610-\u061a\u064b-\u065f"
+    r"\u0900-\u0963\u0966-\u0dff\u0e31-\u0e4e\u1ab0-\u1aff\u1dc0-\u1dff"
+    r"\u200c\u200d\u20d0-\u20ff\ufe20-\ufe2f]+"
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into casefolded, Unicode-aware word tokens."""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class IntentMatcher:
+    """
+    Token trie over every intent phrase, built once.
+    A phrase only matches on whole-word boundaries ("hi" no longer fires on "this"),
+    and when several intents match the one with the lowest priority number wins.
+    Matching is a single left-to-right pass whose cost depends on the utterance
+    length and the longest phrase, not on the size of the vocabulary.
+    """
+    _END = object()  # trie key holding (priority, intent) for a completed phrase
+
+    def __init__(self, default: str = "GENERAL"):
+        self.default = default
+        self._root = {}
+        self._max_len = 0
+
+    def add(self, intent: str, phrases, priority: int):
+        for phrase in phrases:
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            node = self._root
+            for tok in tokens:
+                node = node.setdefault(tok, {})
+            best = node.get(self._END)
+            if best is None or priority < best[0]:
+                node[self._END] = (priority, intent)
+            self._max_len = max(self._max_len, len(tokens))
+        return self
+
+    def matches(self, text: str) -> list[tuple[int, str, int, int]]:
+        """All phrase hits as (priority, intent, start_token, end_token)."""
+        tokens = tokenize(text)
+        hits = []
+        root, end = self._root, self._END
+        for i in range(len(tokens)):
+            node = root
+            for j in range(i, min(len(tokens), i + self._max_len)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                hit = node.get(end)
+                if hit is not None:
+                    hits.append((hit[0], hit[1], i, j + 1))
+        return hits
+
+    def match(self, text: str) -> str:
+        hits = self.matches(text)
+        if not hits:
+            return self.default
+        return min(hits)[1]
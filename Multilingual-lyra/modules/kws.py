@@ -0,0 +1,163 @@
+# modules/kws.py
+"""
+Offline keyword spotting for the hotword.
+Every window first goes through the VAD energy gate (cheap, rejects room noise),
+and only windows with speech reach a detector:
+  - TemplateDetector: MFCC + DTW against a few enrolled recordings of the hotword
+  - WhisperDetector:  a tiny Whisper pass limited to the short window
+`sensitivity` (0..1) trades misses for false accepts; higher fires more easily.
+"""
+import difflib
+import glob
+import os
+
+import numpy as np
+
+from modules.audio import SAMPLE_RATE, read_wav, to_float32
+from modules.vad import trim_to_speech
+
+TEMPLATE_DIR = os.path.join(os.path.expanduser("~"), ".lyra", "hotword")
+HOTWORD_ALIASES = {"lyra": ("lira", "laira", "leera")}  # how Whisper tends to spell it
+
+
+# ---------- Features ----------
+def _mel_filterbank(n_filters: int, n_fft: int, sample_rate: int) -> np.ndarray:
+    def hz_to_mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel_to_hz(m):
+        return 700.0 * (10 ** (m / 2595.0) - 1.0)
+
+    mels = np.linspace(hz_to_mel(20.0), hz_to_mel(sample_rate / 2), n_filters + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+    fb = np.zeros((n_filters, n_fft // 2 + 1), dtype=np.float32)
+    for i in range(1, n_filters + 1):
+        left, center, right = bins[i - 1], bins[i], bins[i + 1]
+        if center > left:
+            fb[i - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fb[i - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fb
+
+
+_N_FFT = 512
+_FILTERBANK = _mel_filterbank(26, _N_FFT, SAMPLE_RATE)
+_DCT = np.cos(np.pi / 26 * (np.arange(26) + 0.5)[None, :] * np.arange(13)[:, None]).astype(np.float32)
+
+
+def mfcc(samples: np.ndarray, frame_ms: int = 25, hop_ms: int = 10) -> np.ndarray:
+    """MFCCs 1-12 per 10 ms hop with per-utterance mean/variance normalisation; shape (frames, 12)."""
+    x = to_float32(samples)
+    x = np.append(x[0] if len(x) else 0.0, x[1:] - 0.97 * x[:-1])  # pre-emphasis
+    frame_len, hop = SAMPLE_RATE * frame_ms // 1000, SAMPLE_RATE * hop_ms // 1000
+    if len(x) < frame_len:
+        x = np.pad(x, (0, frame_len - len(x)))
+    frames = np.lib.stride_tricks.sliding_window_view(x, frame_len)[::hop] * np.hamming(frame_len)
+    power = np.abs(np.fft.rfft(frames, _N_FFT)) ** 2 / _N_FFT
+    feats = (np.log(power @ _FILTERBANK.T + 1e-10) @ _DCT.T)[:, 1:]  # c0 is just loudness
+    return (feats - feats.mean(axis=0)) / (feats.std(axis=0) + 1e-6)
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Length-normalised DTW cost between two feature sequences."""
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        row, prev = acc[i], acc[i - 1]
+        diag_up = np.minimum(prev[:-1], prev[1:]) + cost[i - 1]
+        for j in range(1, m + 1):
+            row[j] = min(diag_up[j - 1], row[j - 1] + cost[i - 1, j - 1])
+    return float(acc[n, m] / (n + m))
+
+
+# ---------- Detectors ----------
+class TemplateDetector:
+    """Matches the speech in a window against enrolled hotword recordings."""
+    name = "template"
+
+    def __init__(self, templates: list[np.ndarray], sensitivity: float = 0.5):
+        if not templates:
+            raise ValueError("TemplateDetector needs at least one enrolled recording")
+        self.templates = []
+        for t in templates:
+            speech = trim_to_speech(t)
+            self.templates.append(mfcc(speech if len(speech) else t))
+        # On CMVN-normalised MFCCs the same word scores ~1.5-1.9 and unrelated sound ~2.2+
+        self.threshold = 1.5 + 0.8 * sensitivity
+
+    @classmethod
+    def from_dir(cls, directory: str = TEMPLATE_DIR, sensitivity: float = 0.5):
+        paths = sorted(glob.glob(os.path.join(directory, "*.wav")))
+        return cls([read_wav(p) for p in paths], sensitivity=sensitivity)
+
+    def score(self, speech: np.ndarray) -> float:
+        feats = mfcc(speech)
+        # Windows far longer/shorter than the hotword can't be it; skip the DTW
+        costs = [dtw_distance(feats, t) for t in self.templates if 0.5 < len(feats) / len(t) < 2.0]
+        return min(costs, default=float("inf"))
+
+    def detect(self, speech: np.ndarray) -> bool:
+        return self.score(speech) < self.threshold
+
+
+class WhisperDetector:
+    """Runs a tiny Whisper model on the short window and fuzzy-matches the hotword."""
+    name = "whisper"
+
+    def __init__(self, hotword: str = "lyra", model_name: str = "tiny", sensitivity: float = 0.5,
+                 aliases: tuple[str, ...] = ()):
+        import whisper
+        self.model = whisper.load_model(model_name)
+        self.words = [hotword.lower(), *[a.lower() for a in aliases]]
+        self.cutoff = 0.9 - 0.3 * sensitivity
+
+    def detect(self, speech: np.ndarray) -> bool:
+        result = self.model.transcribe(
+            to_float32(speech), language="en", fp16=False,
+            condition_on_previous_text=False, without_timestamps=True,
+        )
+        tokens = [t.strip(".,!?\"'") for t in (result.get("text") or "").lower().split()]
+        return any(difflib.get_close_matches(w, tokens, n=1, cutoff=self.cutoff) for w in self.words)
+
+
+# ---------- Spotter ----------
+class KeywordSpotter:
+    """Energy gate first, detector only on windows that contain speech."""
+
+    def __init__(self, detector, max_speech_s: float = 2.0):
+        self.detector = detector
+        self.max_speech = int(max_speech_s * SAMPLE_RATE)
+        self.windows = 0
+        self.gated = 0  # windows rejected by the energy gate
+
+    def detect(self, samples: np.ndarray) -> bool:
+        self.windows += 1
+        speech = trim_to_speech(samples)
+        if not len(speech):
+            self.gated += 1
+            return False
+        # A hotword is short; don't let a long sentence cost a long decode
+        return self.detector.detect(speech[: self.max_speech])
+
+
+def strip_hotword(text: str, hotword: str = "lyra", cutoff: float = 0.75) -> str:
+    """Drop a leading "Lyra," / "Hey Lyra" from a transcript of the phrase that held the hotword."""
+    words = [hotword.lower(), *HOTWORD_ALIASES.get(hotword.lower(), ())]
+    tokens = text.split()
+    for i, token in enumerate(tokens[:3]):
+        token = token.strip(".,!?\"'").lower()
+        if difflib.get_close_matches(token, words, n=1, cutoff=cutoff):
+            return " ".join(tokens[i + 1:]).lstrip(".,!?\"' ")
+        if token not in ("hey", "hi", "ok", "okay", "hello"):
+            break
+    return text
+
+
+def build_spotter(hotword: str = "lyra", sensitivity: float = 0.5, template_dir: str = TEMPLATE_DIR) -> KeywordSpotter:
+    """Use enrolled templates when there are any, otherwise the tiny Whisper detector."""
+    if glob.glob(os.path.join(template_dir, "*.wav")):
+        return KeywordSpotter(TemplateDetector.from_dir(template_dir, sensitivity=sensitivity))
+    aliases = HOTWORD_ALIASES.get(hotword.lower(), ())
+    return KeywordSpotter(WhisperDetector(hotword, sensitivity=sensitivity, aliases=aliases))
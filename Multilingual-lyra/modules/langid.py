@@ -0,0 +1,215 @@
+# modules/langid.py
+"""
+Language identification with a per-session prior. Users rarely switch language between
+turns, so once a session's recent turns (and the language picked in the UI) agree, Whisper
+gets a fixed `language=` and skips its own detection pass over a 30 s mel window. Detection
+runs again only while the prior is weak or after a turn that looks code-switched.
+Text detection is seeded (langdetect is random otherwise) and cached per distinct text.
+"""
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+from langdetect import DetectorFactory, detect_langs
+
+DetectorFactory.seed = 0  # same text -> same answer
+
+# Scripts that pin the language on their own (Devanagari is shared by Hindi and Marathi)
+_SCRIPT_RANGES = [
+    (0x0900, 0x097F, "hi"),
+    (0x0980, 0x09FF, "bn"),
+    (0x0B80, 0x0BFF, "ta"),
+    (0x0C00, 0x0C7F, "te"),
+    (0x0C80, 0x0CFF, "kn"),
+]
+_SHARED_SCRIPT = {"hi": ("hi", "mr")}
+NON_LATIN_LANGS = {lang for _, _, lang in _SCRIPT_RANGES} | {"mr"}
+# Codes whisper.transcribe(language=...) accepts (whisper.tokenizer.LANGUAGES), without importing whisper
+WHISPER_LANGUAGES = set(
+    "en zh de es ru ko fr ja pt tr pl ca nl ar sv it id hi fi vi he uk el ms cs ro da hu ta no th ur hr bg lt la "
+    "mi ml cy sk te fa lv bn sr az sl kn et mk br eu is hy ne mn bs kk sq sw gl mr pa si km sn yo so af oc ka be "
+    "tg sd gu am yi lo uz fo ht ps tk nn mt sa lb my bo tl mg as tt haw ln ha ba jw su yue".split()
+)
+
+
+def script_language(text: str) -> str | None:
+    """Language implied by a non-Latin script making up most of the letters, else None."""
+    counts, letters = {}, 0
+    for ch in text:
+        if not (ch.isalpha() or unicodedata.category(ch).startswith("M")):
+            continue
+        letters += 1
+        cp = ord(ch)
+        for lo, hi, lang in _SCRIPT_RANGES:
+            if lo <= cp <= hi:
+                counts[lang] = counts.get(lang, 0) + 1
+                break
+    if not counts:
+        return None
+    lang, n = max(counts.items(), key=lambda kv: kv[1])
+    return lang if n * 2 > letters else None
+
+
+@lru_cache(maxsize=4096)
+def _detect_cached(text: str) -> tuple:
+    try:
+        return tuple((c.lang, c.prob) for c in detect_langs(text))
+    except Exception:
+        return ()
+
+
+def whisper_language(lang: str | None) -> str | None:
+    """langdetect's code as Whisper knows it ("zh-cn" -> "zh"), or None if Whisper has no such language."""
+    if not lang:
+        return None
+    lang = lang.lower().split("-")[0]
+    return lang if lang in WHISPER_LANGUAGES else None
+
+
+def same_script(a: str, b: str) -> bool:
+    """Languages written in the same non-Latin script (Hindi and Marathi)."""
+    return b in _SHARED_SCRIPT.get(a, ()) or a in _SHARED_SCRIPT.get(b, ())
+
+
+def detect_scores(text: str) -> tuple:
+    """((lang, prob), ...) best first; cached on the whitespace/case-normalised text."""
+    return _detect_cached(" ".join(text.casefold().split()))
+
+
+class LanguagePrior:
+    """Exponentially decayed votes over a session's recent turns."""
+
+    def __init__(self, decay: float = 0.5):
+        self.decay = decay
+        self.scores = {}
+
+    def observe(self, lang: str, weight: float = 1.0):
+        for k in self.scores:
+            self.scores[k] *= self.decay
+        self.scores[lang] = self.scores.get(lang, 0.0) + weight
+
+    def best(self, setting: str | None = None, setting_weight: float = 0.5) -> tuple[str | None, float, float]:
+        """(language, share of the evidence, total evidence); the UI setting counts as `setting_weight` votes."""
+        scores = dict(self.scores)
+        if setting:
+            scores[setting] = scores.get(setting, 0.0) + setting_weight
+        total = sum(scores.values())
+        if not total:
+            return None, 0.0, 0.0
+        lang = max(scores, key=scores.get)
+        return lang, scores[lang] / total, total
+
+    def reset(self):
+        self.scores.clear()
+
+
+class LanguageID:
+    """
+    `asr_language()` -> the language to pin Whisper to for the next utterance (or None to let
+    it detect); `needs_redecode()` says when a pinned decode should be redone with detection, and
+    `observe_transcript()` feeds the result back. `text_language()` does the same
+    job for typed input.
+    """
+
+    def __init__(self, threshold: float = 0.75, min_evidence: float = 1.5, decay: float = 0.5,
+                 text_threshold: float = 0.9, max_sessions: int = 1024, redecode_logprob: float = -1.0):
+        self.threshold = threshold
+        self.min_evidence = min_evidence
+        self.decay = decay
+        self.text_threshold = text_threshold
+        self.max_sessions = max_sessions
+        self.redecode_logprob = redecode_logprob  # whisper.transcribe's own "unsure" threshold
+        self.pinned = 0
+        self.redecodes = 0
+        self.detected = 0
+        self.code_switches = 0
+        self._priors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prior(self, session: str) -> LanguagePrior:
+        prior = self._priors.get(session)
+        if prior is None:
+            prior = self._priors[session] = LanguagePrior(self.decay)
+            while len(self._priors) > self.max_sessions:
+                self._priors.popitem(last=False)
+        self._priors.move_to_end(session)
+        return prior
+
+    @staticmethod
+    def _setting(setting: str | None) -> str | None:
+        return setting if setting and setting != "auto" else None
+
+    def confident_language(self, session: str = "", setting: str | None = None) -> str | None:
+        with self._lock:
+            lang, share, total = self._prior(session).best(self._setting(setting))
+        return lang if share >= self.threshold and total >= self.min_evidence else None
+
+    def asr_language(self, session: str = "", setting: str | None = None) -> str | None:
+        lang = whisper_language(self.confident_language(session, setting))
+        with self._lock:
+            if lang:
+                self.pinned += 1
+            else:
+                self.detected += 1
+        return lang
+
+    def needs_redecode(self, text: str, pinned: str | None, avg_logprob: float | None) -> bool:
+        """
+        A decode forced to `pinned` that Whisper itself was unsure of, or that reads as another
+        language: its text is what a wrong `language=` garbles (transliterated or translated),
+        so the utterance is decoded once more with detection.
+        """
+        if not pinned:
+            return False
+        heard = self._text_guess(text)
+        redo = (avg_logprob is not None and avg_logprob < self.redecode_logprob) or bool(
+            heard and heard != pinned and not same_script(heard, pinned))
+        if redo:
+            with self._lock:
+                self.redecodes += 1
+        return redo
+
+    def observe_transcript(self, session: str, text: str, language: str | None, pinned: str | None = None) -> str:
+        """
+        Record what was heard; returns the language to report for this turn. `pinned` is the
+        language the session was pinned to; a `language` other than that comes from a decode
+        with detection (see needs_redecode) and means the user switched.
+        """
+        lang = language or "en"
+        if pinned and lang != pinned and not same_script(lang, pinned):
+            # Code-switched (or the prior was wrong): forget it so the next turn is detected
+            with self._lock:
+                self.code_switches += 1
+                prior = self._prior(session)
+                prior.reset()
+                prior.observe(lang, 0.5)
+            return lang
+        with self._lock:
+            self._prior(session).observe(lang)
+        return lang
+
+    def text_language(self, text: str, session: str = "", setting: str | None = None) -> str:
+        """
+        Language of typed input: script, then cached detection, then the session prior.
+        Only an unambiguous guess is recorded; a raw detection of a few words ("volume up"
+        -> hr) must not end up pinning Whisper for the next spoken turn.
+        """
+        guess = self._text_guess(text)
+        if guess is None:
+            return self.confident_language(session, setting) or (detect_scores(text) or (("en", 0.0),))[0][0]
+        with self._lock:
+            self._prior(session).observe(guess)
+        return guess
+
+    def _text_guess(self, text: str) -> str | None:
+        """A language only when the text itself is unambiguous (script, or a long confident detection)."""
+        lang = script_language(text)
+        if lang:
+            return lang
+        if len(text.split()) < 3:
+            return None  # too short for character n-grams to mean much
+        scores = detect_scores(text)
+        if scores and scores[0][1] >= self.text_threshold:
+            return scores[0][0]
+        return None
@@ -0,0 +1,58 @@
+# modules/loader.py
+import threading
+import time
+
+
+class ModelSlot:
+    """
+    A heavy model loaded (and warmed up) on a background thread.
+    `state` is one of PENDING / LOADING / WARMING / READY / FAILED so the UI can show it;
+    `get()` blocks only until this particular model is usable.
+    """
+    PENDING, LOADING, WARMING, READY, FAILED = "pending", "loading", "warming", "ready", "failed"
+
+    def __init__(self, name: str, load, warmup=None):
+        self.name = name
+        self._load = load
+        self._warmup = warmup
+        self._value = None
+        self._ready = threading.Event()
+        self.state = self.PENDING
+        self.error = None
+        self.load_seconds = None
+
+    def start(self, executor):
+        executor.submit(self._run)
+        return self
+
+    def _run(self):
+        t0 = time.perf_counter()
+        try:
+            self.state = self.LOADING
+            value = self._load()
+            if self._warmup is not None:
+                self.state = self.WARMING
+                try:
+                    self._warmup(value)
+                except Exception as e:
+                    print(f"⚠️ {self.name} warm-up failed: {e}")
+            self._value = value
+            self.state = self.READY
+        except Exception as e:
+            self.error = e
+            self.state = self.FAILED
+            print(f"⚠️ {self.name} failed to load: {e}")
+        finally:
+            self.load_seconds = time.perf_counter() - t0
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == self.READY
+
+    def get(self, timeout: float | None = None):
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"{self.name} is still {self.state}")
+        if self.state == self.FAILED:
+            raise RuntimeError(f"{self.name} failed to load: {self.error}")
+        return self._value
@@ -0,0 +1,88 @@
+# modules/playback.py
+import io
+import queue
+import threading
+
+
+class PlaybackQueue:
+    """
+    Plays synthesized replies one after another on a background thread.
+    `enqueue` returns immediately; `stop` is the barge-in: it cuts the current clip
+    and flushes everything still waiting. Clips are in-memory buffers, never a shared file.
+    """
+
+    def __init__(self, get_pygame):
+        self._get_pygame = get_pygame  # callable returning the initialised pygame module
+        self._items = queue.Queue()
+        self._generation = 0           # bumped by stop(); older queued clips are skipped
+        self._pending = 0              # clips of the current generation queued or playing
+        self._lock = threading.Lock()  # guards _generation, _pending and _idle
+        self._interrupt = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name="lyra-playback", daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def enqueue(self, audio: bytes, fmt: str = "mp3", generation: int | None = None) -> bool:
+        """
+        `generation` is `self.generation` as read before the clip was synthesized: if stop()
+        was called since, the clip belongs to a cut-off reply and is dropped (returns False).
+        """
+        with self._lock:
+            if generation is None:
+                generation = self._generation
+            elif generation != self._generation:
+                return False
+            self._pending += 1
+            self._idle.clear()
+            self._items.put((generation, audio, fmt))
+        return True
+
+    def stop(self):
+        with self._lock:
+            self._generation += 1
+            self._interrupt.set()
+            while True:
+                try:
+                    self._items.get_nowait()
+                except queue.Empty:
+                    break
+            # the clip being cut off belongs to the old generation and no longer counts
+            self._pending = 0
+            self._idle.set()
+
+    @property
+    def busy(self) -> bool:
+        return not self._idle.is_set()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        while True:
+            generation, audio, fmt = self._items.get()
+            self._interrupt.clear()
+            if generation == self._generation:
+                self._play(audio, fmt)
+            with self._lock:
+                if generation == self._generation:
+                    self._pending -= 1
+                    if not self._pending:
+                        self._idle.set()
+
+    def _play(self, audio: bytes, fmt: str):
+        try:
+            pygame = self._get_pygame()
+            pygame.mixer.music.load(io.BytesIO(audio), fmt)
+            pygame.mixer.music.play()
+            while pygame.mixer.music.get_busy():
+                if self._interrupt.wait(0.05):
+                    pygame.mixer.music.stop()
+                    break
+            pygame.mixer.music.unload()
+        except Exception as e:
+            print(f"Audio playback failed: {e}")
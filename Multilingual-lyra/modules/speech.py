@@ -0,0 +1,139 @@
+# modules/speech.py
+"""
+Sentence-chunked speech. A reply is split into sentences (and bullet lines, for search
+summaries), and one background thread synthesizes them in order, queueing each chunk for
+playback as soon as it is rendered: chunk N+1 is synthesized while chunk N plays, so the
+wait before the first word is one sentence's synthesis however long the reply is.
+Each chunk gets its own language (a Latin-script sentence inside a Hindi reply is read by
+an English voice), and with it its own engine (LyraCore._synthesize).
+"""
+import queue
+import re
+import threading
+from concurrent.futures import Future
+
+from modules.langid import NON_LATIN_LANGS, detect_scores, same_script, script_language
+
+_BULLET = re.compile(r"^\s*(?:[•·*\-–]|\d+[.)])\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?।॥。！？])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_chunks(text: str, min_chars: int = 40, max_chars: int = 220) -> list[str]:
+    """
+    One chunk per sentence or bullet line. Fragments shorter than `min_chars` (a trailing
+    "(source)", "Hi!") join their neighbour on the same line; sentences over `max_chars` are
+    cut at clause boundaries, then at spaces.
+    """
+    chunks = []
+    for line in text.splitlines():
+        line = _BULLET.sub("", line).strip()
+        if not line:
+            continue
+        pieces = []
+        for sentence in _SENTENCE_END.split(line):
+            pieces.extend(_cut(sentence, max_chars))
+        start, buf = len(chunks), ""
+        for piece in pieces:
+            if buf and len(buf) >= min_chars and len(piece) >= min_chars:
+                chunks.append(buf)
+                buf = piece
+            else:
+                buf = f"{buf} {piece}" if buf else piece
+        if buf:
+            if len(buf) < min_chars and len(chunks) > start:
+                chunks[-1] += " " + buf
+            else:
+                chunks.append(buf)
+    return chunks
+
+
+def _cut(sentence: str, max_chars: int) -> list[str]:
+    if len(sentence) <= max_chars:
+        return [sentence]
+    out, buf = [], ""
+    for part in _CLAUSE_END.split(sentence):
+        for word in part.split(" ") if len(part) > max_chars else [part]:
+            if buf and len(buf) + 1 + len(word) > max_chars:
+                out.append(buf)
+                buf = word
+            else:
+                buf = f"{buf} {word}" if buf else word
+    if buf:
+        out.append(buf)
+    return out
+
+
+def chunk_language(chunk: str, default: str) -> str:
+    """The reply's language, unless the chunk is written in a script that language's voice can't read."""
+    lang = script_language(chunk)
+    if lang:
+        return default if lang == default or same_script(lang, default) else lang
+    if default not in NON_LATIN_LANGS:
+        return default
+    if len(chunk.split()) >= 3:  # Latin text in a Hindi/Kannada/... reply: a title, an English summary
+        scores = detect_scores(chunk)
+        if scores and scores[0][1] >= 0.9:
+            return scores[0][0]
+    return "en"
+
+
+class SpeechStream:
+    """
+    Speaks replies chunk by chunk through a PlaybackQueue, in the order they were submitted.
+    `synthesize(text, lang) -> (audio, fmt)` renders one chunk. A stop() on the player (barge-in)
+    also drops the chunks of that reply not synthesized yet.
+    """
+
+    def __init__(self, synthesize, player, min_chars: int = 40, max_chars: int = 220):
+        self.synthesize = synthesize
+        self.player = player
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._jobs = queue.Queue()
+        self._pending = 0  # replies submitted and not fully synthesized yet
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="lyra-tts", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """Earlier replies are still being synthesized: a new one would start after them."""
+        with self._lock:
+            return self._pending > 0
+
+    def speak(self, text: str, lang: str = "en") -> Future:
+        """Returns at once; the future resolves when the first chunk is queued to play (None if nothing was)."""
+        first = Future()
+        with self._lock:
+            self._pending += 1
+        self._jobs.put((self.player.generation, text, lang, first))
+        return first
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Every submitted reply synthesized and played."""
+        done = threading.Event()
+        self._jobs.put((None, "", "", done))
+        return done.wait(timeout) and self.player.wait_idle(timeout)
+
+    def _run(self):
+        while True:
+            generation, text, lang, first = self._jobs.get()
+            if generation is None:
+                first.set()  # wait_idle marker
+                continue
+            try:
+                for chunk in split_chunks(text, self.min_chars, self.max_chars):
+                    if self.player.generation != generation:
+                        break  # barged in: the rest of this reply is not wanted any more
+                    audio, fmt = self.synthesize(chunk, chunk_language(chunk, lang))
+                    if self.player.enqueue(audio, fmt, generation=generation) and not first.done():
+                        first.set_result((audio, fmt))
+            except Exception as e:
+                print(f"⚠️ Speech failed: {e}")
+                if not first.done():
+                    first.set_exception(e)
+            if not first.done():
+                first.set_result(None)
+            with self._lock:
+                self._pending -= 1
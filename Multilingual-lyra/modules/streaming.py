@@ -0,0 +1,152 @@
+# modules/streaming.py
+"""
+Streaming partial transcription. While the user is still speaking, the phrase so far is
+re-decoded every `step_s` of new audio with the fast ASR tier. A word counts as stable once
+two consecutive hypotheses agree on it (LocalAgreement-2), and every stable partial goes
+through intent detection. Short, unambiguous system commands (volume, brightness,
+screenshot, time) are carried out right away instead of after the end-of-phrase silence and
+the full decode; the final transcript then confirms or undoes them (LyraCore.process_pcm).
+"""
+import threading
+
+import numpy as np
+
+from modules.audio import SAMPLE_RATE
+from modules.intents import tokenize
+
+# Cheap, harmless or reversible: safe to act on before the utterance is over
+EAGER_INTENTS = {"VOLUME_UP", "VOLUME_DOWN", "BRIGHTNESS_UP", "BRIGHTNESS_DOWN", "SCREENSHOT", "TIME"}
+
+
+class LocalAgreement:
+    """The longest prefix that the last `n` hypotheses share; once stable, a word stays stable."""
+
+    def __init__(self, n: int = 2):
+        self.n = n
+        self.stable = []
+        self._history = []
+
+    def update(self, words: list[str]) -> list[str]:
+        self._history = (self._history + [words])[-self.n:]
+        if len(self._history) < self.n:
+            return self.stable
+        agreed = 0
+        for column in zip(*self._history):
+            if any(w != column[0] for w in column):
+                break
+            agreed += 1
+        if agreed > len(self.stable) and self._history[0][:len(self.stable)] == self.stable:
+            self.stable = list(self._history[0][:agreed])
+        return self.stable
+
+
+class StreamingRecognizer:
+    """
+    One utterance at a time: `start()` at speech onset, `feed(frame)` as audio arrives
+    (capture.listen's on_frame), `stop()` at the endpoint. `stop()` returns the result of the
+    action taken early, if any, for LyraCore.process_pcm(samples, early=...).
+
+    Partial decodes run on their own thread so endpointing never waits for them. The window
+    is the phrase so far, capped at `window_s`; once a phrase outgrows it, only the trailing
+    window is decoded, for display, and nothing more is acted on early (a command that long
+    isn't a quick system command).
+    """
+
+    def __init__(self, core, preferred_tts_lang: str = "auto", session: str = "", step_s: float = 0.5,
+                 window_s: float = 6.0, min_audio_s: float = 0.5, eager=EAGER_INTENTS, decode=None,
+                 on_partial=None, on_action=None):
+        self.core = core
+        self.preferred_tts_lang = preferred_tts_lang
+        self.session = session
+        self.step = int(step_s * SAMPLE_RATE)
+        self.window = int(window_s * SAMPLE_RATE)
+        self.min_audio = int(min_audio_s * SAMPLE_RATE)
+        self.eager = set(eager)
+        self.decode = decode or core.transcribe_partial
+        self.on_partial = on_partial  # (text, stable_text)
+        self.on_action = on_action    # (result dict)
+        self.decodes = 0
+        self._lock = threading.Condition()
+        self._acting = False  # an early action is being carried out
+        self._reset()
+
+    def _reset(self):
+        self._frames, self._samples = [], 0
+        self.agreement = LocalAgreement()
+        self.partials = []  # (seconds of audio, text, stable text)
+        self.fired = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self.stop()
+        self._reset()
+        self._language = self.core.langid.confident_language(self.session, self.preferred_tts_lang)
+        # the thread gets this utterance's stop event: a decode still running from the last
+        # one sees it set and drops its result
+        threading.Thread(target=self._run, args=(self._stop,), name="lyra-streaming", daemon=True).start()
+
+    def feed(self, frame: np.ndarray):
+        with self._lock:
+            self._frames.append(frame)
+            self._samples += len(frame)
+
+    def stop(self) -> dict | None:
+        """
+        End of the utterance: no further partials or early actions. A partial decode still
+        running is not waited for (its result is dropped); an early action already under
+        way is, so the caller knows whether it happened.
+        """
+        with self._lock:
+            self._stop.set()
+            self._lock.wait_for(lambda: not self._acting)
+            return self.fired
+
+    def _audio(self) -> tuple[np.ndarray, int]:
+        with self._lock:
+            frames, n = list(self._frames), self._samples
+        audio = np.concatenate(frames) if frames else np.zeros(0, dtype=np.float32)
+        return audio[-self.window:], n
+
+    def _run(self, stop: threading.Event):
+        decoded_at = 0
+        while not stop.is_set():
+            if self._samples < max(self.min_audio, decoded_at + self.step):
+                stop.wait(0.02)
+                continue
+            audio, decoded_at = self._audio()
+            try:
+                self._step(audio, whole=decoded_at <= self.window, stop=stop)
+            except Exception as e:
+                print(f"⚠️ Partial transcription failed: {e}")
+                return
+
+    def _step(self, audio: np.ndarray, whole: bool, stop: threading.Event):
+        hyp = self.decode(audio, language=self._language)
+        self.decodes += 1
+        if stop.is_set():
+            return  # the endpoint came first; the final decode takes it from here
+        text, lang = hyp["text"], hyp["language"]
+        stable_text = " ".join(self.agreement.update(tokenize(text))) if whole else ""
+        self.partials.append((len(audio) / SAMPLE_RATE, text, stable_text))
+        if self.on_partial is not None:
+            self.on_partial(text, stable_text)
+        if self.fired is not None or not stable_text:
+            return
+        intent = self.core.detect_intent(stable_text)
+        # Unambiguous: the unstable tail doesn't change how the utterance reads
+        if intent in self.eager and self.core.detect_intent(text) == intent:
+            with self._lock:
+                if stop.is_set():
+                    return
+                self._acting = True
+            fired = None
+            try:
+                fired = self.core.act_on_partial(stable_text, lang, self.preferred_tts_lang, self.session)
+                fired["partial_audio_s"] = round(len(audio) / SAMPLE_RATE, 2)
+            finally:
+                with self._lock:
+                    self.fired = fired
+                    self._acting = False
+                    self._lock.notify_all()
+            if self.on_action is not None:
+                self.on_action(fired)
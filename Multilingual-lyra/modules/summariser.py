@@ -0,0 +1,144 @@
+# modules/summariser.py
+"""
+Fetch the top search hits concurrently and build a short extractive summary.
+All pages share one hard time budget; pages are streamed with a byte cap, and any page
+that is slow, huge, broken or not HTML simply falls back to its search snippet.
+"""
+import asyncio
+import math
+import re
+import time
+
+import httpx
+from bs4 import BeautifulSoup
+
+from modules.intents import tokenize
+
+try:
+    import lxml  # noqa: F401
+    _PARSER = "lxml"
+except ImportError:
+    _PARSER = "html.parser"
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+BOILERPLATE = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg", "button"]
+STOPWORDS = set(
+    "a an the of in on at to for and or is are was were be what who how why when where which "
+    "do does did about me my i you your it its this that with from by as search look up google web".split()
+)
+_SENTENCE_RE = re.compile(r"(?<=[.!?।])\s+")
+
+
+# ---------- Fetching ----------
+async def _fetch(client: httpx.AsyncClient, url: str, max_bytes: int) -> str | None:
+    async with client.stream("GET", url) as r:
+        ctype = r.headers.get("content-type", "")
+        if r.status_code != 200 or ("html" not in ctype and "text" not in ctype):
+            return None
+        chunks, size = [], 0
+        async for chunk in r.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:  # enough text for a summary; don't download the rest
+                break
+        return b"".join(chunks)[:max_bytes].decode(r.encoding or "utf-8", errors="replace")
+
+
+async def fetch_pages(urls: list[str], budget_s: float = 3.0, max_bytes: int = 512 * 1024) -> list[str | None]:
+    """HTML for each url (None if it failed or missed the deadline), within `budget_s` overall."""
+    timeout = httpx.Timeout(budget_s, connect=min(1.5, budget_s))
+    limits = httpx.Limits(max_connections=len(urls) or 1)
+    async with httpx.AsyncClient(headers=HEADERS, timeout=timeout, limits=limits, follow_redirects=True) as client:
+        tasks = [asyncio.ensure_future(_fetch(client, u, max_bytes)) for u in urls]
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, timeout=budget_s)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    pages = []
+    for t in tasks:
+        if t in done and not t.cancelled() and t.exception() is None:
+            pages.append(t.result())
+        else:
+            pages.append(None)
+    return pages
+
+
+# ---------- Extraction ----------
+def extract_text(html: str) -> list[str]:
+    """Readable paragraphs of a page with navigation, scripts and other boilerplate removed."""
+    try:
+        soup = BeautifulSoup(html, _PARSER)
+    except Exception:
+        return []
+    for tag in soup(BOILERPLATE):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+    paragraphs = []
+    for node in root.find_all(["p", "li", "dd", "blockquote"]):
+        text = " ".join(node.get_text(" ", strip=True).split())
+        if len(text) >= 40 and text.count(" ") >= 5:  # skip menus, buttons, captions
+            paragraphs.append(text)
+    return paragraphs
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text) if 20 <= len(s.strip()) <= 400]
+
+
+# ---------- Ranking ----------
+def rank_sentences(query: str, candidates: list[tuple[str, int]], limit: int = 3) -> list[tuple[str, int]]:
+    """
+    Pick the `limit` sentences that best cover the query terms (idf-weighted overlap,
+    mild length normalisation), dropping near-duplicates. candidates = (sentence, source idx).
+    """
+    terms = {t for t in tokenize(query) if t not in STOPWORDS} or set(tokenize(query))
+    if not terms or not candidates:
+        return candidates[:limit]
+    token_sets = [set(tokenize(s)) for s, _ in candidates]
+    n = len(candidates)
+    idf = {t: math.log(1 + n / (1 + sum(t in ts for ts in token_sets))) for t in terms}
+    scored = []
+    for i, ((sentence, src), toks) in enumerate(zip(candidates, token_sets)):
+        overlap = sum(idf[t] for t in terms if t in toks)
+        if overlap:
+            scored.append((overlap / math.sqrt(max(len(toks), 15)), -i, sentence, src, toks))
+    scored.sort(reverse=True)
+    picked = []
+    for _, _, sentence, src, toks in scored:
+        if any(len(toks & p[2]) / max(1, len(toks | p[2])) > 0.6 for p in picked):
+            continue
+        picked.append((sentence, src, toks))
+        if len(picked) == limit:
+            break
+    return [(s, src) for s, src, _ in picked]
+
+
+def summarise_results(query: str, results: list[dict], budget_s: float = 3.0,
+                      max_bytes: int = 512 * 1024, max_sentences: int = 3) -> dict:
+    """
+    Fetch the result pages and summarise them against the query.
+    Returns {"sentences": [(sentence, result idx)], "fetched": [bool per result], "elapsed": s}.
+    """
+    t0 = time.perf_counter()
+    try:
+        # Most of the budget for the network, the rest for closing sockets and parsing
+        pages = asyncio.run(fetch_pages([r.get("url", "") for r in results], budget_s * 0.8, max_bytes))
+    except Exception:
+        pages = [None] * len(results)
+    candidates, fetched = [], []
+    for i, (result, page) in enumerate(zip(results, pages)):
+        sentences = []
+        if page:
+            for paragraph in extract_text(page):
+                sentences.extend(split_sentences(paragraph))
+        fetched.append(bool(sentences))
+        if not sentences and result.get("snippet"):
+            sentences = [result["snippet"]]  # degrade to the search snippet
+        candidates.extend((s, i) for s in sentences)
+    return {
+        "sentences": rank_sentences(query, candidates, max_sentences),
+        "fetched": fetched,
+        "elapsed": time.perf_counter() - t0,
+    }
@@ -1,35 +1,431 @@
+# modules/system.py
+"""
+System controls (volume, brightness, lock, power) behind a small backend interface.
+Each backend keeps one long-lived worker (a persistent shell / PowerShell session, or
+in-process calls) instead of spawning a process per action, and a Controller folds rapid
+"volume up, volume up, volume up" into a single absolute set call.
+"""
+import ctypes
+import glob
 import os
-import pyautogui
+import platform
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
 from datetime import datetime
 
+LEVELS = ("volume", "brightness")
+
+
 # ---------- Screenshot ----------
 def take_screenshot(save_path=None):
+    import pyautogui  # needs a display; only load it when a screenshot is asked for
     if save_path is None:
         save_path = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
     img = pyautogui.screenshot()
     img.save(save_path)
     return save_path
 
+
+# ---------- Persistent shell ----------
+class ShellSession:
+    """
+    One shell process kept open for the lifetime of the backend. Commands are written to
+    its stdin and the output is read back up to a unique end marker, so each call costs a
+    pipe round trip rather than a process start. Restarted transparently if it dies, or if
+    a command hasn't finished within `timeout_s` (a hung PowerShell / pactl call).
+    """
+
+    def __init__(self, argv: list[str], echo: str = "echo", setup: list[str] | None = None, timeout_s: float = 5.0):
+        self.argv = argv
+        self.echo = echo
+        self.setup = setup or []
+        self.timeout_s = timeout_s
+        self._proc = None
+        self._lines = None  # stdout lines, read by a thread so a hung command can't block us
+        self._lock = threading.Lock()
+
+    def _ensure(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        self._proc = subprocess.Popen(
+            self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read, args=(self._proc.stdout, self._lines), daemon=True).start()
+        for command in self.setup:
+            self._run(command)
+
+    @staticmethod
+    def _read(stdout, lines: queue.Queue):
+        for line in stdout:
+            lines.put(line)
+        lines.put(None)  # EOF: the shell exited
+
+    def _run(self, command: str) -> str:
+        marker = f"__lyra_{uuid.uuid4().hex}__"
+        self._proc.stdin.write(f"{command}\n{self.echo} '{marker}'\n")
+        self._proc.stdin.flush()
+        deadline = time.monotonic() + self.timeout_s
+        lines = []
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"{self.argv[0]} didn't answer within {self.timeout_s:.0f} s: {command[:60]}")
+            if line is None:
+                raise BrokenPipeError(f"{self.argv[0]} exited")
+            if line.strip() == marker:
+                break
+            lines.append(line)
+        return "".join(lines)
+
+    def run(self, command: str) -> str:
+        with self._lock:
+            try:
+                self._ensure()
+                return self._run(command)
+            except (BrokenPipeError, OSError, TimeoutError):
+                self._close(kill=True)  # the next call starts a fresh session
+                raise
+
+    def _close(self, kill: bool = False):
+        if self._proc is not None:
+            try:
+                if kill:
+                    self._proc.kill()
+                self._proc.stdin.close()
+                self._proc.wait(timeout=1)
+            except Exception:
+                self._proc.kill()
+            self._proc = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+# ---------- Backends ----------
+class ControlBackend(ABC):
+    """
+    Absolute controls: get()/set() take a level name from LEVELS and a 0-100 value.
+    get() may return None when the current level can't be read.
+    """
+    name = "none"
+
+    def get(self, level: str) -> int | None:
+        return None
+
+    @abstractmethod
+    def set(self, level: str, value: int):
+        ...
+
+    @abstractmethod
+    def lock(self):
+        ...
+
+    @abstractmethod
+    def shutdown(self):
+        ...
+
+    @abstractmethod
+    def restart(self):
+        ...
+
+    def close(self):
+        pass
+
+
+# Core Audio master volume, compiled once into the PowerShell session (no nircmd needed)
+_WIN_AUDIO_CS = """
+using System.Runtime.InteropServices;
+[Guid("5CDF2C82-841E-4546-9722-0CF74078229A"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
+interface IAudioEndpointVolume {
+    int f(); int g(); int h(); int i();
+    int SetMasterVolumeLevelScalar(float fLevel, System.Guid pguidEventContext);
+    int j();
+    int GetMasterVolumeLevelScalar(out float pfLevel);
+}
+[Guid("D666063F-1587-4E43-81F1-B948E807363F"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
+interface IMMDevice {
+    int Activate(ref System.Guid id, int clsCtx, int activationParams, out IAudioEndpointVolume aev);
+}
+[Guid("A95664D2-9614-4F35-A746-DE8DB63617E6"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
+interface IMMDeviceEnumerator {
+    int f();
+    int GetDefaultAudioEndpoint(int dataFlow, int role, out IMMDevice endpoint);
+}
+[ComImport, Guid("BCDE0395-E52F-467C-8E3D-C4579291692E")] class MMDeviceEnumeratorComObject { }
+public class LyraAudio {
+    static IAudioEndpointVolume Endpoint() {
+        var enumerator = new MMDeviceEnumeratorComObject() as IMMDeviceEnumerator;
+        IMMDevice dev = null;
+        Marshal.ThrowExceptionForHR(enumerator.GetDefaultAudioEndpoint(0, 1, out dev));
+        IAudioEndpointVolume epv = null;
+        var epvid = typeof(IAudioEndpointVolume).GUID;
+        Marshal.ThrowExceptionForHR(dev.Activate(ref epvid, 23, 0, out epv));
+        return epv;
+    }
+    public static float Volume {
+        get { float v = -1; Marshal.ThrowExceptionForHR(Endpoint().GetMasterVolumeLevelScalar(out v)); return v; }
+        set { Marshal.ThrowExceptionForHR(Endpoint().SetMasterVolumeLevelScalar(value, System.Guid.Empty)); }
+    }
+}
+"""
+
+
+class WindowsBackend(ControlBackend):
+    """One PowerShell session for volume (Core Audio) and brightness (WMI, queried once)."""
+    name = "windows"
+
+    def __init__(self):
+        audio = " ".join(line.strip() for line in _WIN_AUDIO_CS.strip().splitlines())
+        self.shell = ShellSession(
+            ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"],
+            echo="Write-Output",
+            setup=[
+                f"Add-Type -TypeDefinition '{audio}'",
+                "$lyraBrightness = Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods",
+            ],
+        )
+
+    def get(self, level: str) -> int | None:
+        if level == "volume":
+            out = self.shell.run("[int]([LyraAudio]::Volume * 100)")
+        else:
+            out = self.shell.run("(Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightness).CurrentBrightness")
+        match = re.search(r"\d+", out)
+        return int(match.group()) if match else None
+
+    def set(self, level: str, value: int):
+        if level == "volume":
+            self.shell.run(f"[LyraAudio]::Volume = {value / 100:.2f}")
+        else:
+            self.shell.run(f"$lyraBrightness.WmiSetBrightness(1, {value})")
+
+    def lock(self):
+        ctypes.windll.user32.LockWorkStation()
+
+    def shutdown(self):
+        self.shell.run("shutdown /s /t 0")
+
+    def restart(self):
+        self.shell.run("shutdown /r /t 0")
+
+    def close(self):
+        self.shell.close()
+
+
+class LinuxBackend(ControlBackend):
+    """PulseAudio/PipeWire volume via one bash session; brightness straight through sysfs when writable."""
+    name = "linux"
+
+    def __init__(self, backlight_dir: str | None = None):
+        self.shell = ShellSession(["bash", "--noprofile", "--norc"])
+        dirs = [backlight_dir] if backlight_dir else sorted(glob.glob("/sys/class/backlight/*"))
+        self.backlight = dirs[0] if dirs else None
+
+    def _backlight_max(self) -> int:
+        with open(os.path.join(self.backlight, "max_brightness")) as f:
+            return int(f.read().strip() or 0) or 1
+
+    def get(self, level: str) -> int | None:
+        if level == "volume":
+            match = re.search(r"(\d+)%", self.shell.run("pactl get-sink-volume @DEFAULT_SINK@ 2>/dev/null"))
+            return int(match.group(1)) if match else None
+        if self.backlight is None:
+            return None
+        with open(os.path.join(self.backlight, "brightness")) as f:
+            return round(int(f.read().strip()) * 100 / self._backlight_max())
+
+    def set(self, level: str, value: int):
+        if level == "volume":
+            self.shell.run(f"pactl set-sink-volume @DEFAULT_SINK@ {value}% 2>/dev/null")
+            return
+        if self.backlight is not None:
+            try:
+                with open(os.path.join(self.backlight, "brightness"), "w") as f:
+                    f.write(str(round(value * self._backlight_max() / 100)))
+                return
+            except PermissionError:
+                pass
+        self.shell.run(f"brightnessctl -q set {value}% 2>/dev/null")
+
+    def lock(self):
+        self.shell.run("loginctl lock-session")
+
+    def shutdown(self):
+        self.shell.run("systemctl poweroff")
+
+    def restart(self):
+        self.shell.run("systemctl reboot")
+
+    def close(self):
+        self.shell.close()
+
+
+class FakeBackend(ControlBackend):
+    """In-memory backend for headless runs: records every call and simulates per-call latency."""
+    name = "fake"
+
+    def __init__(self, latency_s: float = 0.0, levels: dict | None = None):
+        self.latency_s = latency_s
+        self.levels = dict(levels or {"volume": 50, "brightness": 50})
+        self.calls = []
+
+    def _call(self, *call):
+        time.sleep(self.latency_s)
+        self.calls.append(call)
+
+    def get(self, level: str) -> int | None:
+        self._call("get", level)
+        return self.levels.get(level)
+
+    def set(self, level: str, value: int):
+        self._call("set", level, value)
+        self.levels[level] = value
+
+    def lock(self):
+        self._call("lock")
+
+    def shutdown(self):
+        self._call("shutdown")
+
+    def restart(self):
+        self._call("restart")
+
+
+def default_backend() -> ControlBackend:
+    system = platform.system()
+    if system == "Windows":
+        return WindowsBackend()
+    if system == "Linux":
+        return LinuxBackend()
+    return FakeBackend()
+
+
+# ---------- Controller ----------
+class Controller:
+    """
+    Relative adjustments update a target level immediately; one worker thread applies it
+    `coalesce_s` after the first pending change, so a burst of steps becomes one set() call.
+    Once applied, the level is forgotten and read again on the next adjustment, in case it
+    was changed outside Lyra in the meantime.
+    """
+
+    def __init__(self, backend: ControlBackend, coalesce_s: float = 0.15, default_level: int = 50):
+        self.backend = backend
+        self.coalesce_s = coalesce_s
+        self.default_level = default_level
+        self.set_calls = 0
+        self._levels = {}   # level -> last known / target value
+        self._pending = {}  # level -> value not yet applied
+        self._applying = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def level(self, level: str) -> int:
+        with self._cond:
+            if level in self._levels:
+                return self._levels[level]
+        try:
+            value = self.backend.get(level)
+        except Exception as e:
+            print(f"⚠️ Couldn't read {level}: {e}")
+            value = None
+        with self._cond:
+            return self._levels.setdefault(level, self.default_level if value is None else value)
+
+    def set(self, level: str, value: int) -> int:
+        value = max(0, min(100, int(value)))
+        with self._cond:
+            self._levels[level] = value
+            self._pending[level] = value
+            self._cond.notify_all()
+        return value
+
+    def adjust(self, level: str, delta: int) -> int:
+        current = self.level(level)
+        with self._cond:
+            current = self._levels.get(level, current)
+        return self.set(level, current + delta)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every pending change has reached the backend."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._applying, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed and not self._pending:
+                    return
+                deadline = time.monotonic() + self.coalesce_s
+                while not self._closed and (remaining := deadline - time.monotonic()) > 0:
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._applying = True
+            for level, value in batch.items():
+                try:
+                    self.backend.set(level, value)
+                    self.set_calls += 1
+                except Exception as e:
+                    print(f"⚠️ Couldn't set {level}: {e}")
+            with self._cond:
+                for level in batch:
+                    if level not in self._pending:  # nothing newer queued: re-read next time
+                        self._levels.pop(level, None)
+                self._applying = False
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout=2)
+        self.backend.close()
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller() -> Controller:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = Controller(default_backend())
+        return _controller
+
+
 # ---------- Lock / Shutdown / Restart ----------
 def lock_pc():
-    os.system("rundll32.exe user32.dll,LockWorkStation")
+    get_controller().backend.lock()
 
 def shutdown_pc():
-    os.system("shutdown /s /t 0")
+    get_controller().backend.shutdown()
 
 def restart_pc():
-    os.system("shutdown /r /t 0")
+    get_controller().backend.restart()
 
-# ---------- Volume Control (requires nircmd.exe in PATH) ----------
+# ---------- Volume Control ----------
 def increase_volume(step=10):
-    os.system(f"nircmd.exe changesysvolume {int(step*655.35)}")
+    return get_controller().adjust("volume", step)
 
 def decrease_volume(step=10):
-    os.system(f"nircmd.exe changesysvolume -{int(step*655.35)}")
+    return get_controller().adjust("volume", -step)
 
-# ---------- Brightness Control (PowerShell) ----------
+# ---------- Brightness Control ----------
 def increase_brightness(step=10):
-    os.system(f"powershell (Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,{step})")
+    return get_controller().adjust("brightness", step)
 
 def decrease_brightness(step=10):
-    os.system(f"powershell (Get-WmiObject -Namespace root/WMI -Class WmiMonitorBrightnessMethods).WmiSetBrightness(1,-{step})")
\ No newline at end of file
+    return get_controller().adjust("brightness", -step)
\ No newline at end of file
@@ -0,0 +1,205 @@
+# modules/tracing.py
+"""
+Per-stage latency tracing for a turn (VAD, ASR, language ID, intent, sentiment, the skill
+call, history, TTS up to the first sentence queued to play). The LyraCore entry points are
+wrapped with `traced()`; inside them `with span("asr"):` times a stage on the monotonic
+clock. A finished turn
+  - gets a "timings" dict (ms per stage, plus "total") added to its result,
+  - feeds rolling per-stage percentiles,
+  - is appended to a JSONL trace file, if one is configured,
+and `Tracer.prometheus()` renders everything in the Prometheus text format (server.py
+serves it on /metrics; `serve_metrics()` does the same for the desktop app, started with
+`python app.py --metrics-port 9464`).
+With tracing disabled, the wrapper is one attribute check and `span()` returns a shared no-op.
+"""
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+_current = ContextVar("lyra_trace", default=None)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0")
+
+    def __init__(self, trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.spans.append((self.name, self.t0, time.perf_counter() - self.t0))
+        return False
+
+
+class Trace:
+    """The spans of one turn, in the order they finished."""
+
+    def __init__(self, kind: str, session: str = ""):
+        self.kind = kind
+        self.session = session
+        self.wall = time.time()
+        self.t0 = time.perf_counter()
+        self.total = None
+        self.spans = []  # (name, start, seconds)
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def timings(self) -> dict:
+        """Milliseconds per stage (repeated stages add up) plus the whole turn."""
+        out = {}
+        for name, _, seconds in self.spans:
+            out[name] = out.get(name, 0.0) + seconds
+        out = {name: round(seconds * 1e3, 2) for name, seconds in out.items()}
+        out["total"] = round(self.total * 1e3, 2)
+        return out
+
+
+def span(name: str):
+    """Time a stage of the current turn; a no-op outside a traced turn or with tracing off."""
+    trace = _current.get()
+    return _NULL_SPAN if trace is None else _Span(trace, name)
+
+
+def traced(kind: str):
+    """Decorator for LyraCore entry points: one trace per outermost call, if `self.tracer` is enabled."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(self, *args, **kwargs):
+            tracer = self.tracer
+            if not tracer.enabled or _current.get() is not None:
+                return fn(self, *args, **kwargs)  # disabled, or nested inside another entry point
+            trace = Trace(kind, kwargs.get("session", ""))
+            token = _current.set(trace)
+            out = None
+            try:
+                out = fn(self, *args, **kwargs)
+            finally:
+                _current.reset(token)
+                tracer.finish(trace, out)
+            return out
+        return run
+    return wrap
+
+
+class Tracer:
+    """Collects finished turns: rolling percentiles over the last `window` turns per stage."""
+
+    def __init__(self, enabled: bool = True, path: str | None = None, window: int = 1024):
+        self.enabled = enabled
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+        self._recent = {}   # stage -> deque of seconds
+        self._sums = {}     # stage -> [count, seconds], since start
+        self._turns = {}    # (kind, intent) -> count
+        self._file = open(path, "a", encoding="utf-8") if enabled and path else None
+
+    def finish(self, trace: Trace, out: dict | None):
+        trace.total = time.perf_counter() - trace.t0
+        intent = out.get("intent", "") if isinstance(out, dict) else "ERROR"
+        if isinstance(out, dict):
+            out["timings"] = trace.timings()
+        stages = [(name, seconds) for name, _, seconds in trace.spans] + [("total", trace.total)]
+        with self._lock:
+            for name, seconds in stages:
+                recent = self._recent.get(name)
+                if recent is None:
+                    recent = self._recent[name] = deque(maxlen=self.window)
+                    self._sums[name] = [0, 0.0]
+                recent.append(seconds)
+                self._sums[name][0] += 1
+                self._sums[name][1] += seconds
+            key = (trace.kind, intent)
+            self._turns[key] = self._turns.get(key, 0) + 1
+            if self._file is not None:
+                self._file.write(json.dumps({
+                    "ts": round(trace.wall, 3), "kind": trace.kind, "session": trace.session, "intent": intent,
+                    "total_ms": round(trace.total * 1e3, 2),
+                    "spans": [[name, round((start - trace.t0) * 1e3, 2), round(seconds * 1e3, 2)]
+                              for name, start, seconds in trace.spans],
+                }, ensure_ascii=False) + "\n")
+                self._file.flush()
+
+    def percentiles(self) -> dict:
+        """{stage: {"p50": ms, "p90": ms, "p99": ms, "count": n}} over the rolling window."""
+        with self._lock:
+            recent = {name: sorted(values) for name, values in self._recent.items()}
+            counts = {name: s[0] for name, s in self._sums.items()}
+        out = {}
+        for name, values in recent.items():
+            row = {f"p{round(q * 100)}": round(_quantile(values, q) * 1e3, 2) for q in QUANTILES}
+            row["count"] = counts[name]
+            out[name] = row
+        return out
+
+    def prometheus(self) -> str:
+        with self._lock:
+            recent = {name: sorted(values) for name, values in self._recent.items()}
+            sums = {name: tuple(s) for name, s in self._sums.items()}
+            turns = dict(self._turns)
+        lines = ["# HELP lyra_stage_seconds Time spent in each pipeline stage per turn (quantiles over recent turns).",
+                 "# TYPE lyra_stage_seconds summary"]
+        for name in sorted(recent):
+            for q in QUANTILES:
+                lines.append(f'lyra_stage_seconds{{stage="{name}",quantile="{q}"}} {_quantile(recent[name], q):.6f}')
+            lines.append(f'lyra_stage_seconds_sum{{stage="{name}"}} {sums[name][1]:.6f}')
+            lines.append(f'lyra_stage_seconds_count{{stage="{name}"}} {sums[name][0]}')
+        lines += ["# HELP lyra_turns_total Turns handled, by entry point and intent.",
+                  "# TYPE lyra_turns_total counter"]
+        for (kind, intent), n in sorted(turns.items()):
+            lines.append(f'lyra_turns_total{{kind="{kind}",intent="{intent}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _quantile(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def serve_metrics(tracer: Tracer, host: str = "127.0.0.1", port: int = 9464):
+    """Serve `tracer.prometheus()` on http://host:port/metrics from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = tracer.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="lyra-metrics", daemon=True).start()
+    return httpd
@@ -0,0 +1,111 @@
+# modules/tts_cache.py
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".lyra", "tts_cache")
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TTSCache:
+    """
+    Synthesized speech keyed by (normalized text, language, engine).
+    Two tiers: a small in-memory LRU for the hottest phrases and an on-disk store
+    capped at `max_bytes`, evicting least-recently-used files (file mtime = last use).
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR, max_bytes: int = 64 * 1024 * 1024, memory_items: int = 64):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()  # key -> (audio, fmt)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._disk_bytes = sum(e.stat().st_size for e in os.scandir(directory) if e.is_file())
+
+    @staticmethod
+    def key(text: str, lang: str, engine: str) -> str:
+        raw = f"{engine}\x00{lang}\x00{normalize_text(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, lang: str, engine: str) -> tuple[bytes, str] | None:
+        key = self.key(text, lang, engine)
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                self._memory.move_to_end(key)
+                return hit
+        for fmt in ("mp3", "wav"):
+            path = os.path.join(self.directory, f"{key}.{fmt}")
+            try:
+                with open(path, "rb") as f:
+                    audio = f.read()
+                os.utime(path)  # mark as recently used
+            except OSError:
+                continue
+            self._remember(key, audio, fmt)
+            return audio, fmt
+        return None
+
+    def contains(self, text: str, lang: str, engine: str) -> bool:
+        key = self.key(text, lang, engine)
+        with self._lock:
+            if key in self._memory:
+                return True
+        return any(
+            os.path.exists(os.path.join(self.directory, f"{key}.{fmt}")) for fmt in ("mp3", "wav")
+        )
+
+    def put(self, text: str, lang: str, engine: str, audio: bytes, fmt: str):
+        key = self.key(text, lang, engine)
+        self._remember(key, audio, fmt)
+        path = os.path.join(self.directory, f"{key}.{fmt}")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(audio)
+        except OSError as e:
+            print(f"⚠️ TTS cache write failed: {e}")
+            return
+        with self._lock:
+            # replacing an existing entry only adds the difference in size
+            try:
+                old = os.path.getsize(path)
+            except OSError:
+                old = 0
+            try:
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"⚠️ TTS cache write failed: {e}")
+                return
+            self._disk_bytes += len(audio) - old
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _remember(self, key: str, audio: bytes, fmt: str):
+        with self._lock:
+            self._memory[key] = (audio, fmt)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _evict(self):
+        entries = [e for e in os.scandir(self.directory) if e.is_file() and not e.name.endswith(".tmp")]
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        target = int(self.max_bytes * 0.9)  # leave some headroom so we don't evict on every put
+        for e in entries:
+            if total <= target:
+                break
+            try:
+                size = e.stat().st_size
+                os.remove(e.path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
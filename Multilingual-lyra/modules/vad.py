@@ -0,0 +1,94 @@
+# modules/vad.py
+import numpy as np
+
+from modules.audio import SAMPLE_RATE, to_float32
+
+FRAME_MS = 30
+
+
+def frame_energies_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """Per-frame RMS energy in dBFS for non-overlapping frames (the tail is zero-padded)."""
+    x = to_float32(samples)
+    n_frames = max(1, -(-len(x) // frame_len))
+    padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+    padded[:len(x)] = x
+    frames = padded.reshape(n_frames, frame_len)
+    power = np.mean(np.square(frames, dtype=np.float64), axis=1)
+    return 10.0 * np.log10(power + 1e-12)
+
+
+def noise_floor_db(energies: np.ndarray, window: int, percentile: float = 10.0) -> np.ndarray:
+    """Adaptive noise floor: low percentile of the energy over a sliding window around each frame."""
+    window = max(1, min(window, len(energies)))
+    half = window // 2
+    padded = np.pad(energies, (half, window - 1 - half), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    return np.percentile(windows, percentile, axis=1)
+
+
+def speech_segments(
+    samples: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = FRAME_MS,
+    margin_db: float = 9.0,
+    min_level_db: float = -45.0,
+    hangover_ms: int = 240,
+    min_speech_ms: int = 90,
+    floor_window_ms: int = 3000,
+    floor_db: float | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Speech regions as (start, end) sample offsets.
+    A frame is speech when it is `margin_db` above the noise floor and above `min_level_db`.
+    The floor adapts over a sliding window unless a known one is given (`floor_db`).
+    Speech is held for `hangover_ms` after it drops so word endings and short pauses survive,
+    and bursts shorter than `min_speech_ms` (clicks, bumps) are discarded.
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    x = to_float32(samples)
+    if len(x) < frame_len:
+        return []
+    energies = frame_energies_db(x, frame_len)
+    if floor_db is None:
+        floor = noise_floor_db(energies, floor_window_ms // frame_ms)
+    else:
+        floor = np.full_like(energies, floor_db)
+    active = (energies > floor + margin_db) & (energies > min_level_db)
+
+    # Hangover: a frame stays active if any of the previous `hang` frames was active
+    hang = hangover_ms // frame_ms
+    if hang:
+        csum = np.concatenate(([0], np.cumsum(active)))
+        idx = np.arange(1, len(active) + 1)
+        active = (csum[idx] - csum[np.maximum(idx - hang - 1, 0)]) > 0
+
+    edges = np.diff(np.concatenate(([0], active.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    min_frames = max(1, min_speech_ms // frame_ms) + hang
+    return [
+        (int(s) * frame_len, min(int(e) * frame_len, len(x)))
+        for s, e in zip(starts, ends)
+        if e - s >= min_frames
+    ]
+
+
+def has_speech(samples: np.ndarray, **kwargs) -> bool:
+    return bool(speech_segments(samples, **kwargs))
+
+
+def trim_to_speech(samples: np.ndarray, pad_ms: int = 150, sample_rate: int = SAMPLE_RATE, **kwargs) -> np.ndarray:
+    """Keep only the speech segments (plus a little padding); empty array when there is none."""
+    x = to_float32(samples)
+    segments = speech_segments(x, sample_rate=sample_rate, **kwargs)
+    if not segments:
+        return x[:0]
+    pad = int(sample_rate * pad_ms / 1000)
+    # Merge segments whose padding would overlap, then cut
+    merged = []
+    for s, e in segments:
+        s, e = max(0, s - pad), min(len(x), e + pad)
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return np.concatenate([x[s:e] for s, e in merged])
@@ -1,10 +1,136 @@
 import datetime
+import threading
+import time
+from abc import ABC, abstractmethod
 
-def get_weather(city: str) -> str:
+import requests
+
+from modules.coalesce import SingleFlight
+
+# WMO weather interpretation codes (used by Open-Meteo)
+WMO_CODES = {
+    0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
+    45: "foggy", 48: "foggy", 51: "light drizzle", 53: "drizzle", 55: "heavy drizzle",
+    61: "light rain", 63: "rain", 65: "heavy rain", 71: "light snow", 73: "snow", 75: "heavy snow",
+    80: "rain showers", 81: "rain showers", 82: "violent rain showers",
+    95: "thunderstorm", 96: "thunderstorm with hail", 99: "thunderstorm with hail",
+}
+
+
+# ---------- Providers ----------
+class WeatherProvider(ABC):
+    """A weather backend. fetch() returns {"city", "temp_c", "description"} or raises."""
+
+    @abstractmethod
+    def fetch(self, city: str) -> dict:
+        ...
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """Open-Meteo (no API key): geocode the city, then read its current conditions."""
+
+    def __init__(self, geocode_url: str = "https://geocoding-api.open-meteo.com/v1/search",
+                 forecast_url: str = "https://api.open-meteo.com/v1/forecast", timeout: float = 5.0):
+        self.geocode_url = geocode_url
+        self.forecast_url = forecast_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._places = {}  # city -> geocoding result; places don't move, so this never expires
+        self.requests = 0  # upstream HTTP calls, for benchmarks
+
+    def _get(self, url: str, params: dict) -> dict:
+        self.requests += 1
+        r = self.session.get(url, params=params, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def fetch(self, city: str) -> dict:
+        place = self._places.get(city.casefold())
+        if place is None:
+            places = self._get(self.geocode_url, {"name": city, "count": 1}).get("results") or []
+            if not places:
+                raise LookupError(f"unknown city: {city}")
+            place = self._places[city.casefold()] = places[0]
+        current = self._get(self.forecast_url, {
+            "latitude": place["latitude"], "longitude": place["longitude"],
+            "current": "temperature_2m,weather_code",
+        })["current"]
+        return {
+            "city": place.get("name", city),
+            "temp_c": round(float(current["temperature_2m"])),
+            "description": WMO_CODES.get(int(current["weather_code"]), "mixed conditions"),
+        }
+
+
+# ---------- Cache ----------
+class WeatherService:
+    """
+    Per-city cache in front of a provider.
+    Fresh for `ttl`; after that and up to `stale_ttl` the old report is returned at once
+    while one background refresh runs (stale-while-revalidate). Simultaneous requests for
+    the same city share a single upstream call.
+    """
+
+    def __init__(self, provider: WeatherProvider, ttl: float = 600.0, stale_ttl: float = 3 * 3600.0):
+        self.provider = provider
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._cache = {}  # city key -> (fetched_at, report)
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def get(self, city: str) -> dict:
+        key = " ".join(city.casefold().split())
+        with self._lock:
+            hit = self._cache.get(key)
+        if hit is not None:
+            age = time.monotonic() - hit[0]
+            if age < self.ttl:
+                return hit[1]
+            if age < self.stale_ttl:
+                if not self._flight.in_flight(key):
+                    threading.Thread(target=self._refresh_quietly, args=(key, city), daemon=True).start()
+                return hit[1]
+        return self._flight.do(key, lambda: self._refresh(key, city))
+
+    def _refresh(self, key: str, city: str) -> dict:
+        report = self.provider.fetch(city)
+        with self._lock:
+            self._cache[key] = (time.monotonic(), report)
+        return report
+
+    def _refresh_quietly(self, key: str, city: str):
+        try:
+            self._flight.do(key, lambda: self._refresh(key, city))
+        except Exception as e:
+            print(f"⚠️ Weather refresh for {city} failed, keeping the cached report: {e}")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> WeatherService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = WeatherService(OpenMeteoProvider())
+        return _service
+
+
+def format_weather(report: dict) -> str:
+    return f"Weather in {report['city']}: {report['temp_c']}°C, {report['description']}."
+
+
+def get_weather(city: str, service: WeatherService | None = None) -> str:
     if not city:
         return "Please specify a city."
-    # TODO: integrate real weather API (OpenWeatherMap, etc.)
-    return f"Weather in {city}: 29°C, partly cloudy."
+    try:
+        return format_weather((service or get_service()).get(city))
+    except LookupError:
+        return f"I couldn’t find a place called {city}."
+    except Exception:
+        return f"I couldn’t get the weather for {city} right now."
 
 def get_time_str() -> str:
     now = datetime.datetime.now()
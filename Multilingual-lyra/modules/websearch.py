@@ -1,31 +1,137 @@
 import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
+from modules.coalesce import SingleFlight
+from modules.summariser import summarise_results
+
+try:
+    import lxml  # noqa: F401  (much faster than html.parser)
+    _PARSER = "lxml"
+except ImportError:
+    _PARSER = "html.parser"
+
 HEADERS = {"User-Agent": "Mozilla/5.0"}
+SEARCH_URL = "https://html.duckduckgo.com/html/"
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.casefold().split())
+
 
-def search_and_summarise(user_text: str, n_results: int = 3) -> str:
+def extract_query(user_text: str) -> str:
     t = user_text.lower()
     q = re.sub(r"^(search|look up|google|web search)\s*", "", t, flags=re.I).strip()
-    if not q:
-        q = user_text.strip()
+    return q or user_text.strip()
+
+
+def resolve_url(href: str) -> str:
+    """DuckDuckGo wraps result links as //duckduckgo.com/l/?uddg=<target>; unwrap them."""
+    if href.startswith("//"):
+        href = "https:" + href
+    parsed = urlparse(href)
+    if parsed.path.startswith("/l/") and "uddg" in (qs := parse_qs(parsed.query)):
+        return qs["uddg"][0]
+    return href
+
+
+def parse_results(html: str) -> list[dict]:
+    soup = BeautifulSoup(html, _PARSER)
+    items = soup.select("a.result__a")
+    snippets = soup.select(".result__snippet")
+    results = []
+    for i, a in enumerate(items):
+        results.append({
+            "title": a.get_text(" ", strip=True),
+            "snippet": snippets[i].get_text(" ", strip=True) if i < len(snippets) else "",
+            "url": resolve_url(a.get("href", "")),
+        })
+    return results
+
+
+class SearchClient:
+    """
+    DuckDuckGo HTML search with a pooled keep-alive session, a TTL cache keyed by the
+    normalized query, and coalescing: identical queries already in flight share one request.
+    """
+
+    def __init__(self, url: str = SEARCH_URL, ttl: float = 600.0, max_entries: int = 256,
+                 timeout: float = 10.0, pool_size: int = 4):
+        self.url = url
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._cache = OrderedDict()  # key -> (expires_at, results)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.upstream_requests = 0
+
+    def search(self, query: str) -> list[dict]:
+        key = normalize_query(query)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                return hit[1]
+        return self._flight.do(key, lambda: self._store(key, self._fetch(query)))
+
+    def _fetch(self, query: str) -> list[dict]:
+        self.upstream_requests += 1
+        r = self.session.post(self.url, data={"q": query}, timeout=self.timeout)
+        r.raise_for_status()
+        return parse_results(r.text)
+
+    def _store(self, key: str, results: list[dict]) -> list[dict]:
+        if self.ttl > 0:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.ttl, results)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> SearchClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SearchClient()
+        return _client
+
 
-    url = "https://html.duckduckgo.com/html/"
+def search_and_summarise(user_text: str, n_results: int = 3, client: SearchClient | None = None,
+                         budget_s: float = 3.0) -> str:
+    q = extract_query(user_text)
     try:
-        r = requests.post(url, data={"q": q}, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(r.text, "html.parser")
-        items = soup.select("a.result__a")
-        snippets = soup.select(".result__snippet")
-        results = []
-        for i in range(min(n_results, len(items))):
-            title = items[i].get_text(" ", strip=True)
-            snip = snippets[i].get_text(" ", strip=True) if i < len(snippets) else ""
-            results.append({"title": title, "snippet": snip})
+        results = (client or get_client()).search(q)[:n_results]
 
         if not results:
             return f"I couldn’t find much on “{q}” right now."
 
-        bullets = "\n".join([f"• {r['title']}: {r['snippet']}" if r["snippet"] else f"• {r['title']}" for r in results])
+        # Read the actual pages (within budget_s) and pick the sentences that best answer q
+        summary = summarise_results(q, results, budget_s=budget_s)
+        if summary["sentences"]:
+            bullets = "\n".join(f"• {sentence} ({results[i]['title']})" for sentence, i in summary["sentences"])
+        else:
+            bullets = "\n".join([f"• {r['title']}: {r['snippet']}" if r["snippet"] else f"• {r['title']}" for r in results])
         return f"Here’s what I found about “{q}”: \n{bullets}"
     except Exception:
         return "Search is having trouble right now."
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+Headless server: one process with one set of loaded models serving many thin clients.
+
+    python server.py --host 0.0.0.0 --port 8765 --concurrency 2
+
+POST /v1/text     {"text": ..., "session": ..., "tts_lang": "auto"}          -> result dict
+POST /v1/audio    body = an audio file (any format ffmpeg reads), ?session=&tts_lang=
+GET  /v1/ws       WebSocket, ?session=. Binary frames: 16 kHz mono PCM16. Text frames (JSON):
+                  {"type": "end"} answer the audio sent so far, {"type": "text", "text": ...},
+                  {"type": "config", "tts_lang": ..., "tts": true}, {"type": "reset"}
+                  With tts on, a result is followed by the reply's speech, one sentence per
+                  {"type": "audio", "chunk": i, "last": ...} header + binary frame.
+GET  /v1/health   model status, sessions, requests in flight, per-stage latency percentiles,
+                  micro-batch sizes
+GET  /metrics     Prometheus text format (per-stage latency summaries, turns by intent)
+
+Results are LyraCore's dict plus "session" (and "timings", ms per stage). Conversation history is kept per session id
+(sent by the client, or assigned and returned on the first request). Actions that would
+touch this machine (apps, volume, power...) are not run: the intent comes back for the
+client to carry out.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+from modules.audio import SAMPLE_RATE
+from modules.langid import WHISPER_LANGUAGES
+from modules.speech import chunk_language, split_chunks
+
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+
+def valid_tts_lang(value) -> bool:
+    """A tts_lang a client may set: "auto" or a language code Lyra can speak."""
+    return value == "auto" or value in WHISPER_LANGUAGES
+
+
+# ---------- Sessions ----------
+class Session:
+    def __init__(self, sid: str):
+        self.id = sid
+        self.lock = asyncio.Lock()  # one turn at a time per session, answered in order
+        self.tts_lang = "auto"
+        self.tts = False
+        self.last_seen = time.monotonic()
+
+
+class SessionTable:
+    """Live sessions by id; idle ones are dropped (their history stays in the store)."""
+
+    def __init__(self, idle_s: float = 1800):
+        self.idle_s = idle_s
+        self._sessions = {}
+
+    def get(self, sid: str | None) -> Session:
+        sid = (sid or "").strip()[:64] or uuid.uuid4().hex
+        session = self._sessions.get(sid)
+        if session is None:
+            session = self._sessions[sid] = Session(sid)
+        session.last_seen = time.monotonic()
+        return session
+
+    def expire(self) -> int:
+        cutoff = time.monotonic() - self.idle_s
+        stale = [sid for sid, s in self._sessions.items() if s.last_seen < cutoff and not s.lock.locked()]
+        for sid in stale:
+            del self._sessions[sid]
+        return len(stale)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+# ---------- Server ----------
+class LyraServer:
+    """
+    All sessions share one LyraCore. Model work runs on a small thread pool and at most
+    `concurrency` turns run at once; the rest wait on the semaphore instead of piling
+    onto the CPU.
+    """
+
+    def __init__(self, core, concurrency: int = 2, max_audio_s: float = 30.0, session_idle_s: float = 1800):
+        self.core = core
+        self.concurrency = concurrency
+        self.max_pcm_bytes = int(max_audio_s * SAMPLE_RATE) * 2
+        self.sessions = SessionTable(session_idle_s)
+        self.executor = ThreadPoolExecutor(concurrency + 1, thread_name_prefix="lyra-serve")
+        self.in_flight = 0
+        self.waiting = 0
+        self.served = 0
+        self._sem = None
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=MAX_UPLOAD_BYTES)
+        app.router.add_post("/v1/text", self.handle_text)
+        app.router.add_post("/v1/audio", self.handle_audio)
+        app.router.add_get("/v1/ws", self.handle_ws)
+        app.router.add_get("/v1/health", self.handle_health)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app):
+        self._sem = asyncio.Semaphore(self.concurrency)
+        app["expiry"] = asyncio.create_task(self._expire_loop())
+
+    async def _on_cleanup(self, app):
+        app["expiry"].cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.core.history.close()
+        self.core.tracer.close()
+
+    async def _expire_loop(self):
+        while True:
+            await asyncio.sleep(60)
+            self.sessions.expire()
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def turn(self, session: Session, fn, *args) -> dict:
+        """Run one core call for `session`, in order for that session and within the global limit."""
+        async with session.lock:
+            self.waiting += 1
+            try:
+                await self._sem.acquire()
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            try:
+                result = await self._call(fn, *args, preferred_tts_lang=session.tts_lang, session=session.id)
+            finally:
+                self.in_flight -= 1
+                self._sem.release()
+        self.served += 1
+        session.last_seen = time.monotonic()
+        return dict(result, session=session.id)
+
+    def _process_upload(self, data: bytes, suffix: str, **kwargs) -> dict:
+        fd, path = tempfile.mkstemp(prefix="lyra_upload_", suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self.core.process_audio(path, **kwargs)
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ---------- HTTP ----------
+    async def handle_text(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="expected a JSON body")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="expected a JSON object")
+        text = body.get("text")
+        if not isinstance(text, str):
+            raise web.HTTPBadRequest(text='"text" is required')
+        if "tts_lang" in body and not valid_tts_lang(body["tts_lang"]):
+            raise web.HTTPBadRequest(text=f'unknown "tts_lang" {body["tts_lang"]!r}')
+        session = self.sessions.get(body.get("session") or request.headers.get("X-Lyra-Session"))
+        if "tts_lang" in body:
+            session.tts_lang = body["tts_lang"]
+        return web.json_response(await self.turn(session, self.core.process_text, text))
+
+    async def handle_audio(self, request: web.Request) -> web.Response:
+        data = await request.read()
+        if not data:
+            raise web.HTTPBadRequest(text="empty body; send the audio file as the request body")
+        if "tts_lang" in request.query and not valid_tts_lang(request.query["tts_lang"]):
+            raise web.HTTPBadRequest(text=f"unknown tts_lang {request.query['tts_lang']!r}")
+        session = self.sessions.get(request.query.get("session") or request.headers.get("X-Lyra-Session"))
+        if "tts_lang" in request.query:
+            session.tts_lang = request.query["tts_lang"]
+        suffix = os.path.splitext(request.query.get("filename", ""))[1] or ".bin"
+        result = await self.turn(session, partial(self._process_upload, data, suffix))
+        return web.json_response(result)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "models": self.core.model_status(),
+            "sessions": len(self.sessions),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "served": self.served,
+            "latency_ms": self.core.tracer.percentiles(),
+            "batching": self.core.batch_stats(),
+        })
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.core.tracer.prometheus(), content_type="text/plain")
+
+    # ---------- WebSocket ----------
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30, max_msg_size=4 * 1024 * 1024)
+        await ws.prepare(request)
+        session = self.sessions.get(request.query.get("session"))
+        await ws.send_json({"type": "session", "session": session.id})
+        pcm = bytearray()
+        async for msg in ws:
+            if msg.type == WSMsgType.BINARY:
+                pcm.extend(msg.data)
+                if len(pcm) > self.max_pcm_bytes:
+                    pcm.clear()
+                    await ws.send_json({"type": "error", "error": "utterance too long; audio discarded"})
+                continue
+            if msg.type != WSMsgType.TEXT:
+                break
+            try:
+                cmd = json.loads(msg.data)
+            except ValueError:
+                cmd = None
+            if not isinstance(cmd, dict):
+                await ws.send_json({"type": "error", "error": "expected JSON object text frames"})
+                continue
+            kind = cmd.get("type")
+            if kind == "config":
+                if "tts_lang" in cmd and not valid_tts_lang(cmd["tts_lang"]):
+                    await ws.send_json({"type": "error", "error": f"unknown tts_lang {cmd['tts_lang']!r}"})
+                    continue
+                session.tts_lang = cmd.get("tts_lang", session.tts_lang)
+                session.tts = bool(cmd.get("tts", session.tts))
+            elif kind == "reset":
+                pcm.clear()
+            elif kind == "end":
+                samples = np.frombuffer(bytes(pcm[: len(pcm) // 2 * 2]), dtype=np.int16)
+                pcm.clear()
+                await self._send_result(ws, session, await self.turn(session, self.core.process_pcm, samples))
+            elif kind == "text":
+                await self._send_result(ws, session, await self.turn(session, self.core.process_text, cmd.get("text", "")))
+            else:
+                await ws.send_json({"type": "error", "error": f"unknown message type {kind!r}"})
+        return ws
+
+    async def _send_result(self, ws: web.WebSocketResponse, session: Session, result: dict):
+        await ws.send_json(dict(result, type="result"))
+        if session.tts and result.get("reply"):
+            lang = session.tts_lang if session.tts_lang != "auto" else (result.get("lang") or "en")
+            # One clip per sentence: the client starts playing the first while the rest is synthesized
+            chunks = split_chunks(result["reply"])
+            for i, chunk in enumerate(chunks):
+                try:
+                    audio, fmt = await self._call(self.core.synthesize, chunk, chunk_language(chunk, lang))
+                except Exception as e:
+                    await ws.send_json({"type": "error", "error": f"tts failed: {e}"})
+                    return
+                await ws.send_json({"type": "audio", "format": fmt, "bytes": len(audio),
+                                    "chunk": i, "last": i == len(chunks) - 1})
+                await ws.send_bytes(audio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Lyra over HTTP/WebSocket for thin clients.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=2, help="turns processed at once (shared models)")
+    parser.add_argument("--model", default="base", help="Whisper model name")
+    parser.add_argument("--cascade", default=None, metavar="TIERS", help='ASR cascade, e.g. "tiny:-0.6:0.4,base"')
+    parser.add_argument("--history", default=None, help="history database (default ~/.lyra/history.db)")
+    parser.add_argument("--trace", default=None, metavar="FILE", help="append every turn's stage timings as JSONL")
+    parser.add_argument("--no-tracing", action="store_true", help="no per-stage timings or /metrics data")
+    parser.add_argument("--max-batch", type=int, default=1,
+                        help="Whisper/sentiment inputs per batched forward pass (1 = off; e.g. --concurrency)")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="how long a batch waits to fill up")
+    args = parser.parse_args(argv)
+
+    from lyra_core import LyraCore
+    from modules.history import DEFAULT_PATH, HistoryStore
+    from modules.tracing import Tracer
+    core = LyraCore(asr_model=args.model, headless=True, actions=False, asr_tiers=args.cascade,
+                    history=HistoryStore(args.history or DEFAULT_PATH),
+                    tracer=Tracer(enabled=not args.no_tracing, path=args.trace),
+                    max_batch=args.max_batch,
+                    max_wait_ms=args.max_wait_ms)
+    web.run_app(LyraServer(core, concurrency=args.concurrency).app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,193 @@
-import os
-import tempfile
-import wave
-import speech_recognition as sr
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTextEdit, QLineEdit, QLabel, QComboBox, QFileDialog
+    QPushButton, QTextEdit, QLineEdit, QLabel, QComboBox, QFileDialog, QCheckBox
 )
 
 # --- Core + Hotword ---
 from lyra_core import LyraCore
 from modules.hotword import HotwordThread   # ✅ new
+from modules.capture import CaptureBus, listen
+from modules.streaming import StreamingRecognizer
+from modules.tracing import Tracer, serve_metrics
+from modules.vad import has_speech
 
 
-# -------------------- Recorder Thread --------------------
 # -------------------- Recorder Thread --------------------
 class RecorderThread(QThread):
-    """Continuous mic recorder using SpeechRecognition + Whisper-friendly WAV"""
-    recorded = pyqtSignal(str)  # emits path to WAV file
-
-    def __init__(self, parent=None):
+    """
+    Phrase recorder on the shared CaptureBus, emitting 16 kHz PCM in memory.
+    Given a `core`, it also transcribes while the user speaks and acts on quick commands early.
+    """
+    recorded = pyqtSignal(object, object)  # float32 numpy buffer, early action result (or None)
+    speech_started = pyqtSignal()  # speech onset, used for barge-in
+    partial = pyqtSignal(str, str)  # partial transcript, its stable prefix
+    acted = pyqtSignal(dict)        # result of an action taken before the phrase ended
+
+    def __init__(self, bus, start_pos=None, core=None, tts_lang="auto", hotword=None, parent=None):
         super().__init__(parent)
+        self.bus = bus
+        self.hotword = hotword  # set when started at the hotword's phrase; stripped from transcripts
+        # No calibration pause: the bus already tracks the noise floor, and the
+        # reader can start in the past (e.g. at the phrase that held the hotword)
+        self.reader = bus.reader(preroll_s=0.3, start=start_pos)
+        self.stream = None
+        if core is not None:
+            self.stream = StreamingRecognizer(core, preferred_tts_lang=tts_lang,
+                                              on_partial=self.partial.emit, on_action=self.acted.emit)
         self._running = False
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+
+    def _on_speech_start(self):
+        self.speech_started.emit()
+        if self.stream is not None:
+            self.stream.start()
 
     def run(self):
         self._running = True
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=0.8)
-            print("🎤 Listening… Speak something (Stop button to exit)")
-            while self._running:
-                try:
-                    audio = self.recognizer.listen(source, timeout=None, phrase_time_limit=10)
-
-                    wav_path = tempfile.mkstemp(suffix=".wav")[1]
-                    with open(wav_path, "wb") as f:
-                        f.write(audio.get_wav_data(convert_rate=16000, convert_width=2))  # 16kHz PCM16
-
-                    # Check silence before emitting
-                    if not self.is_silent(wav_path):
-                        self.recorded.emit(wav_path)
-                    else:
-                        print("⚠️ Silence detected, waiting for speech...")
-
-                    # remove temp file
-                    try:
-                        os.remove(wav_path)
-                    except:
-                        pass
-
-                except Exception as e:
-                    print(f"⚠️ Recorder error: {e}")
-                    continue
+        print("🎤 Listening… Speak something (Stop button to exit)")
+        while self._running:
+            try:
+                samples = listen(
+                    self.reader, self.bus.noise, lambda: self._running,
+                    phrase_time_limit=10, on_speech_start=self._on_speech_start,
+                    on_frame=self.stream.feed if self.stream is not None else None,
+                )
+                early = self.stream.stop() if self.stream is not None else None
+                if samples is None:
+                    break
+
+                # Check silence before emitting (an early action still gets reconciled)
+                if early is not None or has_speech(samples, floor_db=self.bus.noise.db):
+                    self.recorded.emit(samples, early)
+                else:
+                    print("⚠️ Silence detected, waiting for speech...")
+
+            except Exception as e:
+                print(f"⚠️ Recorder error: {e}")
+                continue
 
     def stop(self):
         self._running = False
+        if self.stream is not None:
+            self.stream.stop()
 
-    @staticmethod
-    def is_silent(wav_path: str, threshold: int = 500) -> bool:
-        """Check if audio RMS is below threshold"""
-        import wave, audioop
-        try:
-            with wave.open(wav_path, 'rb') as wf:
-                frames = wf.readframes(wf.getnframes())
-                rms = audioop.rms(frames, wf.getsampwidth())
-                return rms < threshold
-        except Exception:
-            return False
+
+
+# -------------------- Processing Worker --------------------
+class ProcessingWorker(QThread):
+    """
+    Runs LyraCore jobs off the GUI thread, one at a time, from a bounded queue.
+    When the queue is full, the oldest queued mic recording is dropped (it is stale by then);
+    typed commands and uploads are refused instead so the UI can tell the user it is busy.
+    """
+    result_ready = pyqtSignal(str, dict)  # job kind, result dict from LyraCore
+    job_dropped = pyqtSignal(str)         # job kind
+
+    def __init__(self, core, max_pending: int = 2, max_age: float = 8.0, parent=None):
+        super().__init__(parent)
+        self.core = core
+        self.max_age = max_age  # seconds a recording may wait before it's no longer worth answering
+        self.max_pending = max_pending
+        self._jobs = deque()
+        self._cond = threading.Condition()  # guards _jobs and _current
+        self._current = None  # kind of the job in flight
+        self._running = False
+        self._cancel = threading.Event()
+
+    def submit(self, kind: str, payload, tts_lang: str = "auto", early: dict | None = None,
+               hotword: str | None = None) -> bool:
+        """kind is "pcm" (mic buffer), "file" (uploaded audio) or "text"; `early`, `hotword` see LyraCore.process_pcm."""
+        job = (kind, payload, tts_lang, time.monotonic(), early, hotword)
+        with self._cond:
+            if len(self._jobs) < self.max_pending:
+                self._jobs.append(job)
+                self._cond.notify()
+                return True
+            # Drop the oldest queued recording to make room for the newest one; queued
+            # typed commands and uploads are never evicted, so if only those are waiting
+            # the new recording is the one dropped
+            oldest = next((i for i, j in enumerate(self._jobs) if j[0] == "pcm"), None) if kind == "pcm" else None
+            if oldest is not None:
+                del self._jobs[oldest]
+                self._jobs.append(job)
+                self._cond.notify()
+        self.job_dropped.emit(kind)
+        return oldest is not None
+
+    def cancel_current(self, kind: str | None = None):
+        """Abort the in-flight job (only if it is of `kind`, when given) and stop speaking; queued jobs stay."""
+        with self._cond:
+            if self._current is not None and kind in (None, self._current):
+                self._cancel.set()
+        self.core.stop_speaking()
+
+    def run(self):
+        self._running = True
+        while self._running:
+            with self._cond:
+                self._cond.wait_for(lambda: self._jobs or not self._running, 0.2)
+                if not self._running or not self._jobs:
+                    continue
+                kind, payload, tts_lang, queued_at, early, hotword = self._jobs.popleft()
+                stale = kind == "pcm" and time.monotonic() - queued_at > self.max_age
+                if not stale:
+                    self._current, self._cancel = kind, threading.Event()
+            if stale:
+                self.job_dropped.emit(kind)
+                continue
+            try:
+                if kind == "pcm":
+                    out = self.core.process_pcm(payload, preferred_tts_lang=tts_lang, cancel=self._cancel,
+                                                early=early, hotword=hotword)
+                elif kind == "file":
+                    out = self.core.process_audio(payload, preferred_tts_lang=tts_lang, cancel=self._cancel)
+                else:
+                    out = self.core.process_text(payload, preferred_tts_lang=tts_lang, cancel=self._cancel)
+            except Exception as e:
+                print(f"⚠️ Processing error: {e}")
+                continue
+            finally:
+                with self._cond:
+                    self._current = None
+            if not self._cancel.is_set():
+                self.result_ready.emit(kind, out)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._jobs.clear()
+            self._cond.notify_all()
+        self.cancel_current()
 
 
 
 # -------------------- Main UI --------------------
 class LyraUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, metrics_port: int | None = None, asr_tiers: str | None = None):
         super().__init__()
         self.setWindowTitle("LYRA — Multilingual Voice Assistant")
         self.setMinimumSize(880, 620)
 
-        self.core = LyraCore()
+        # With a metrics port, every turn is traced and served on http://127.0.0.1:<port>/metrics
+        tracer = Tracer(enabled=metrics_port is not None)
+        self.metrics = serve_metrics(tracer, port=metrics_port) if metrics_port is not None else None
+        # returns immediately; models keep loading in the background
+        self.core = LyraCore(asr_tiers=asr_tiers, tracer=tracer)
 
         # ===== Top controls =====
         self.lang_label = QLabel("TTS Language:")
         self.lang_select = QComboBox()
         self.lang_select.addItems(["auto", "en", "hi", "kn", "ta", "te", "mr", "bn"])
         self.lang_select.setCurrentText("auto")
+        self.core.prerender_tts([
+            self.lang_select.itemText(i) for i in range(self.lang_select.count())
+            if self.lang_select.itemText(i) != "auto"
+        ])
 
         self.record_btn = QPushButton("● Start Recording")
         self.record_btn.setCheckable(True)
@@ -98,6 +199,8 @@ class LyraUI(QMainWindow):
         top_row = QHBoxLayout()
         top_row.addWidget(self.lang_label)
         top_row.addWidget(self.lang_select, 1)
+        self.stream_box = QCheckBox("Act while I speak")  # opt-in: off unless ticked
+        top_row.addWidget(self.stream_box)
         top_row.addStretch()
         top_row.addWidget(self.upload_btn)
         top_row.addWidget(self.record_btn)
@@ -106,6 +209,7 @@ class LyraUI(QMainWindow):
         self.input_label = QLabel("You said:")
         self.input_box = QTextEdit()
         self.input_box.setReadOnly(True)
+        self.partial_label = QLabel()
 
         self.output_label = QLabel("LYRA:")
         self.output_box = QTextEdit()
@@ -124,10 +228,19 @@ class LyraUI(QMainWindow):
         bottom_row.addWidget(self.run_btn)
 
         # Layout
+        # ===== Model readiness =====
+        self.status_label = QLabel()
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self.refresh_model_status)
+        self.status_timer.start(500)
+        self.refresh_model_status()
+
         root = QVBoxLayout()
         root.addLayout(top_row)
+        root.addWidget(self.status_label)
         root.addWidget(self.input_label)
         root.addWidget(self.input_box, 2)
+        root.addWidget(self.partial_label)
         root.addWidget(self.output_label)
         root.addWidget(self.output_box, 2)
         root.addLayout(bottom_row)
@@ -138,8 +251,18 @@ class LyraUI(QMainWindow):
 
         self.rec_thread = None
 
+        # ===== Processing worker (keeps ASR/TTS off the GUI thread) =====
+        self.worker = ProcessingWorker(self.core)
+        self.worker.result_ready.connect(self.on_result)
+        self.worker.job_dropped.connect(self.on_job_dropped)
+        self.worker.start()
+
+        # ===== Shared microphone =====
+        self.bus = CaptureBus()
+        self.bus.start()
+
         # ===== Start hotword detection =====
-        self.hotword_thread = HotwordThread()  # choose: "jarvis", "lyra", etc.
+        self.hotword_thread = HotwordThread(self.bus)  # choose: "jarvis", "lyra", etc.
         self.hotword_thread.hotword_detected.connect(self.on_hotword)
         self.hotword_thread.start()
 
@@ -155,48 +278,93 @@ class LyraUI(QMainWindow):
         ts = datetime.now().strftime("%H:%M:%S")
         self.output_box.append(f"[{ts}] LYRA: {text}")
 
+    def refresh_model_status(self):
+        icons = {"ready": "✓", "failed": "✗"}
+        status = self.core.model_status()
+        self.status_label.setText("Models: " + " · ".join(
+            f"{name} {icons.get(state, state + '…')}" for name, state in status.items()
+        ))
+        if all(state in icons for state in status.values()):
+            self.status_timer.stop()
+
     # ------------- Hotword Trigger -------------
     def on_hotword(self):
         """Triggered when hotword is detected."""
+        self.core.stop_speaking()  # barge-in
         self.append_reply("👂 Hotword detected! Listening for your command...")
         if not (self.rec_thread and self.rec_thread.isRunning()):
             self.record_btn.setChecked(True)
-            self.toggle_recording(True)
+            # Start from the phrase that held the hotword, so "Lyra, open notepad" in one breath works;
+            # the hotword itself is stripped from the transcript
+            self.toggle_recording(True, start_pos=self.hotword_thread.last_phrase_start,
+                                  hotword=self.hotword_thread.hotword)
 
     # ------------- Actions -------------
-    def toggle_recording(self, checked):
+    def toggle_recording(self, checked, start_pos=None, hotword=None):
         if checked:
+            self.core.stop_speaking()
             self.record_btn.setText("■ Stop Recording")
-            self.rec_thread = RecorderThread()
+            core = self.core if self.stream_box.isChecked() else None
+            self.rec_thread = RecorderThread(self.bus, start_pos=start_pos, core=core,
+                                             tts_lang=self.lang_select.currentText(), hotword=hotword)
             self.rec_thread.recorded.connect(self.on_recorded)
+            self.rec_thread.partial.connect(self.on_partial)
+            self.rec_thread.acted.connect(self.on_early_action)
+            self.rec_thread.speech_started.connect(self.core.stop_speaking)  # barge-in at speech onset
             self.rec_thread.start()
         else:
             self.record_btn.setText("● Start Recording")
             if self.rec_thread:
                 self.rec_thread.stop()
                 self.rec_thread.wait()
+            self.worker.cancel_current("pcm")
 
-    def on_recorded(self, wav_path: str):
-        out = self.core.process_audio(wav_path, preferred_tts_lang=self.lang_select.currentText())
+    def on_recorded(self, samples, early):
+        self.partial_label.clear()
+        self.worker.submit("pcm", samples, self.lang_select.currentText(), early=early,
+                           hotword=self.rec_thread.hotword if self.rec_thread else None)
+
+    def on_partial(self, text: str, stable: str):
+        self.partial_label.setText(f"… {text}")
+
+    def on_early_action(self, out: dict):
         self.append_me(out["user_text"])
         self.append_reply(out["reply"])
-        try:
-            os.remove(wav_path)
-        except Exception:
-            pass
 
     def upload_audio(self):
         path, _ = QFileDialog.getOpenFileName(self, "Select an audio file", "", "Audio Files (*.wav *.mp3 *.m4a)")
         if path:
-            out = self.core.process_audio(path, preferred_tts_lang=self.lang_select.currentText())
-            self.append_me(out["user_text"])
-            self.append_reply(out["reply"])
+            self.worker.submit("file", path, self.lang_select.currentText())
 
     def run_text_command(self):
         text = self.cmd_line.text().strip()
         if not text:
             return
-        self.append_me(text)
-        out = self.core.process_text(text, preferred_tts_lang=self.lang_select.currentText())
+        if self.worker.submit("text", text, self.lang_select.currentText()):
+            self.append_me(text)
+            self.cmd_line.clear()
+
+    def on_result(self, kind: str, out: dict):
+        if out.get("early") or out["intent"] == "SILENCE":
+            return  # shown when it was carried out, and the full transcript agreed; or nothing was said
+        if kind != "text":
+            self.append_me(out["user_text"])
         self.append_reply(out["reply"])
-        self.cmd_line.clear()
\ No newline at end of file
+
+    def on_job_dropped(self, kind: str):
+        if kind == "pcm":
+            print("⚠️ Dropped a stale recording, still busy with the previous one")
+        else:
+            self.append_reply("⏳ Still working on the previous request, try again in a moment.")
+
+    def closeEvent(self, event):
+        self.worker.stop()
+        self.worker.wait()
+        self.hotword_thread.stop()
+        self.hotword_thread.wait()
+        self.bus.stop()
+        self.core.history.close()
+        if self.metrics is not None:
+            self.metrics.shutdown()
+        self.core.tracer.close()
+        super().closeEvent(event)
\ No newline at end of file